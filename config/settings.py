@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so profiles include the session and auth queries; inert unless REQUEST_PROFILING is on
+    'core.profiling.RequestProfileMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +76,11 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# The import worker (the `worker` process in the Procfile) writes to this
+# database too, so with SQLite it must run on the same host as the web
+# process and open the same file. SQLite allows one writer at a time, so
+# the worker refuses more than one thread on it; use a server database for
+# concurrent imports.
 
 DATABASES = {
     'default': {
@@ -129,6 +136,41 @@ LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'login'
 LOGIN_URL = 'login'
 
-# Media files
+# Media files. Uploaded import workbooks are read from here by the import
+# worker (`manage.py run_import_worker`, the `worker` process in the
+# Procfile), which must see the same MEDIA_ROOT (and, with SQLite, the same
+# database file) as the web process.
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Exported quote/project workbooks, reused until the quote versions change
+EXPORT_CACHE_DIR = BASE_DIR / 'export_cache'
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Upload templates pre-built by `manage.py build_excel_templates`
+EXCEL_TEMPLATE_DIR = BASE_DIR / 'build' / 'excel_templates'
+
+# Per-request profiling (see core/profiling.py); summarise the log with `manage.py profile_report`
+REQUEST_PROFILING = False
+REQUEST_PROFILE_LOG = BASE_DIR / 'request_profiles.jsonl'
+# Limits per view name, over 'default'; a request over any of them is logged as a warning
+REQUEST_PROFILE_BUDGETS = {
+    'default': {'wall_ms': 1000, 'queries': 50, 'sql_ms': 300, 'duplicate_queries': 10},
+    'quote_detail': {'wall_ms': 500, 'queries': 25, 'duplicate_queries': 2},
+    'quote_summary': {'wall_ms': 500, 'queries': 25, 'duplicate_queries': 2},
+    'upload_complete_quote': {'wall_ms': 500, 'queries': 20},
+    'upload_multiple_quotes': {'wall_ms': 500, 'queries': 20},
+    'export_quote': {'wall_ms': 2000, 'queries': 30},
+    'export_project': {'wall_ms': 5000, 'queries': 40},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
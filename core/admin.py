@@ -3,13 +3,31 @@ from .models import (
     Project, Quote, CustomerGroup, MaterialGroup,
     AssemblyType, PackagingType, RawMaterial, MouldingMachineDetail,
     Assembly, AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport,
-    QuoteTimeline, MaterialType, MouldingMachineType
+    QuoteTimeline, MaterialType, MouldingMachineType, ImportJob
 )
 
 
+class LabelRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related-field filter that loads the relations its choice labels (__str__) read"""
+    label_related = {
+        Quote: ('project',),
+        Assembly: ('quote',),
+        Packaging: ('packaging_type', 'quote'),
+        MouldingMachineType: ('customer_group',),
+    }
+
+    def field_choices(self, field, request, model_admin):
+        model = field.related_model
+        queryset = model._default_manager.select_related(*self.label_related.get(model, ()))
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in queryset]
+
+
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_by', 'created_at', 'is_active', 'get_quotes_count']
+    list_display = ['name', 'created_by', 'created_at', 'is_active', 'get_quotes_count', 'get_grand_total']
     list_filter = ['is_active', 'created_at', 'created_by']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at', 'updated_at']
@@ -24,9 +42,20 @@ class ProjectAdmin(admin.ModelAdmin):
         }),
     )
 
+    list_select_related = ['created_by']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals()
+
     def get_quotes_count(self, obj):
         return obj.get_quotes_count()
     get_quotes_count.short_description = 'Quotes Count'
+    get_quotes_count.admin_order_field = 'quotes_count'
+
+    def get_grand_total(self, obj):
+        return round(obj.live_grand_total, 2)
+    get_grand_total.short_description = 'Grand Total'
+    get_grand_total.admin_order_field = 'live_grand_total'
 
 
 @admin.register(CustomerGroup)
@@ -55,10 +84,14 @@ class AssemblyTypeAdmin(admin.ModelAdmin):
 
 @admin.register(Quote)
 class QuoteAdmin(admin.ModelAdmin):
-    list_display = ['name', 'project', 'client_name', 'status', 'get_completion_percentage', 'created_by', 'created_at']
+    list_display = ['name', 'project', 'client_name', 'status', 'get_completion_percentage', 'grand_total',
+                    'created_by', 'created_at']
+    list_select_related = ['project', 'created_by']
     list_filter = ['status', 'created_at', 'project', 'created_by']
     search_fields = ['name', 'client_name', 'part_number', 'part_name', 'sap_number']
-    readonly_fields = ['created_at', 'updated_at', 'get_completion_percentage']
+    readonly_fields = ['created_at', 'updated_at', 'get_completion_percentage',
+                       'total_raw_material_cost', 'total_conversion_cost', 'total_assembly_cost',
+                       'total_packaging_cost', 'total_transport_cost', 'base_cost', 'profit_amount', 'grand_total']
 
     fieldsets = (
         ('Quote Definition', {
@@ -73,6 +106,13 @@ class QuoteAdmin(admin.ModelAdmin):
                 'assembly_complete', 'packaging_complete', 'transport_complete'
             )
         }),
+        ('Cost Totals', {
+            'fields': (
+                'total_raw_material_cost', 'total_conversion_cost', 'total_assembly_cost',
+                'total_packaging_cost', 'total_transport_cost', 'base_cost', 'profit_amount', 'grand_total'
+            ),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -88,7 +128,8 @@ class QuoteAdmin(admin.ModelAdmin):
 class MouldingMachineDetailAdmin(admin.ModelAdmin):
     list_display = ['quote', 'moulding_machine_type', 'cavity', 'machine_tonnage', 'cycle_time',
                     'efficiency', 'shift_rate', 'mtc_count', 'created_at']
-    list_filter = ['moulding_machine_type', 'created_at']
+    list_select_related = ['quote__project', 'moulding_machine_type__customer_group']
+    list_filter = [('moulding_machine_type', LabelRelatedFieldListFilter), 'created_at']
     search_fields = ['quote__name', 'moulding_machine_type__name']
     readonly_fields = ['created_at', 'updated_at', 'number_of_parts_per_shift', 'mtc_cost', 'conversion_cost']
 
@@ -120,7 +161,8 @@ class MouldingMachineDetailAdmin(admin.ModelAdmin):
 @admin.register(ManufacturingPrintingCost)
 class ManufacturingPrintingCostAdmin(admin.ModelAdmin):
     list_display = ['process', 'assembly', 'mc_tonnage', 'mc_rate_per_hour', 'cycle_time', 'per_cost']
-    list_filter = ['assembly']
+    list_select_related = ['assembly__quote']
+    list_filter = [('assembly', LabelRelatedFieldListFilter)]
     readonly_fields = ['per_cost', 'created_at', 'updated_at']
 
 
@@ -128,7 +170,8 @@ class ManufacturingPrintingCostAdmin(admin.ModelAdmin):
 class TransportAdmin(admin.ModelAdmin):
     list_display = ['quote', 'packaging', 'transport_length', 'transport_breadth', 'transport_height',
                     'total_boxes', 'total_parts_per_trip', 'trip_cost_per_part']
-    list_filter = ['quote', 'packaging']
+    list_select_related = ['quote__project', 'packaging__packaging_type', 'packaging__quote']
+    list_filter = [('quote', LabelRelatedFieldListFilter), ('packaging', LabelRelatedFieldListFilter)]
     readonly_fields = ['boxes_on_length', 'boxes_on_breadth', 'boxes_on_height', 'total_boxes',
                       'total_parts_per_trip', 'trip_cost_per_part', 'created_at', 'updated_at']
 
@@ -153,7 +196,8 @@ class TransportAdmin(admin.ModelAdmin):
 @admin.register(QuoteTimeline)
 class QuoteTimelineAdmin(admin.ModelAdmin):
     list_display = ['quote', 'activity_type', 'user', 'created_at']
-    list_filter = ['activity_type', 'created_at', 'quote']
+    list_select_related = ['quote__project', 'user']
+    list_filter = ['activity_type', 'created_at', ('quote', LabelRelatedFieldListFilter)]
     search_fields = ['quote__name', 'description']
     readonly_fields = ['created_at']
 
@@ -211,3 +255,30 @@ class MouldingMachineTypeAdmin(admin.ModelAdmin):
             'fields': ('is_active', 'created_by')
         }),
     )
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'original_name', 'created_by', 'created_at', 'finished_at']
+    list_select_related = ['created_by']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['original_name', 'message']
+    readonly_fields = ['progress', 'message', 'counts', 'errors', 'worker',
+                       'created_at', 'started_at', 'finished_at']
+    raw_id_fields = ['project', 'quote', 'customer_group', 'created_by']
+
+    fieldsets = (
+        ('Import', {
+            'fields': ('kind', 'status', 'file', 'original_name', 'created_by')
+        }),
+        ('Target', {
+            'fields': ('project', 'quote', 'customer_group')
+        }),
+        ('Progress', {
+            'fields': ('progress', 'message', 'worker', 'counts', 'errors')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at', 'started_at', 'finished_at'),
+            'classes': ('collapse',)
+        }),
+    )
@@ -0,0 +1,489 @@
+"""
+Synthetic dataset and hot-path timings for ``manage.py benchmark``.
+
+``seed_dataset`` fills the database with customer groups, config types,
+projects and fully costed quotes. ``run_scenarios`` then times page
+rendering, pricing, the bare cost arithmetic of each section, every Excel
+import, both exporters and the config type propagation signals against it. Each run happens inside a savepoint
+that is rolled back, so every repetition, and every scenario, sees the
+same data. ``explain_patterns`` reports the query plans of the app's most
+frequent lookups for ``manage.py explain_queries``.
+"""
+import io
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .costing import SECTIONS, price_quote, price_section, refresh_many_quote_totals
+from .excel_utils import ExcelParser, ExcelExporter, ExcelTemplateGenerator, ConfigTemplateGenerator
+from .models import (
+    CustomerGroup, MaterialType, MouldingMachineType, AssemblyType, PackagingType, Project, Quote, ImportJob,
+    RawMaterial, MouldingMachineDetail, Assembly, AssemblyRawMaterial, ManufacturingPrintingCost,
+    Packaging, Transport, QuoteTimeline,
+)
+
+
+class Dataset:
+    """What ``seed_dataset`` created, for the scenarios to work on"""
+
+    def __init__(self, user, customer_group, project, quote, counts):
+        self.user = user
+        self.customer_group = customer_group
+        self.project = project
+        self.quote = quote
+        self.counts = counts
+
+
+def _amount(rng, low, high, places=4):
+    return Decimal(f'{rng.uniform(low, high):.{places}f}')
+
+
+def seed_dataset(customer_groups=2, config_types=10, projects=4, quotes_per_project=10, rows=5, seed=0):
+    """
+    Create a costed dataset: ``rows`` rows in every quote section (and per
+    assembly child table) of ``projects * quotes_per_project`` quotes per
+    customer group. Rows reference the config types, so changing a type
+    propagates to them.
+    """
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(f'benchmark-{tag}', is_staff=True, is_superuser=True)
+
+    groups = []
+    for g in range(customer_groups):
+        # Default packaging types are created by the post_save signal
+        group = CustomerGroup.objects.create(
+            name=f'Benchmark {tag} Group {g + 1}', value=f'benchmark-{tag}-{g + 1}', created_by=user)
+        MaterialType.objects.bulk_create([
+            MaterialType(customer_group=group, raw_material_name=f'Material {i + 1}',
+                         raw_material_grade=f'G{i % 5}', raw_material_code=f'RM-{i + 1:04d}',
+                         raw_material_rate=_amount(rng, 80, 300, 2), created_by=user)
+            for i in range(config_types)
+        ])
+        MouldingMachineType.objects.bulk_create([
+            MouldingMachineType(customer_group=group, name=f'Machine {i + 1}',
+                                shift_rate=_amount(rng, 3000, 9000, 2), shift_rate_for_mtc=_amount(rng, 100, 600, 2),
+                                mtc_count=rng.randint(1, 4), created_by=user)
+            for i in range(config_types)
+        ])
+        AssemblyType.objects.bulk_create([
+            AssemblyType(customer_group=group, name=f'Assembly {i + 1}', value=f'asm-{i + 1}', created_by=user)
+            for i in range(config_types)
+        ])
+        groups.append(group)
+
+    for group in groups:
+        material_types = list(MaterialType.objects.filter(customer_group=group))
+        machine_types = list(MouldingMachineType.objects.filter(customer_group=group))
+        assembly_types = list(AssemblyType.objects.filter(customer_group=group))
+        packaging_types = list(PackagingType.objects.filter(customer_group=group))
+
+        for p in range(projects):
+            project = Project.objects.create(name=f'Benchmark {tag} Project {p + 1}', created_by=user)
+            Quote.objects.bulk_create([
+                Quote(project=project, name=f'Quote {q + 1}', client_group=group, client_name='Benchmark',
+                      quantity=rng.choice([500, 1000, 5000, 10000]), created_by=user,
+                      handling_charge=_amount(rng, 0, 50), profit_percentage=_amount(rng, 5, 20),
+                      quote_definition_complete=True)
+                for q in range(quotes_per_project)
+            ])
+            quotes = list(project.quotes.all())
+
+            raw_materials, machines, assemblies, packagings = [], [], [], []
+            for quote in quotes:
+                for r in range(rows):
+                    material_type = rng.choice(material_types)
+                    raw_materials.append(RawMaterial(
+                        quote=quote, material_type=material_type, material_name=material_type.raw_material_name,
+                        grade=material_type.raw_material_grade, rm_code=material_type.raw_material_code,
+                        rm_rate=material_type.raw_material_rate,
+                        unit_of_measurement=rng.choice(['kg', 'kg', 'gm', 'pcs']),
+                        part_weight=_amount(rng, 0.01, 2), runner_weight=_amount(rng, 0, 0.2),
+                        process_losses=_amount(rng, 0, 5), purging_loss_cost=_amount(rng, 0, 2),
+                        frozen_rate=material_type.raw_material_rate if r % 3 == 0 else None,
+                        icc_percentage=_amount(rng, 0, 5), icc_type=rng.choice(['percentage', 'fixed']),
+                        rejection_percentage=_amount(rng, 0, 5), overhead_percentage=_amount(rng, 0, 10),
+                        maintenance_percentage=_amount(rng, 0, 3), profit_percentage=_amount(rng, 0, 15),
+                        other_rm_cost=_amount(rng, 0, 1),
+                    ))
+                    machine_type = rng.choice(machine_types)
+                    machines.append(MouldingMachineDetail(
+                        quote=quote, moulding_machine_type=machine_type, cavity=rng.randint(1, 8),
+                        machine_tonnage=_amount(rng, 50, 800, 0), cycle_time=_amount(rng, 10, 90, 2),
+                        efficiency=_amount(rng, 70, 95, 2), shift_rate=machine_type.shift_rate,
+                        shift_rate_for_mtc=machine_type.shift_rate_for_mtc, mtc_count=machine_type.mtc_count,
+                        rejection_percentage=_amount(rng, 0, 5), overhead_percentage=_amount(rng, 0, 10),
+                        maintenance_percentage=_amount(rng, 0, 3), profit_percentage=_amount(rng, 0, 15),
+                    ))
+                    assembly_type = rng.choice(assembly_types)
+                    assemblies.append(Assembly(
+                        quote=quote, assembly_type_config=assembly_type, name=assembly_type.name,
+                        manual_cost=_amount(rng, 0, 10), other_cost=_amount(rng, 0, 2),
+                        profit_percentage=_amount(rng, 0, 15), rejection_percentage=_amount(rng, 0, 5),
+                        inspection_handling_cost=_amount(rng, 0, 2),
+                    ))
+                    packaging_type = rng.choice(packaging_types)
+                    category = rng.choice(['box', 'polybag'])
+                    packagings.append(Packaging(
+                        quote=quote, packaging_type=packaging_type, packaging_category=category,
+                        packaging_length=packaging_type.default_length, packaging_breadth=packaging_type.default_breadth,
+                        packaging_height=packaging_type.default_height,
+                        polybag_length=packaging_type.default_polybag_length,
+                        polybag_width=packaging_type.default_polybag_width,
+                        rate_per_kg=_amount(rng, 100, 250), polybags_per_kg=_amount(rng, 50, 200, 0),
+                        lifecycle=rng.randint(10, 100), cost=_amount(rng, 100, 900),
+                        maintenance_percentage=_amount(rng, 0, 10), parts_per_packaging=rng.randint(10, 500),
+                    ))
+            RawMaterial.objects.bulk_create(raw_materials)
+            MouldingMachineDetail.objects.bulk_create(machines)
+            Assembly.objects.bulk_create(assemblies)
+            Packaging.objects.bulk_create(packagings)
+
+            # Children need the parents' keys; read them back so any backend works
+            assembly_rows, printing_rows, transports = [], [], []
+            for assembly in Assembly.objects.filter(quote__project=project):
+                for r in range(rows):
+                    assembly_rows.append(AssemblyRawMaterial(
+                        assembly=assembly, description=f'Insert {r + 1}', unit='nos',
+                        production_quantity=_amount(rng, 1, 10, 0), cost_per_unit=_amount(rng, 0.1, 5),
+                    ))
+                    rate, cycle = _amount(rng, 300, 1500), _amount(rng, 5, 60)
+                    printing_rows.append(ManufacturingPrintingCost(
+                        assembly=assembly, process=f'Process {r + 1}', mc_tonnage=_amount(rng, 20, 200, 0),
+                        mc_rate_per_hour=rate, cycle_time=cycle, per_cost=(rate * cycle / 3600).quantize(Decimal('1E-8')),
+                    ))
+            for packaging in Packaging.objects.filter(quote__project=project):
+                transports.append(Transport(
+                    quote_id=packaging.quote_id, packaging=packaging,
+                    transport_length=_amount(rng, 14, 32, 1), transport_breadth=_amount(rng, 6, 8, 1),
+                    transport_height=_amount(rng, 6, 8, 1), trip_cost=_amount(rng, 5000, 30000, 2),
+                    parts_per_box=packaging.parts_per_packaging,
+                ))
+            AssemblyRawMaterial.objects.bulk_create(assembly_rows)
+            ManufacturingPrintingCost.objects.bulk_create(printing_rows)
+            Transport.objects.bulk_create(transports)
+            QuoteTimeline.objects.bulk_create([
+                QuoteTimeline(quote=quote, activity_type='quote_updated', description=f'Benchmark change {r + 1}',
+                              user=user)
+                for quote in quotes for r in range(rows)
+            ])
+
+    benchmark_quotes = Quote.objects.filter(client_group__in=groups)
+    refresh_many_quote_totals(benchmark_quotes.values_list('pk', flat=True))
+
+    quote = benchmark_quotes.order_by('pk').select_related('project', 'client_group').first()
+    counts = {
+        'customer_groups': len(groups),
+        'config_types': config_types * 3 * len(groups),
+        'projects': projects * len(groups),
+        'quotes': benchmark_quotes.count(),
+        'raw_materials': RawMaterial.objects.filter(quote__in=benchmark_quotes).count(),
+        'moulding_machines': MouldingMachineDetail.objects.filter(quote__in=benchmark_quotes).count(),
+        'assemblies': Assembly.objects.filter(quote__in=benchmark_quotes).count(),
+        'packagings': Packaging.objects.filter(quote__in=benchmark_quotes).count(),
+        'transports': Transport.objects.filter(quote__in=benchmark_quotes).count(),
+        'timeline_entries': QuoteTimeline.objects.filter(quote__in=benchmark_quotes).count(),
+    }
+    return Dataset(user, quote.client_group, quote.project, quote, counts)
+
+
+# -----------------------------------------------------------------------------
+# Upload workbooks
+# -----------------------------------------------------------------------------
+
+def _fill_columns(ws, columns, names=None):
+    """Repeat a template's first sample column across ``columns`` columns, dropping the other samples"""
+    sample = [ws.cell(row, 2).value for row in range(1, ws.max_row + 1)]
+    last_column = max(ws.max_column, columns + 1)
+    for offset in range(last_column - 1):
+        for row, value in enumerate(sample, 1):
+            if offset >= columns:
+                value = None
+            elif row == 1 and names is not None:
+                value = names[offset]
+            ws.cell(row, 2 + offset).value = value
+
+
+def _workbook_file(wb, name):
+    output = io.BytesIO()
+    wb.save(output)
+    return name, output.getvalue()
+
+
+def build_upload_files(rows, quotes, config_types):
+    """The bytes of every upload workbook the import scenarios parse"""
+    complete = ExcelTemplateGenerator.create_complete_template()
+    for ws in complete.worksheets:
+        _fill_columns(ws, rows)
+
+    multiple = ExcelTemplateGenerator.create_multiple_quotes_template()
+    names = [f'Imported Quote {i + 1}' for i in range(quotes)]
+    for ws in multiple.worksheets:
+        _fill_columns(ws, quotes, names)
+
+    files = {
+        'complete_quote': _workbook_file(complete, 'complete_quote.xlsx'),
+        'multiple_quotes': _workbook_file(multiple, 'multiple_quotes.xlsx'),
+    }
+    config = {
+        'material_types': (ConfigTemplateGenerator.create_material_types_template, 'Material'),
+        'machine_types': (ConfigTemplateGenerator.create_machine_types_template, 'Machine'),
+        'assembly_types': (ConfigTemplateGenerator.create_assembly_types_template, 'Assembly'),
+        'packaging_types': (ConfigTemplateGenerator.create_packaging_types_template, 'Packaging'),
+    }
+    for kind, (factory, prefix) in config.items():
+        wb = factory()
+        # Existing names, so the upload updates types that quote rows use
+        _fill_columns(wb.active, config_types, [f'{prefix} {i + 1}' for i in range(config_types)])
+        files[kind] = _workbook_file(wb, f'{kind}.xlsx')
+    return files
+
+
+# -----------------------------------------------------------------------------
+# Scenarios
+# -----------------------------------------------------------------------------
+
+def _upload(files, kind):
+    name, content = files[kind]
+    return SimpleUploadedFile(name, content)
+
+
+def _type_change(model, field, step):
+    def run(data):
+        instance = model.objects.filter(customer_group=data.customer_group).order_by('pk').first()
+        setattr(instance, field, getattr(instance, field) + step)
+        instance.save()
+    return run
+
+
+
+def _drop_cost_caches(instance, seen=None):
+    """Drop the memoized costs of ``instance`` and of every related row loaded with it"""
+    seen = set() if seen is None else seen
+    if id(instance) in seen:
+        return
+    seen.add(id(instance))
+    instance.__dict__.pop('_cost_cache', None)
+    for related in instance._state.fields_cache.values():
+        if related is not None:
+            _drop_cost_caches(related, seen)
+    for rows in getattr(instance, '_prefetched_objects_cache', {}).values():
+        for row in rows:
+            _drop_cost_caches(row, seen)
+
+
+def _cost_arithmetic(key=None):
+    """
+    Price one section (or with no ``key``, the whole quote) of a quote whose
+    cost graph is loaded once, on the first (warmup) run. Every run drops the
+    memoized costs first, so it times the Decimal arithmetic and no queries.
+    """
+    loaded = {}
+
+    def run(data):
+        quote = loaded.get(data.quote.pk)
+        if quote is None:
+            quote = loaded[data.quote.pk] = Quote.objects.with_cost_graph().get(pk=data.quote.pk)
+        _drop_cost_caches(quote)
+        if key is None:
+            price_quote(quote)
+        else:
+            price_section(key, getattr(quote, key).all())
+    return run
+
+def build_scenarios(files):
+    """Scenario name -> callable taking the Dataset"""
+    client = Client()
+
+    def page(url_name):
+        def run(data):
+            response = client.get(reverse(url_name, args=[data.project.pk, data.quote.pk]))
+            assert response.status_code == 200, response.status_code
+        return run
+
+    def login(data):
+        client.force_login(data.user)
+
+    scenarios = {
+        'quote_detail': page('quote_detail'),
+        'quote_summary': page('quote_summary'),
+        'get_grand_total': lambda data: Quote.objects.get(pk=data.quote.pk).get_grand_total(),
+        'export_quote': lambda data: ExcelExporter.export_quote(
+            Quote.objects.with_cost_graph().get(pk=data.quote.pk)).save(io.BytesIO()),
+        'export_project': lambda data: ExcelExporter.export_project(data.project, io.BytesIO()),
+    }
+    for section in ('raw_materials', 'moulding_machines', 'assemblies', 'packaging', 'transport'):
+        parse = getattr(ExcelParser, f'parse_{section}')
+        scenarios[f'import_{section}'] = (
+            lambda data, parse=parse: parse(_upload(files, 'complete_quote'), data.quote))
+    scenarios.update({
+        'import_complete_quote': lambda data: ExcelParser.parse_complete_quote(
+            _upload(files, 'complete_quote'), data.quote),
+        'import_multiple_quotes': lambda data: ExcelParser.parse_multiple_quotes_complete(
+            _upload(files, 'multiple_quotes'), data.project, data.customer_group, data.user),
+    })
+    for kind in ('material_types', 'machine_types', 'assembly_types', 'packaging_types'):
+        parse = getattr(ExcelParser, f'parse_{kind}')
+        scenarios[f'import_{kind}'] = (
+            lambda data, parse=parse, kind=kind: parse(_upload(files, kind), data.customer_group))
+    scenarios.update({
+        'signal_material_type': _type_change(MaterialType, 'raw_material_rate', Decimal('1.5')),
+        'signal_machine_type': _type_change(MouldingMachineType, 'shift_rate', Decimal('100')),
+        'signal_assembly_type': _type_change(AssemblyType, 'description', ' (updated)'),
+    })
+    for key, _, _ in SECTIONS:
+        scenarios[f'cost_{key}'] = _cost_arithmetic(key)
+    scenarios['cost_price_quote'] = _cost_arithmetic()
+    return scenarios, login
+
+
+SCENARIO_NAMES = (
+    'quote_detail', 'quote_summary', 'get_grand_total', 'export_quote', 'export_project',
+    'import_raw_materials', 'import_moulding_machines', 'import_assemblies', 'import_packaging',
+    'import_transport', 'import_complete_quote', 'import_multiple_quotes', 'import_material_types',
+    'import_machine_types', 'import_assembly_types', 'import_packaging_types',
+    'signal_material_type', 'signal_machine_type', 'signal_assembly_type',
+    'cost_raw_materials', 'cost_moulding_machines', 'cost_assemblies', 'cost_packagings', 'cost_transports',
+    'cost_price_quote',
+)
+
+
+def _rolled_back(func, data):
+    with transaction.atomic():
+        try:
+            return func(data)
+        finally:
+            transaction.set_rollback(True)
+
+
+def measure(func, data, repeat=5, warmup=1):
+    """
+    Time ``repeat`` runs of ``func`` (after ``warmup`` untimed ones), then
+    one more run counting queries and tracing peak Python memory.
+    """
+    for _ in range(warmup):
+        _rolled_back(func, data)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _rolled_back(func, data)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            _rolled_back(func, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': len(queries.captured_queries),
+        'query_ms': round(sum(float(query['time']) for query in queries.captured_queries) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_scenarios(data, files, names=SCENARIO_NAMES, repeat=5, warmup=1, report=None):
+    """Measure each named scenario against ``data``; ``report(name, result)`` is called as each finishes"""
+    scenarios, login = build_scenarios(files)
+    results = {}
+    # The test client talks to the project as "testserver"
+    with override_settings(ALLOWED_HOSTS=['*']):
+        login(data)
+        for name in names:
+            results[name] = measure(scenarios[name], data, repeat=repeat, warmup=warmup)
+            if report is not None:
+                report(name, results[name])
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Query plans
+# -----------------------------------------------------------------------------
+
+def access_patterns(data):
+    """The app's most frequent lookups as name -> queryset, aimed at ``data``"""
+    group = data.customer_group
+    material_types = list(MaterialType.objects.filter(customer_group=group).values_list('pk', flat=True)[:10])
+    machine_types = list(MouldingMachineType.objects.filter(customer_group=group).values_list('pk', flat=True)[:10])
+    return {
+        # Project page and project export
+        'project_quotes': data.project.quotes.all(),
+        # Project list
+        'active_projects': Project.objects.filter(is_active=True),
+        # Quote page
+        'quote_timeline': data.quote.timeline_entries.all(),
+        # Config page and the quote section forms
+        'material_types': MaterialType.objects.filter(customer_group=group, is_active=True),
+        'machine_types': MouldingMachineType.objects.filter(customer_group=group, is_active=True),
+        'assembly_types': AssemblyType.objects.filter(customer_group=group, is_active=True),
+        'packaging_types': PackagingType.objects.filter(customer_group=group, is_active=True),
+        # Config type propagation signals
+        'material_type_rows': RawMaterial.objects.filter(material_type_id__in=material_types).order_by()
+        .values_list('material_type_id', 'quote_id', 'material_name', 'quote__created_by_id'),
+        'machine_type_rows': MouldingMachineDetail.objects.filter(moulding_machine_type_id__in=machine_types)
+        .order_by().values_list('moulding_machine_type_id', 'quote_id', 'cavity', 'quote__created_by_id'),
+        # Import worker claim
+        'queued_import_jobs': ImportJob.objects.filter(status='queued').order_by('created_at', 'pk')
+        .values_list('pk', flat=True)[:1],
+    }
+
+
+def explain(queryset, label):
+    """
+    Like ``queryset.explain()``, but the statement is tagged with ``label``.
+    SQLite's statement cache otherwise hands back the plan prepared before
+    an index was dropped.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} /* {label} */', params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def explain_patterns(data, repeat=20, label='explain'):
+    """The query plan and median run time of each access pattern"""
+    results = {}
+    for name, queryset in access_patterns(data).items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            # A fresh clone each run, so nothing is served from the result cache
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            'plan': explain(queryset, label),
+            'median_ms': round(statistics.median(timings), 3),
+        }
+    return results
+
+
+@contextmanager
+def dropped_indexes(indexes):
+    """Drop ``(model, index)`` pairs for the duration of the block, then create them again"""
+    editor = connection.schema_editor(collect_sql=True)
+    with connection.cursor() as cursor:
+        for model, index in indexes:
+            cursor.execute(str(index.remove_sql(model, editor)))
+        try:
+            yield
+        finally:
+            for model, index in indexes:
+                cursor.execute(str(index.create_sql(model, editor)))
@@ -0,0 +1,149 @@
+"""
+Copying quotes and whole projects.
+
+A clone copies the quote definition and every component row, including
+assembly children, and points each copied transport at the copy of its
+packaging. Rows are written with one bulk_create per table, so the number
+of queries does not grow with the number of rows (or, for a project, the
+number of quotes). Copies are stamped with the time of the clone but keep
+the relative ``created_at`` order of their originals.
+"""
+from datetime import timedelta
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .models import (
+    Project, Quote, QuoteTimeline, RawMaterial, MouldingMachineDetail, Assembly,
+    AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport,
+)
+
+CLONE_PREFETCH = (
+    models.Prefetch('raw_materials', queryset=RawMaterial.objects.order_by('pk')),
+    models.Prefetch('moulding_machines', queryset=MouldingMachineDetail.objects.order_by('pk')),
+    models.Prefetch('assemblies', queryset=Assembly.objects.order_by('pk').prefetch_related(
+        models.Prefetch('assembly_raw_materials', queryset=AssemblyRawMaterial.objects.order_by('pk')),
+        models.Prefetch('manufacturing_printing_costs', queryset=ManufacturingPrintingCost.objects.order_by('pk')),
+    )),
+    models.Prefetch('packagings', queryset=Packaging.objects.order_by('pk')),
+    models.Prefetch('transports', queryset=Transport.objects.order_by('pk')),
+)
+
+
+def clone_quote(quote, user, project=None, name=None):
+    """
+    Copy ``quote`` with all of its components into ``project`` (its own
+    project by default). The copy starts in progress at version 1.0.
+    """
+    project = project or quote.project
+    source = Quote.objects.select_related('project').prefetch_related(*CLONE_PREFETCH).get(pk=quote.pk)
+    name = name or f'{quote.name} (Copy)'
+    with transaction.atomic():
+        clone, = _clone_quotes([source], project, user, names=[name[:200]])
+    return clone
+
+
+def clone_project(project, user, name=None):
+    """Copy ``project`` with every quote in it"""
+    sources = list(project.quotes.select_related('project').order_by('created_at', 'pk')
+                   .prefetch_related(*CLONE_PREFETCH))
+    with transaction.atomic():
+        clone = Project.objects.create(
+            name=(name or f'{project.name} (Copy)')[:200],
+            description=project.description,
+            created_by=user,
+        )
+        _clone_quotes(sources, clone, user)
+    return clone
+
+
+def _stamped(rows, now):
+    """
+    ``(row, created_at)`` pairs for copies of ``rows``: the newest row's copy
+    gets ``now`` and each older one a microsecond less, so the copies sort
+    like the originals
+    """
+    rows = list(rows)
+    order = sorted(range(len(rows)), key=lambda i: (rows[i].created_at, rows[i].pk))
+    stamps = [None] * len(rows)
+    for rank, i in enumerate(order):
+        stamps[i] = now - timedelta(microseconds=len(rows) - 1 - rank)
+    return list(zip(rows, stamps))
+
+
+def _copy(instance, created_at, **changes):
+    """Unsaved copy of ``instance``'s field values with ``changes`` applied"""
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields if not field.primary_key
+    }
+    values['created_at'] = created_at
+    copy = type(instance)(**values)
+    for field_name, value in changes.items():
+        setattr(copy, field_name, value)
+    return copy
+
+
+def _insert(model, rows):
+    """bulk_create that also sets primary keys on backends that cannot return them"""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(rows)
+    for row in rows:
+        row.save(force_insert=True)
+    return rows
+
+
+def _clone_quotes(sources, project, user, names=None):
+    """Copy prefetched ``sources`` into ``project`` and return the new quotes"""
+    now = timezone.now()
+    names = names or [source.name for source in sources]
+    clones = _insert(Quote, [
+        # Stored totals are copied as-is: the copied rows price the same
+        _copy(source, created_at, project=project, name=name, created_by=user, status='in_progress',
+              major_version=1, minor_version=0)
+        for (source, created_at), name in zip(_stamped(sources, now), names)
+    ])
+
+    raw_materials, machines, assemblies, assembly_raw_materials, printing_costs = [], [], [], [], []
+    packagings, transports, timeline = [], [], []
+    for source, clone in zip(sources, clones):
+        raw_materials += [_copy(row, at, quote=clone) for row, at in _stamped(source.raw_materials.all(), now)]
+        machines += [_copy(row, at, quote=clone) for row, at in _stamped(source.moulding_machines.all(), now)]
+        for assembly, at in _stamped(source.assemblies.all(), now):
+            assembly_copy = _copy(assembly, at, quote=clone)
+            assemblies.append(assembly_copy)
+            assembly_raw_materials += [
+                _copy(row, row_at, assembly=assembly_copy)
+                for row, row_at in _stamped(assembly.assembly_raw_materials.all(), now)]
+            printing_costs += [
+                _copy(row, row_at, assembly=assembly_copy)
+                for row, row_at in _stamped(assembly.manufacturing_printing_costs.all(), now)]
+
+        packaging_copies = {}
+        for packaging, at in _stamped(source.packagings.all(), now):
+            packaging_copies[packaging.pk] = _copy(packaging, at, quote=clone)
+            packagings.append(packaging_copies[packaging.pk])
+        for transport, at in _stamped(source.transports.all(), now):
+            transport_copy = _copy(transport, at, quote=clone)
+            if transport.packaging_id in packaging_copies:
+                transport_copy.packaging = packaging_copies[transport.packaging_id]
+            transports.append(transport_copy)
+
+        timeline.append(QuoteTimeline(
+            quote=clone,
+            activity_type='quote_created',
+            description=f'Quote cloned from "{source.name}" (v{source.get_version()}) '
+                        f'in project "{source.project.name}"',
+            user=user,
+        ))
+
+    # Parents first, so children pick up their new foreign keys
+    RawMaterial.objects.bulk_create(raw_materials)
+    MouldingMachineDetail.objects.bulk_create(machines)
+    _insert(Assembly, assemblies)
+    AssemblyRawMaterial.objects.bulk_create(assembly_raw_materials)
+    ManufacturingPrintingCost.objects.bulk_create(printing_costs)
+    _insert(Packaging, packagings)
+    Transport.objects.bulk_create(transports)
+    QuoteTimeline.objects.bulk_create(timeline)
+    return clones
@@ -0,0 +1,630 @@
+"""
+Quote costing engine.
+
+Prices a quote graph in a single pass and returns an immutable breakdown of
+line items, section subtotals, base cost, profit, handling and grand total.
+Views and exporters should price a quote once per request through
+``price_quote`` instead of calling the ``Quote.get_*`` helpers repeatedly.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+
+from django.db.models import (
+    Case, Count, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Floor, Round
+from django.db.models.lookups import GreaterThan
+
+from .money import ZERO, calculation, divide, quantize, to_decimal, typed_cost
+
+
+# (section key, related name on Quote, display label)
+SECTIONS = (
+    ('raw_materials', 'raw_materials', 'Raw Materials'),
+    ('moulding_machines', 'moulding_machines', 'Moulding Machines'),
+    ('assemblies', 'assemblies', 'Assemblies'),
+    ('packagings', 'packagings', 'Packaging'),
+    ('transports', 'transports', 'Transport'),
+)
+
+
+@dataclass(frozen=True)
+class LineItem:
+    """A single priced component row"""
+    section: str
+    obj: object
+    cost: Decimal
+    details: MappingProxyType
+
+
+@dataclass(frozen=True)
+class SectionCost:
+    """All priced rows of one quote section and their subtotal"""
+    key: str
+    label: str
+    lines: tuple
+    subtotal: Decimal
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def objects(self):
+        """Model instances in this section, in display order"""
+        return [line.obj for line in self.lines]
+
+
+@dataclass(frozen=True)
+class QuoteCostBreakdown:
+    """Immutable cost breakdown for a single quote"""
+    quote: object
+    sections: tuple
+    base_cost: Decimal
+    profit_amount: Decimal
+    handling_charge: Decimal
+    grand_total: Decimal
+
+    def section(self, key):
+        for section in self.sections:
+            if section.key == key:
+                return section
+        raise KeyError(key)
+
+    @property
+    def raw_materials(self):
+        return self.section('raw_materials')
+
+    @property
+    def moulding_machines(self):
+        return self.section('moulding_machines')
+
+    @property
+    def assemblies(self):
+        return self.section('assemblies')
+
+    @property
+    def packagings(self):
+        return self.section('packagings')
+
+    @property
+    def transports(self):
+        return self.section('transports')
+
+    @property
+    def cost_per_part(self):
+        """Grand total divided by quote quantity"""
+        return divide(self.grand_total, self.quote.quantity or 0)
+
+
+def _details(**values):
+    return MappingProxyType({key: to_decimal(value) for key, value in values.items()})
+
+
+@calculation
+def price_raw_material(rm):
+    """Price one RawMaterial row"""
+    details = _details(
+        base_rm_cost=rm.base_rm_cost,
+        rejection_cost=rm.rejection_cost,
+        overhead_cost=rm.overhead_cost,
+        maintenance_cost=rm.maintenance_cost,
+        profit_cost=rm.profit_cost,
+        other_rm_cost=rm.other_rm_cost,
+    )
+    return LineItem('raw_materials', rm, sum(details.values(), ZERO), details)
+
+
+@calculation
+def price_moulding_machine(mm):
+    """Price one MouldingMachineDetail row"""
+    details = _details(
+        base_conversion_cost=mm.base_conversion_cost,
+        rejection_cost=mm.rejection_cost,
+        overhead_cost=mm.overhead_cost,
+        maintenance_cost=mm.machine_maintenance_cost,
+        profit_cost=mm.machine_profit_cost,
+    )
+    return LineItem('moulding_machines', mm, sum(details.values(), ZERO), details)
+
+
+@calculation
+def price_assembly(assembly):
+    """Price one Assembly row"""
+    costs = assembly.calculate_costs()
+    details = _details(**costs)
+    return LineItem('assemblies', assembly, details['total_assembly_cost'], details)
+
+
+@calculation
+def price_packaging(packaging):
+    """Price one Packaging row (cost per part)"""
+    details = _details(
+        maintenance_cost=packaging.maintenance_cost,
+        cost_per_part=packaging.cost_per_part,
+    )
+    return LineItem('packagings', packaging, details['cost_per_part'], details)
+
+
+@calculation
+def price_transport(transport):
+    """Price one Transport row (trip cost per part)"""
+    parts_per_trip = transport.total_parts_per_trip
+    cost = divide(transport.trip_cost, parts_per_trip)
+    details = MappingProxyType({
+        'total_parts_per_trip': parts_per_trip,
+        'trip_cost_per_part': cost,
+    })
+    return LineItem('transports', transport, cost, details)
+
+
+LINE_PRICERS = {
+    'raw_materials': price_raw_material,
+    'moulding_machines': price_moulding_machine,
+    'assemblies': price_assembly,
+    'packagings': price_packaging,
+    'transports': price_transport,
+}
+
+
+@calculation
+def price_section(key, rows):
+    """Price an iterable of component rows belonging to one section"""
+    pricer = LINE_PRICERS[key]
+    label = next(label for section_key, _, label in SECTIONS if section_key == key)
+    lines = tuple(pricer(row) for row in rows)
+    return SectionCost(key, label, lines, sum((line.cost for line in lines), ZERO))
+
+
+def profit_amount(quote, base_cost):
+    """Quote-level profit for a given base cost"""
+    return typed_cost(quote.profit_type, quote.profit_percentage, base_cost)
+
+
+@calculation
+def price_quote(quote, components=None):
+    """
+    Price a whole quote in one pass.
+
+    ``components`` may map section keys to already-loaded rows; any section
+    not supplied is read from the quote's related manager (which uses the
+    prefetch cache when the quote was loaded with one).
+    """
+    components = components or {}
+    sections = []
+    for key, related_name, _ in SECTIONS:
+        rows = components.get(key)
+        if rows is None:
+            rows = getattr(quote, related_name).all()
+        sections.append(price_section(key, rows))
+
+    base_cost = sum((section.subtotal for section in sections), ZERO)
+    profit = profit_amount(quote, base_cost)
+    handling = to_decimal(quote.handling_charge)
+
+    return QuoteCostBreakdown(
+        quote=quote,
+        sections=tuple(sections),
+        base_cost=base_cost,
+        profit_amount=profit,
+        handling_charge=handling,
+        grand_total=base_cost + profit + handling,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Materialized totals stored on Quote
+# -----------------------------------------------------------------------------
+
+# Section key -> Quote column holding its subtotal
+SECTION_TOTAL_FIELDS = {
+    'raw_materials': 'total_raw_material_cost',
+    'moulding_machines': 'total_conversion_cost',
+    'assemblies': 'total_assembly_cost',
+    'packagings': 'total_packaging_cost',
+    'transports': 'total_transport_cost',
+}
+STORED_TOTAL_FIELDS = frozenset(SECTION_TOTAL_FIELDS.values()) | {'base_cost', 'profit_amount', 'grand_total'}
+
+# Quote fields that feed profit and grand total
+PROFIT_INPUT_FIELDS = frozenset({'profit_type', 'profit_percentage', 'handling_charge'})
+
+
+@calculation
+def _totals(subtotals, profit_type, profit_value, handling_charge):
+    """
+    Column values for the given section subtotals and quote financials,
+    rounded as the columns store them. Subtotals are rounded before they are
+    added up, so re-pricing one section on top of the other stored subtotals
+    gives the same values as pricing the whole quote.
+    """
+    values = {field: quantize(subtotal) for field, subtotal in subtotals.items()}
+    base_cost = sum(values.values(), ZERO)
+    profit = typed_cost(profit_type, profit_value, base_cost)
+    values.update(
+        base_cost=base_cost,
+        profit_amount=profit,
+        grand_total=base_cost + profit + to_decimal(handling_charge),
+    )
+    return {field: quantize(value) for field, value in values.items()}
+
+
+def stored_totals(breakdown):
+    """Materialized column values for a priced quote"""
+    quote = breakdown.quote
+    subtotals = {SECTION_TOTAL_FIELDS[section.key]: section.subtotal for section in breakdown.sections}
+    return _totals(subtotals, quote.profit_type, quote.profit_percentage, quote.handling_charge)
+
+
+def apply_quote_totals(quote):
+    """Recompute base, profit and grand total from the subtotals held in memory"""
+    subtotals = {field: to_decimal(getattr(quote, field)) for field in SECTION_TOTAL_FIELDS.values()}
+    for field, value in _totals(subtotals, quote.profit_type, quote.profit_percentage,
+                                quote.handling_charge).items():
+        setattr(quote, field, value)
+
+
+def _section_queryset(key):
+    """All rows of one section, loaded with what pricing them needs"""
+    from .models import RawMaterial, MouldingMachineDetail, Assembly, Packaging, Transport
+
+    if key == 'raw_materials':
+        return RawMaterial.objects.all()
+    if key == 'moulding_machines':
+        return MouldingMachineDetail.objects.all()
+    if key == 'assemblies':
+        return Assembly.objects.prefetch_related(
+            'assembly_raw_materials', 'manufacturing_printing_costs'
+        )
+    if key == 'packagings':
+        return Packaging.objects.all()
+    if key == 'transports':
+        return Transport.objects.select_related('packaging')
+    raise KeyError(key)
+
+
+def section_rows(key, quote_id):
+    """Fresh rows of one section of a quote, loaded with what pricing them needs"""
+    return _section_queryset(key).filter(quote_id=quote_id)
+
+
+def refresh_quote_totals(quote, sections=None):
+    """
+    Bring a quote's materialized totals up to date.
+
+    Only the sections listed are re-priced from their child rows (all of them
+    when ``sections`` is None); the other subtotals are taken from the stored
+    columns, so a single child edit costs one section read and one UPDATE.
+    ``quote`` may be an instance (whose attributes are refreshed too) or a pk.
+    Returns the written values, or None if the quote no longer exists.
+    """
+    from .models import Quote
+
+    quote_id = getattr(quote, 'pk', quote)
+    keys = tuple(SECTION_TOTAL_FIELDS) if sections is None else tuple(sections)
+
+    stored = Quote.objects.filter(pk=quote_id).values(
+        'profit_type', 'profit_percentage', 'handling_charge', *SECTION_TOTAL_FIELDS.values()
+    ).first()
+    if stored is None:
+        return None
+
+    subtotals = {field: stored[field] for field in SECTION_TOTAL_FIELDS.values()}
+    for key in keys:
+        subtotals[SECTION_TOTAL_FIELDS[key]] = price_section(key, section_rows(key, quote_id)).subtotal
+
+    values = _totals(subtotals, stored['profit_type'], stored['profit_percentage'], stored['handling_charge'])
+    Quote.objects.filter(pk=quote_id).update(**values)
+
+    if isinstance(quote, Quote):
+        for field, value in values.items():
+            setattr(quote, field, value)
+    return values
+
+
+def refresh_many_quote_totals(quote_ids, sections=None, batch_size=500):
+    """
+    ``refresh_quote_totals`` for many quotes at once: each chunk of quotes
+    costs one read of the stored values, one read per re-priced section and
+    one bulk UPDATE, however many quotes it holds. Returns the number of
+    quotes written.
+    """
+    from .models import Quote
+
+    keys = tuple(SECTION_TOTAL_FIELDS) if sections is None else tuple(sections)
+    quote_ids = sorted(set(quote_ids))
+    written = 0
+    for start in range(0, len(quote_ids), batch_size):
+        chunk = quote_ids[start:start + batch_size]
+        stored = Quote.objects.filter(pk__in=chunk).values(
+            'pk', 'profit_type', 'profit_percentage', 'handling_charge', *SECTION_TOTAL_FIELDS.values()
+        )
+        subtotals = {row['pk']: {field: row[field] for field in SECTION_TOTAL_FIELDS.values()} for row in stored}
+        for key in keys:
+            rows_by_quote = {}
+            for row in _section_queryset(key).filter(quote_id__in=subtotals):
+                rows_by_quote.setdefault(row.quote_id, []).append(row)
+            for quote_id, quote_subtotals in subtotals.items():
+                quote_subtotals[SECTION_TOTAL_FIELDS[key]] = price_section(
+                    key, rows_by_quote.get(quote_id, ())).subtotal
+
+        quotes = [
+            Quote(pk=row['pk'], **_totals(subtotals[row['pk']], row['profit_type'],
+                                          row['profit_percentage'], row['handling_charge']))
+            for row in stored
+        ]
+        Quote.objects.bulk_update(quotes, sorted(STORED_TOTAL_FIELDS))
+        written += len(quotes)
+    return written
+
+
+# -----------------------------------------------------------------------------
+# Database-side pricing
+#
+# The same formulas as the model properties, expressed as ORM expressions so
+# lists can show live totals without loading child rows. Arithmetic runs in
+# double precision (every operand is cast to float) because SQLite stores
+# whole-number decimals as integers and would otherwise divide them as such.
+# -----------------------------------------------------------------------------
+
+def _num(path):
+    return Cast(path, FloatField())
+
+
+def _lit(value):
+    return Value(float(value), output_field=FloatField())
+
+
+def _typed_cost(prefix, value_field, type_field, base):
+    """Fixed value, or a percentage of ``base``, depending on a *_type field"""
+    return Case(
+        When(**{f'{prefix}{type_field}': 'fixed'}, then=_num(f'{prefix}{value_field}')),
+        default=base * _num(f'{prefix}{value_field}') / _lit(100),
+        output_field=FloatField(),
+    )
+
+
+def raw_material_cost_expression(prefix=''):
+    """RawMaterial.rm_cost"""
+    net = _num(f'{prefix}part_weight') + _num(f'{prefix}runner_weight')
+    gross = net + _num(f'{prefix}process_losses') * net / _lit(100) \
+        + _num(f'{prefix}purging_loss_cost') * net / _lit(100)
+    uom = f'{prefix}unit_of_measurement'
+    grams = Case(
+        When(**{uom: 'kg'}, then=gross * _lit(1000)),
+        When(**{uom: 'ton'}, then=gross * _lit(1000000)),
+        When(**{uom: 'pcs'}, then=_lit(0)),
+        default=gross,
+        output_field=FloatField(),
+    )
+    is_pcs = Q(**{uom: 'pcs'})
+
+    base_without_icc = Case(
+        When(is_pcs, then=gross * _num(f'{prefix}rm_rate')),
+        default=grams * _num(f'{prefix}rm_rate') / _lit(1000),
+        output_field=FloatField(),
+    )
+    base = base_without_icc + _typed_cost(prefix, 'icc_percentage', 'icc_type', base_without_icc)
+
+    # Profit is worked out on the frozen rate when one is set
+    rate = Case(
+        When(Q(**{f'{prefix}frozen_rate__isnull': False}) & ~Q(**{f'{prefix}frozen_rate': 0}),
+             then=_num(f'{prefix}frozen_rate')),
+        default=_num(f'{prefix}rm_rate'),
+        output_field=FloatField(),
+    )
+    weight = Case(When(is_pcs, then=gross), default=grams, output_field=FloatField())
+    scale = Case(When(is_pcs, then=_lit(1)), default=_lit(1000), output_field=FloatField())
+    icc = _num(f'{prefix}icc_percentage')
+    profit_pct = _num(f'{prefix}profit_percentage')
+    profit = Case(
+        When(**{f'{prefix}profit_type': 'fixed'}, then=profit_pct),
+        When(**{f'{prefix}icc_type': 'fixed'},
+             then=(weight * rate + icc) * profit_pct / _lit(100) / scale),
+        default=weight * rate * (_lit(1) + icc / _lit(100)) * profit_pct / _lit(100) / scale,
+        output_field=FloatField(),
+    )
+
+    return (
+        base
+        + _typed_cost(prefix, 'rejection_percentage', 'rejection_type', base)
+        + _typed_cost(prefix, 'overhead_percentage', 'overhead_type', base)
+        + _typed_cost(prefix, 'maintenance_percentage', 'maintenance_type', base)
+        + profit
+        + _num(f'{prefix}other_rm_cost')
+    )
+
+
+def moulding_machine_cost_expression(prefix=''):
+    """MouldingMachineDetail.conversion_cost"""
+    # 8-hour shift = 28800 seconds; rounded to 4 places like the model
+    parts = Case(
+        When(Q(**{f'{prefix}cycle_time__gt': 0, f'{prefix}efficiency__gt': 0}),
+             then=Round(_lit(28800) * _num(f'{prefix}efficiency') / _lit(100)
+                        / _num(f'{prefix}cycle_time') * _num(f'{prefix}cavity') * _lit(10000)) / _lit(10000)),
+        default=_lit(0),
+        output_field=FloatField(),
+    )
+    shift_cost = _num(f'{prefix}shift_rate') + _num(f'{prefix}mtc_count') * _num(f'{prefix}shift_rate_for_mtc')
+    base = Case(
+        When(GreaterThan(parts, 0), then=shift_cost / parts),
+        default=_lit(0),
+        output_field=FloatField(),
+    )
+    return (
+        base
+        + _typed_cost(prefix, 'rejection_percentage', 'rejection_type', base)
+        + _typed_cost(prefix, 'overhead_percentage', 'overhead_type', base)
+        + _typed_cost(prefix, 'maintenance_percentage', 'maintenance_type', base)
+        + _typed_cost(prefix, 'profit_percentage', 'profit_type', base)
+    )
+
+
+def assembly_factor_expression(prefix=''):
+    """Multiplier applied to an assembly's base cost (1 + profit% + rejection%)"""
+    return _lit(1) + _num(f'{prefix}profit_percentage') / _lit(100) \
+        + _num(f'{prefix}rejection_percentage') / _lit(100)
+
+
+def assembly_own_cost_expression(prefix=''):
+    """Part of Assembly.total_assembly_cost that does not depend on child rows"""
+    return (
+        _num(f'{prefix}manual_cost') * assembly_factor_expression(prefix)
+        + _num(f'{prefix}other_cost')
+        + _num(f'{prefix}inspection_handling_cost')
+    )
+
+
+def assembly_raw_material_cost_expression(prefix=''):
+    """AssemblyRawMaterial.total_cost, scaled by the parent assembly factor"""
+    return Case(
+        When(**{f'{prefix}production_quantity__gt': 0},
+             then=_num(f'{prefix}cost_per_unit') * _num(f'{prefix}production_quantity')),
+        default=_lit(0),
+        output_field=FloatField(),
+    ) * assembly_factor_expression(f'{prefix}assembly__')
+
+
+def printing_cost_expression(prefix=''):
+    """ManufacturingPrintingCost.per_cost, scaled by the parent assembly factor"""
+    return _num(f'{prefix}per_cost') * assembly_factor_expression(f'{prefix}assembly__')
+
+
+def packaging_cost_expression(prefix=''):
+    """Packaging.cost_per_part"""
+    parts = _num(f'{prefix}parts_per_packaging')
+    return Case(
+        When(Q(**{f'{prefix}packaging_category': 'polybag',
+                  f'{prefix}polybags_per_kg__gt': 0, f'{prefix}parts_per_packaging__gt': 0}),
+             then=_num(f'{prefix}rate_per_kg') / (_num(f'{prefix}polybags_per_kg') * parts)),
+        When(Q(**{f'{prefix}lifecycle__gt': 0, f'{prefix}parts_per_packaging__gt': 0})
+             & ~Q(**{f'{prefix}packaging_category': 'polybag'}),
+             then=(_num(f'{prefix}cost')
+                   + _num(f'{prefix}cost') * _num(f'{prefix}maintenance_percentage') / _lit(100))
+             / _num(f'{prefix}lifecycle') / parts),
+        default=_lit(0),
+        output_field=FloatField(),
+    )
+
+
+def transport_cost_expression(prefix=''):
+    """Transport.trip_cost_per_part"""
+    # The epsilon keeps exact fits (e.g. 10 ft of 304.8 mm boxes) from flooring
+    # one box short in binary floating point
+    def boxes(dimension):
+        packaging_dimension = f'{prefix}packaging__packaging_{dimension}'
+        return Case(
+            When(Q(**{f'{prefix}transport_{dimension}__gt': 0, f'{packaging_dimension}__gt': 0}),
+                 then=Floor(_num(f'{prefix}transport_{dimension}') * _lit('304.8') / _num(packaging_dimension)
+                            + _lit('1e-9'))),
+            default=_lit(0),
+            output_field=FloatField(),
+        )
+
+    parts_per_trip = boxes('length') * boxes('breadth') * boxes('height') * _num(f'{prefix}parts_per_box')
+    return Case(
+        When(GreaterThan(parts_per_trip, 0), then=_num(f'{prefix}trip_cost') / parts_per_trip),
+        default=_lit(0),
+        output_field=FloatField(),
+    )
+
+
+def quote_factor_expression(prefix=''):
+    """Multiplier from base cost to base + profit for percentage-profit quotes"""
+    return Case(
+        When(**{f'{prefix}profit_type': 'fixed'}, then=_lit(1)),
+        default=_lit(1) + _num(f'{prefix}profit_percentage') / _lit(100),
+        output_field=FloatField(),
+    )
+
+
+def _section_sources():
+    """(section key, child model, path from the child to its quote, row cost expression)"""
+    from .models import (
+        RawMaterial, MouldingMachineDetail, Assembly, AssemblyRawMaterial,
+        ManufacturingPrintingCost, Packaging, Transport,
+    )
+    return (
+        ('raw_materials', RawMaterial, 'quote', raw_material_cost_expression()),
+        ('moulding_machines', MouldingMachineDetail, 'quote', moulding_machine_cost_expression()),
+        ('assemblies', Assembly, 'quote', assembly_own_cost_expression()),
+        ('assemblies', AssemblyRawMaterial, 'assembly__quote', assembly_raw_material_cost_expression()),
+        ('assemblies', ManufacturingPrintingCost, 'assembly__quote', printing_cost_expression()),
+        ('packagings', Packaging, 'quote', packaging_cost_expression()),
+        ('transports', Transport, 'quote', transport_cost_expression()),
+    )
+
+
+def _child_sum(model, outer_path, expression):
+    """Correlated subquery summing ``expression`` over child rows of the outer row"""
+    rows = model.objects.filter(**{outer_path: OuterRef('pk')}).order_by()
+    subquery = rows.values(outer_path).annotate(total=Sum(expression)).values('total')[:1]
+    return Coalesce(Subquery(subquery, output_field=FloatField()), _lit(0), output_field=FloatField())
+
+
+def _child_count(model, outer_path):
+    rows = model.objects.filter(**{outer_path: OuterRef('pk')}).order_by()
+    subquery = rows.values(outer_path).annotate(total=Count('pk')).values('total')[:1]
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0), output_field=IntegerField())
+
+
+def quote_total_annotations():
+    """
+    Annotations for a Quote queryset: ``<section>_count`` and ``live_<column>``
+    for every materialized total column, priced from the child tables.
+    """
+    section_totals = {}
+    counts = {}
+    for key, model, quote_path, expression in _section_sources():
+        subtotal = _child_sum(model, quote_path, expression)
+        section_totals[key] = section_totals[key] + subtotal if key in section_totals else subtotal
+        if quote_path == 'quote':
+            counts[f'{key}_count'] = _child_count(model, quote_path)
+
+    base = sum(section_totals.values(), _lit(0))
+    profit = Case(
+        When(profit_type='fixed', then=_num('profit_percentage')),
+        default=base * _num('profit_percentage') / _lit(100),
+        output_field=FloatField(),
+    )
+    annotations = {f'live_{SECTION_TOTAL_FIELDS[key]}': value for key, value in section_totals.items()}
+    annotations.update(
+        live_base_cost=base,
+        live_profit_amount=profit,
+        live_grand_total=base + profit + _num('handling_charge'),
+        **counts,
+    )
+    return annotations
+
+
+def project_total_annotations():
+    """
+    Annotations for a Project queryset: ``quotes_count``, ``live_<column>``
+    section totals and ``live_grand_total`` summed over all of its quotes.
+    """
+    from .models import Quote
+
+    section_totals = {}
+    grand_total = _child_sum(
+        Quote, 'project',
+        Case(When(profit_type='fixed', then=_num('profit_percentage')), default=_lit(0),
+             output_field=FloatField()) + _num('handling_charge'),
+    )
+    for key, model, quote_path, expression in _section_sources():
+        project_path = f'{quote_path}__project'
+        subtotal = _child_sum(model, project_path, expression)
+        section_totals[key] = section_totals[key] + subtotal if key in section_totals else subtotal
+        # Percentage profit scales each quote's base cost, so weight the rows by their quote
+        grand_total = grand_total + _child_sum(
+            model, project_path, expression * quote_factor_expression(f'{quote_path}__'))
+
+    annotations = {f'live_{SECTION_TOTAL_FIELDS[key]}': value for key, value in section_totals.items()}
+    annotations.update(
+        quotes_count=_child_count(Quote, 'project'),
+        live_base_cost=sum(section_totals.values(), _lit(0)),
+        live_grand_total=grand_total,
+    )
+    return annotations
@@ -0,0 +1,82 @@
+"""
+Static upload templates served from memory.
+
+Each template workbook is built at most once per process and its bytes kept
+for every later download. ``manage.py build_excel_templates`` writes them to
+``EXCEL_TEMPLATE_DIR`` at deploy time; processes load those files instead of
+building, so all workers serve identical bytes (and ETags).
+"""
+import hashlib
+import io
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .excel_utils import ExcelTemplateGenerator, ConfigTemplateGenerator
+
+CachedTemplate = namedtuple('CachedTemplate', ['filename', 'content', 'etag', 'last_modified'])
+
+# Template name -> (download filename, workbook factory)
+TEMPLATES = {
+    'raw_materials': ('raw_materials_template.xlsx', ExcelTemplateGenerator.create_raw_materials_template),
+    'moulding_machines': ('moulding_machines_template.xlsx',
+                          ExcelTemplateGenerator.create_moulding_machines_template),
+    'complete_quote': ('complete_quote_template.xlsx', ExcelTemplateGenerator.create_complete_template),
+    'multiple_quotes': ('multiple_quotes_template.xlsx', ExcelTemplateGenerator.create_multiple_quotes_template),
+    'material_types': ('material_types_template.xlsx', ConfigTemplateGenerator.create_material_types_template),
+    'machine_types': ('machine_types_template.xlsx', ConfigTemplateGenerator.create_machine_types_template),
+    'assembly_types': ('assembly_types_template.xlsx', ConfigTemplateGenerator.create_assembly_types_template),
+    'packaging_types': ('packaging_types_template.xlsx', ConfigTemplateGenerator.create_packaging_types_template),
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def build_template(name):
+    """Generate the workbook bytes of a template"""
+    _, factory = TEMPLATES[name]
+    output = io.BytesIO()
+    factory().save(output)
+    return output.getvalue()
+
+
+def template_path(name):
+    return Path(settings.EXCEL_TEMPLATE_DIR) / TEMPLATES[name][0]
+
+
+def get_template(name):
+    """The cached bytes of a template, loading or building them on first use"""
+    template = _cache.get(name)
+    if template is None:
+        with _lock:
+            template = _cache.get(name)
+            if template is None:
+                template = _cache[name] = _load_template(name)
+    return template
+
+
+def _load_template(name):
+    path = template_path(name)
+    try:
+        content = path.read_bytes()
+        modified = datetime.fromtimestamp(path.stat().st_mtime, tz=dt_timezone.utc)
+    except FileNotFoundError:
+        content = build_template(name)
+        modified = timezone.now()
+    return CachedTemplate(
+        filename=TEMPLATES[name][0],
+        content=content,
+        etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        # HTTP dates have one-second resolution
+        last_modified=modified.replace(microsecond=0),
+    )
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
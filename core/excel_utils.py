@@ -1,13 +1,19 @@
 import openpyxl
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from core.models import (
-    Quote, RawMaterial, MouldingMachineDetail, Assembly,
+    Quote, RawMaterial, MouldingMachineDetail, Assembly, AssemblyType,
     AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport
 )
-import tempfile
-import os
+from core.costing import SECTIONS, price_quote, refresh_many_quote_totals, refresh_quote_totals, section_rows
+from core.signals import (
+    EXPORTED_TYPE_FIELDS, TYPE_PROPAGATIONS, invalidate_type_exports, propagate_type_update, propagation_batch,
+)
+from decimal import Context, Decimal, InvalidOperation
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
 
 
 class ExcelTemplateGenerator:
@@ -29,11 +35,11 @@ class ExcelTemplateGenerator:
         ws.column_dimensions['A'].width = 35
 
     @staticmethod
-    def create_raw_materials_template():
+    def create_raw_materials_template(ws=None):
         """Create template for raw materials upload (vertical format)"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Raw Materials"
+        if ws is None:
+            ws = Workbook().active
+            ws.title = "Raw Materials"
 
         headers = [
             'Material Name*',
@@ -77,14 +83,14 @@ class ExcelTemplateGenerator:
                 ws.cell(row=row_num, column=col_num, value=value)
             ws.column_dimensions[get_column_letter(col_num)].width = 18
 
-        return wb
+        return ws.parent
 
     @staticmethod
-    def create_moulding_machines_template():
+    def create_moulding_machines_template(ws=None):
         """Create template for moulding machines upload (vertical format)"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Moulding Machines"
+        if ws is None:
+            ws = Workbook().active
+            ws.title = "Moulding Machines"
 
         headers = [
             'Cavity*',
@@ -121,14 +127,14 @@ class ExcelTemplateGenerator:
                 ws.cell(row=row_num, column=col_num, value=value)
             ws.column_dimensions[get_column_letter(col_num)].width = 15
 
-        return wb
+        return ws.parent
 
     @staticmethod
-    def create_assemblies_template():
+    def create_assemblies_template(ws=None):
         """Create template for assemblies upload (vertical format)"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Assemblies"
+        if ws is None:
+            ws = Workbook().active
+            ws.title = "Assemblies"
 
         headers = [
             'Assembly Name*',
@@ -159,19 +165,19 @@ class ExcelTemplateGenerator:
                 ws.cell(row=row_num, column=col_num, value=value)
             ws.column_dimensions[get_column_letter(col_num)].width = 20
 
-        return wb
+        return ws.parent
 
     @staticmethod
-    def create_packaging_template():
+    def create_packaging_template(ws=None):
         """Create template for packaging upload (vertical format)
 
         Note: Fill only the fields relevant to your packaging category:
         - For BOX: Fill rows 5-9 (Length, Breadth, Height, Cost, Lifecycle)
         - For POLYBAG: Fill rows 11-14 (Polybag Length, Polybag Width, Rate per kg, Polybags per kg)
         """
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Packaging"
+        if ws is None:
+            ws = Workbook().active
+            ws.title = "Packaging"
 
         headers = [
             'Packaging Category* (box/polybag)',
@@ -207,14 +213,14 @@ class ExcelTemplateGenerator:
         ws.cell(row=4, column=4, value="← BOX: Fill rows 5-9 →").font = Font(italic=True, color="666666")
         ws.cell(row=10, column=4, value="← POLYBAG: Fill rows 11-14 →").font = Font(italic=True, color="666666")
 
-        return wb
+        return ws.parent
 
     @staticmethod
-    def create_transport_template():
+    def create_transport_template(ws=None):
         """Create template for transport upload (vertical format)"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Transport"
+        if ws is None:
+            ws = Workbook().active
+            ws.title = "Transport"
 
         headers = [
             'Length (ft)*',
@@ -237,7 +243,7 @@ class ExcelTemplateGenerator:
                 ws.cell(row=row_num, column=col_num, value=value)
             ws.column_dimensions[get_column_letter(col_num)].width = 15
 
-        return wb
+        return ws.parent
 
     @staticmethod
     def create_complete_template():
@@ -269,60 +275,11 @@ class ExcelTemplateGenerator:
         ws_inst.column_dimensions['A'].width = 100
 
         # Add each component sheet
-        wb_rm = ExcelTemplateGenerator.create_raw_materials_template()
-        ws_rm = wb.create_sheet("Raw Materials")
-        for row in wb_rm.active.iter_rows():
-            for cell in row:
-                ws_rm[cell.coordinate].value = cell.value
-                if cell.has_style:
-                    ws_rm[cell.coordinate].font = cell.font.copy()
-                    ws_rm[cell.coordinate].fill = cell.fill.copy()
-                    ws_rm[cell.coordinate].alignment = cell.alignment.copy()
-        ws_rm.column_dimensions['A'].width = 35
-
-        wb_mm = ExcelTemplateGenerator.create_moulding_machines_template()
-        ws_mm = wb.create_sheet("Moulding Machines")
-        for row in wb_mm.active.iter_rows():
-            for cell in row:
-                ws_mm[cell.coordinate].value = cell.value
-                if cell.has_style:
-                    ws_mm[cell.coordinate].font = cell.font.copy()
-                    ws_mm[cell.coordinate].fill = cell.fill.copy()
-                    ws_mm[cell.coordinate].alignment = cell.alignment.copy()
-        ws_mm.column_dimensions['A'].width = 35
-
-        wb_asm = ExcelTemplateGenerator.create_assemblies_template()
-        ws_asm = wb.create_sheet("Assemblies")
-        for row in wb_asm.active.iter_rows():
-            for cell in row:
-                ws_asm[cell.coordinate].value = cell.value
-                if cell.has_style:
-                    ws_asm[cell.coordinate].font = cell.font.copy()
-                    ws_asm[cell.coordinate].fill = cell.fill.copy()
-                    ws_asm[cell.coordinate].alignment = cell.alignment.copy()
-        ws_asm.column_dimensions['A'].width = 35
-
-        wb_pkg = ExcelTemplateGenerator.create_packaging_template()
-        ws_pkg = wb.create_sheet("Packaging")
-        for row in wb_pkg.active.iter_rows():
-            for cell in row:
-                ws_pkg[cell.coordinate].value = cell.value
-                if cell.has_style:
-                    ws_pkg[cell.coordinate].font = cell.font.copy()
-                    ws_pkg[cell.coordinate].fill = cell.fill.copy()
-                    ws_pkg[cell.coordinate].alignment = cell.alignment.copy()
-        ws_pkg.column_dimensions['A'].width = 35
-
-        wb_trans = ExcelTemplateGenerator.create_transport_template()
-        ws_trans = wb.create_sheet("Transport")
-        for row in wb_trans.active.iter_rows():
-            for cell in row:
-                ws_trans[cell.coordinate].value = cell.value
-                if cell.has_style:
-                    ws_trans[cell.coordinate].font = cell.font.copy()
-                    ws_trans[cell.coordinate].fill = cell.fill.copy()
-                    ws_trans[cell.coordinate].alignment = cell.alignment.copy()
-        ws_trans.column_dimensions['A'].width = 35
+        ExcelTemplateGenerator.create_raw_materials_template(wb.create_sheet("Raw Materials"))
+        ExcelTemplateGenerator.create_moulding_machines_template(wb.create_sheet("Moulding Machines"))
+        ExcelTemplateGenerator.create_assemblies_template(wb.create_sheet("Assemblies"))
+        ExcelTemplateGenerator.create_packaging_template(wb.create_sheet("Packaging"))
+        ExcelTemplateGenerator.create_transport_template(wb.create_sheet("Transport"))
 
         return wb
 
@@ -565,13 +522,372 @@ class ExcelTemplateGenerator:
         return wb
 
 
+class SheetValues:
+    """
+    Cell values of one uploaded worksheet, stored column by column with
+    trailing empty cells dropped. Mirrors the 1-based ``ws.cell(row, col)``
+    addressing the parsers use, without keeping any cell or style objects.
+    """
+
+    def __init__(self, title, columns):
+        self.title = title
+        self.columns = columns
+
+    @classmethod
+    def from_worksheet(cls, ws):
+        """Stream a read-only worksheet once and transpose it"""
+        # Ignore the stored dimensions: formatted-but-empty ranges can claim
+        # thousands of columns, and read-only rows are padded out to them
+        ws.reset_dimensions()
+        rows = []
+        for row in ws.iter_rows(values_only=True):
+            end = len(row)
+            while end and row[end - 1] is None:
+                end -= 1
+            rows.append(row[:end])
+        while rows and not rows[-1]:
+            rows.pop()
+
+        width = max((len(row) for row in rows), default=0)
+        columns = []
+        for index in range(width):
+            column = [row[index] if index < len(row) else None for row in rows]
+            while column and column[-1] is None:
+                column.pop()
+            columns.append(tuple(column))
+        return cls(ws.title, columns)
+
+    @property
+    def max_column(self):
+        return len(self.columns)
+
+    @property
+    def max_row(self):
+        return max((len(column) for column in self.columns), default=0)
+
+    def column(self, column):
+        """All values of a 1-based column, top to bottom"""
+        if 1 <= column <= len(self.columns):
+            return self.columns[column - 1]
+        return ()
+
+    def value(self, row, column):
+        """Value at a 1-based (row, column), or None outside the data"""
+        values = self.column(column)
+        if 1 <= row <= len(values):
+            return values[row - 1]
+        return None
+
+
+class UploadedWorkbook:
+    """
+    An uploaded workbook read in openpyxl's read-only streaming mode. Every
+    sheet is pulled once into a SheetValues and the file is closed straight
+    away, so parsers never hold the full cell/style object model in memory.
+    """
+
+    def __init__(self, file):
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            self.sheets = {ws.title: SheetValues.from_worksheet(ws) for ws in wb.worksheets}
+        finally:
+            wb.close()
+
+    @property
+    def sheetnames(self):
+        return list(self.sheets)
+
+    def __contains__(self, name):
+        return name in self.sheets
+
+    def __getitem__(self, name):
+        return self.sheets[name]
+
+
+# Rows per INSERT statement when writing imported components
+IMPORT_BATCH_SIZE = 500
+
+
+def validate_import_row(instance):
+    """
+    Reject values the database would refuse on insert (bad numbers, decimals
+    that overflow the column, over-long strings), so a single bad column
+    cannot abort a whole bulk write. Accepted values are replaced by what
+    the database would store, so an unsaved row prices exactly like a
+    saved one.
+    """
+    for field in instance._meta.concrete_fields:
+        if field.primary_key or field.is_relation or getattr(field, 'auto_now', False):
+            continue
+        value = getattr(instance, field.attname)
+        if value is None:
+            if not field.null:
+                raise ValueError(f'{field.verbose_name} is required')
+            continue
+        value = field.to_python(value)
+        if isinstance(field, models.DecimalField):
+            try:
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places),
+                                       context=Context(prec=field.max_digits))
+            except InvalidOperation:
+                raise ValueError(
+                    f'{field.verbose_name} must have at most {field.max_digits - field.decimal_places} '
+                    f'digits before the decimal point')
+        elif field.max_length and isinstance(value, str) and len(value) > field.max_length:
+            raise ValueError(f'{field.verbose_name} must be at most {field.max_length} characters')
+        setattr(instance, field.attname, value)
+
+
+class ComponentBatch:
+    """
+    Collects imported quote components in memory and writes them with
+    bulk_create in a single transaction, refreshing each affected quote's
+    stored totals once instead of once per row.
+    """
+
+    SECTION_KEYS = {
+        RawMaterial: 'raw_materials',
+        MouldingMachineDetail: 'moulding_machines',
+        Assembly: 'assemblies',
+        Packaging: 'packagings',
+        Transport: 'transports',
+    }
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = {}
+
+    def add(self, instance):
+        """Validate a component and queue it for insertion"""
+        validate_import_row(instance)
+        self.rows.setdefault(type(instance), []).append(instance)
+        return instance
+
+    def count(self, model):
+        return len(self.rows.get(model, ()))
+
+    def save(self):
+        """Insert all queued components and refresh the totals of the quotes they belong to"""
+        quotes = {}
+        with transaction.atomic():
+            for model, instances in self.rows.items():
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                for instance in instances:
+                    quote, sections = quotes.setdefault(instance.quote_id, (instance.quote, set()))
+                    sections.add(self.SECTION_KEYS[model])
+            for quote, sections in quotes.values():
+                refresh_quote_totals(quote, sections=sections)
+        self.rows = {}
+
+    def save_quotes(self, quotes):
+        """
+        Insert unsaved ``quotes`` with their queued components in a single
+        transaction, each quote under its own savepoint: a quote that fails
+        to insert is rolled back alone and the rest commit together. Returns
+        the saved quotes and ``(quote, error)`` pairs for the others.
+        """
+        queued = self._queued_by_quote()
+        saved, failed = [], []
+        with transaction.atomic():
+            for quote in quotes:
+                try:
+                    with transaction.atomic():
+                        quote.save()
+                        for model, instances in queued.get(id(quote), {}).items():
+                            model.objects.bulk_create(instances, batch_size=self.batch_size)
+                except DatabaseError as e:
+                    quote.pk = None
+                    quote._state.adding = True
+                    failed.append((quote, e))
+                else:
+                    saved.append(quote)
+            refresh_many_quote_totals([quote.pk for quote in saved])
+        self.rows = {}
+        return saved, failed
+
+    def queued_counts(self):
+        """Number of queued rows per model for each quote, keyed by ``id(quote)``"""
+        return {
+            quote: {model: len(instances) for model, instances in models_rows.items()}
+            for quote, models_rows in self._queued_by_quote().items()
+        }
+
+    def _queued_by_quote(self):
+        queued = {}
+        for model, instances in self.rows.items():
+            for instance in instances:
+                queued.setdefault(id(instance.quote), {}).setdefault(model, []).append(instance)
+        return queued
+
+    def preview(self, quotes):
+        """
+        Price ``quotes`` through the cost engine as if the queued components
+        had been saved, without writing anything. Saved quotes keep their
+        existing rows. Returns one summary dict per quote.
+        """
+        queued = self._queued_by_quote()
+        previews = []
+        for quote in quotes:
+            added = {self.SECTION_KEYS[model]: rows for model, rows in queued.get(id(quote), {}).items()}
+            components = {
+                key: (list(section_rows(key, quote.pk)) if quote.pk else []) + added.get(key, [])
+                for key, _, _ in SECTIONS
+            }
+            breakdown = price_quote(quote, components)
+            previews.append({
+                'quote': quote.name,
+                'added': {key: len(rows) for key, rows in added.items()},
+                'subtotals': {section.key: section.subtotal for section in breakdown.sections},
+                'base_cost': breakdown.base_cost,
+                'profit_amount': breakdown.profit_amount,
+                'handling_charge': breakdown.handling_charge,
+                'grand_total': breakdown.grand_total,
+                'cost_per_part': breakdown.cost_per_part,
+            })
+        return previews
+
+
+class AssemblyTypeLookup:
+    """Resolves assembly type names for one customer group with a single query"""
+
+    def __init__(self, customer_group):
+        self.types = {}
+        if customer_group:
+            for assembly_type in AssemblyType.objects.filter(customer_group=customer_group):
+                self.types.setdefault(assembly_type.name, []).append(assembly_type)
+
+    def get(self, name):
+        matches = self.types.get(str(name), [])
+        if len(matches) > 1:
+            raise AssemblyType.MultipleObjectsReturned(
+                f'get() returned more than one AssemblyType -- it returned {len(matches)}!')
+        return matches[0] if matches else None
+
+
+class ConfigTypeUpsert:
+    """
+    Collects config type rows for one customer group and writes them as a
+    bulk upsert keyed on the (key field, customer_group) unique constraint:
+    existing rows are read once, new keys go through bulk_create and known
+    keys through bulk_update. A key repeated in the sheet keeps its last row.
+    """
+
+    def __init__(self, model, key_field, customer_group, batch_size=IMPORT_BATCH_SIZE):
+        self.model = model
+        self.key_field = key_field
+        self.customer_group = customer_group
+        self.batch_size = batch_size
+        self.rows = {}
+
+    def add(self, key, defaults):
+        """Validate one sheet row and queue it"""
+        validate_import_row(self.model(customer_group=self.customer_group, **{self.key_field: key}, **defaults))
+        self.rows[key] = defaults
+
+    def save(self):
+        """Write the queued rows; returns (created, updated) counts"""
+        if not self.rows:
+            return 0, 0
+        existing = {
+            getattr(obj, self.key_field): obj
+            for obj in self.model.objects.filter(customer_group=self.customer_group,
+                                                 **{f'{self.key_field}__in': list(self.rows)})
+        }
+        propagation = TYPE_PROPAGATIONS.get(self.model)
+        exported = EXPORTED_TYPE_FIELDS.get(self.model)
+        now = timezone.now()
+        auto_now = [field.attname for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+        created, updated, previous, exported_before, update_fields = [], [], [], [], set(auto_now)
+        for key, defaults in self.rows.items():
+            obj = existing.get(key)
+            if obj is None:
+                created.append(self.model(customer_group=self.customer_group, **{self.key_field: key}, **defaults))
+                continue
+            if propagation:
+                previous.append({field: getattr(obj, field) for field in propagation.fields})
+            if exported:
+                exported_before.append({field: getattr(obj, field) for field in exported[2]})
+            for field, value in defaults.items():
+                setattr(obj, field, value)
+            for field in auto_now:
+                setattr(obj, field, now)
+            update_fields.update(defaults)
+            updated.append(obj)
+
+        # bulk_update skips post_save, so dependent quote rows are brought in
+        # line here, merged into one UPDATE per changed type
+        with transaction.atomic(), propagation_batch():
+            self.model.objects.bulk_create(created, batch_size=self.batch_size)
+            if updated:
+                self.model.objects.bulk_update(updated, sorted(update_fields), batch_size=self.batch_size)
+            for obj, before in zip(updated, previous):
+                propagate_type_update(obj, before)
+            for obj, before in zip(updated, exported_before):
+                invalidate_type_exports(obj, before)
+        self.rows = {}
+        return len(created), len(updated)
+
+
+class QuoteColumnIndex:
+    """
+    Maps quote names to their columns on horizontal component sheets, where
+    row 1 names the quote each column belongs to. Each sheet is scanned once,
+    the first time it is asked for.
+    """
+
+    # Component sheets of a horizontal workbook, each under either of its names
+    COMPONENT_SHEETS = (
+        ('Raw Materials', 'Raw_Materials'),
+        ('Moulding Machines', 'Moulding_Machines'),
+        ('Assemblies', 'Assembly'),
+        ('Packaging', 'Package'),
+        ('Transport', 'Transportation'),
+    )
+
+    def __init__(self):
+        self.sheets = {}
+
+    def index_workbook(self, wb):
+        """Scan every component sheet of ``wb`` now, so orphans are found even on sheets no quote reads"""
+        for names in self.COMPONENT_SHEETS:
+            title = next((name for name in names if name in wb.sheetnames), None)
+            if title is not None:
+                self._index(wb[title])
+
+    def _index(self, ws):
+        if ws.title not in self.sheets:
+            columns = {}
+            for col_num in range(2, ws.max_column + 1):
+                quote_name = ws.value(1, col_num)
+                if quote_name:
+                    columns.setdefault(str(quote_name), []).append(col_num)
+            self.sheets[ws.title] = columns
+        return self.sheets[ws.title]
+
+    def columns(self, ws, quote_name):
+        """Column numbers on ``ws`` that belong to ``quote_name``"""
+        return self._index(ws).get(quote_name, ())
+
+    def orphans(self, quote_names):
+        """(sheet title, quote name, columns) for columns naming a quote not in ``quote_names``"""
+        return [
+            (title, quote_name, col_nums)
+            for title, columns in self.sheets.items()
+            for quote_name, col_nums in columns.items()
+            if quote_name not in quote_names
+        ]
+
+
 class ExcelParser:
     """Parse Excel files and import data"""
 
     @staticmethod
     def parse_raw_materials(file_path, quote):
         """Parse raw materials from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Try different possible sheet names
         sheet_name = None
@@ -586,65 +902,67 @@ class ExcelParser:
         ws = wb[sheet_name]
         count = 0
         errors = []
+        batch = ComponentBatch()
 
         # Read each column starting from column B
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                material_name = ws.cell(1, col_num).value
+                material_name = ws.value(1, col_num)
                 if not material_name:
                     break
 
-                frozen_rate_value = ws.cell(6, col_num).value
+                frozen_rate_value = ws.value(6, col_num)
                 frozen_rate = float(frozen_rate_value) if frozen_rate_value else None
 
-                RawMaterial.objects.create(
+                batch.add(RawMaterial(
                     quote=quote,
                     material_name=str(material_name),
-                    grade=str(ws.cell(2, col_num).value or ''),
-                    rm_code=str(ws.cell(3, col_num).value or ''),
-                    unit_of_measurement=str(ws.cell(4, col_num).value or 'kg'),
-                    rm_rate=float(ws.cell(5, col_num).value or 0),
+                    grade=str(ws.value(2, col_num) or ''),
+                    rm_code=str(ws.value(3, col_num) or ''),
+                    unit_of_measurement=str(ws.value(4, col_num) or 'kg'),
+                    rm_rate=float(ws.value(5, col_num) or 0),
                     frozen_rate=frozen_rate,
-                    part_weight=float(ws.cell(7, col_num).value or 0),
-                    runner_weight=float(ws.cell(8, col_num).value or 0),
-                    process_losses=float(ws.cell(9, col_num).value or 0),
-                    purging_loss_cost=float(ws.cell(10, col_num).value or 0),
-                    other_rm_cost=float(ws.cell(11, col_num).value or 0),
-                    other_rm_cost_description=str(ws.cell(12, col_num).value or ''),
+                    part_weight=float(ws.value(7, col_num) or 0),
+                    runner_weight=float(ws.value(8, col_num) or 0),
+                    process_losses=float(ws.value(9, col_num) or 0),
+                    purging_loss_cost=float(ws.value(10, col_num) or 0),
+                    other_rm_cost=float(ws.value(11, col_num) or 0),
+                    other_rm_cost_description=str(ws.value(12, col_num) or ''),
 
                     # ICC with type
-                    icc_percentage=float(ws.cell(13, col_num).value or 0),
-                    icc_type=str(ws.cell(14, col_num).value or 'percentage').lower(),
+                    icc_percentage=float(ws.value(13, col_num) or 0),
+                    icc_type=str(ws.value(14, col_num) or 'percentage').lower(),
 
                     # Rejection with type
-                    rejection_percentage=float(ws.cell(15, col_num).value or 0),
-                    rejection_type=str(ws.cell(16, col_num).value or 'percentage').lower(),
+                    rejection_percentage=float(ws.value(15, col_num) or 0),
+                    rejection_type=str(ws.value(16, col_num) or 'percentage').lower(),
 
                     # Overhead with type
-                    overhead_percentage=float(ws.cell(17, col_num).value or 0),
-                    overhead_type=str(ws.cell(18, col_num).value or 'percentage').lower(),
+                    overhead_percentage=float(ws.value(17, col_num) or 0),
+                    overhead_type=str(ws.value(18, col_num) or 'percentage').lower(),
 
                     # Maintenance with type
-                    maintenance_percentage=float(ws.cell(19, col_num).value or 0),
-                    maintenance_type=str(ws.cell(20, col_num).value or 'percentage').lower(),
+                    maintenance_percentage=float(ws.value(19, col_num) or 0),
+                    maintenance_type=str(ws.value(20, col_num) or 'percentage').lower(),
 
                     # Profit with type
-                    profit_percentage=float(ws.cell(21, col_num).value or 0),
-                    profit_type=str(ws.cell(22, col_num).value or 'percentage').lower(),
-                )
+                    profit_percentage=float(ws.value(21, col_num) or 0),
+                    profit_type=str(ws.value(22, col_num) or 'percentage').lower(),
+                ))
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        batch.save()
         return count, errors
 
     @staticmethod
     def parse_moulding_machines(file_path, quote):
         """Parse moulding machines from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         sheet_name = None
         for possible_name in ['Moulding Machines', 'Moulding_Machines', 'MouldingMachines']:
@@ -658,52 +976,54 @@ class ExcelParser:
         ws = wb[sheet_name]
         count = 0
         errors = []
+        batch = ComponentBatch()
 
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                cavity = ws.cell(1, col_num).value
+                cavity = ws.value(1, col_num)
                 if cavity is None:
                     break
 
-                MouldingMachineDetail.objects.create(
+                batch.add(MouldingMachineDetail(
                     quote=quote,
                     cavity=int(cavity),
-                    machine_tonnage=float(ws.cell(2, col_num).value or 0),
-                    cycle_time=float(ws.cell(3, col_num).value or 0),
-                    efficiency=float(ws.cell(4, col_num).value or 0),
-                    shift_rate=float(ws.cell(5, col_num).value or 0),
-                    shift_rate_for_mtc=float(ws.cell(6, col_num).value or 0),
-                    mtc_count=int(ws.cell(7, col_num).value or 0),
+                    machine_tonnage=float(ws.value(2, col_num) or 0),
+                    cycle_time=float(ws.value(3, col_num) or 0),
+                    efficiency=float(ws.value(4, col_num) or 0),
+                    shift_rate=float(ws.value(5, col_num) or 0),
+                    shift_rate_for_mtc=float(ws.value(6, col_num) or 0),
+                    mtc_count=int(ws.value(7, col_num) or 0),
 
                     # Rejection with type
-                    rejection_percentage=float(ws.cell(8, col_num).value or 0),
-                    rejection_type=str(ws.cell(9, col_num).value or 'percentage').lower(),
+                    rejection_percentage=float(ws.value(8, col_num) or 0),
+                    rejection_type=str(ws.value(9, col_num) or 'percentage').lower(),
 
                     # Overhead with type
-                    overhead_percentage=float(ws.cell(10, col_num).value or 0),
-                    overhead_type=str(ws.cell(11, col_num).value or 'percentage').lower(),
+                    overhead_percentage=float(ws.value(10, col_num) or 0),
+                    overhead_type=str(ws.value(11, col_num) or 'percentage').lower(),
 
                     # Maintenance with type
-                    maintenance_percentage=float(ws.cell(12, col_num).value or 0),
-                    maintenance_type=str(ws.cell(13, col_num).value or 'percentage').lower(),
+                    maintenance_percentage=float(ws.value(12, col_num) or 0),
+                    maintenance_type=str(ws.value(13, col_num) or 'percentage').lower(),
 
                     # Profit with type
-                    profit_percentage=float(ws.cell(14, col_num).value or 0),
-                    profit_type=str(ws.cell(15, col_num).value or 'percentage').lower(),
-                )
+                    profit_percentage=float(ws.value(14, col_num) or 0),
+                    profit_type=str(ws.value(15, col_num) or 'percentage').lower(),
+                ))
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        batch.save()
         return count, errors
 
     @staticmethod
     def parse_assemblies(file_path, quote):
         """Parse assemblies from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         sheet_name = None
         for possible_name in ['Assemblies', 'Assembly']:
@@ -717,59 +1037,52 @@ class ExcelParser:
         ws = wb[sheet_name]
         count = 0
         errors = []
+        batch = ComponentBatch()
 
-        # Import here to avoid circular imports
-        from core.models import AssemblyType
+        assembly_types = AssemblyTypeLookup(quote.client_group)
 
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                assembly_name = ws.cell(1, col_num).value
+                assembly_name = ws.value(1, col_num)
                 if not assembly_name:
                     break
 
                 # Try to find assembly type
-                assembly_type_name = ws.cell(2, col_num).value
-                assembly_type = None
-                if assembly_type_name and quote.client_group:
-                    try:
-                        assembly_type = AssemblyType.objects.get(
-                            customer_group=quote.client_group,
-                            name=str(assembly_type_name)
-                        )
-                    except AssemblyType.DoesNotExist:
-                        pass
-
-                Assembly.objects.create(
+                assembly_type_name = ws.value(2, col_num)
+                assembly_type = assembly_types.get(assembly_type_name) if assembly_type_name else None
+
+                batch.add(Assembly(
                     quote=quote,
                     name=str(assembly_name),
                     assembly_type_config=assembly_type,
-                    remarks=str(ws.cell(3, col_num).value or ''),
-                    manual_cost=float(ws.cell(4, col_num).value or 0),
-                    other_cost=float(ws.cell(5, col_num).value or 0),
-                    other_cost_description=str(ws.cell(6, col_num).value or ''),
-                    inspection_handling_cost=float(ws.cell(7, col_num).value or 0),
+                    remarks=str(ws.value(3, col_num) or ''),
+                    manual_cost=float(ws.value(4, col_num) or 0),
+                    other_cost=float(ws.value(5, col_num) or 0),
+                    other_cost_description=str(ws.value(6, col_num) or ''),
+                    inspection_handling_cost=float(ws.value(7, col_num) or 0),
 
                     # Profit with type
-                    profit_percentage=float(ws.cell(8, col_num).value or 0),
-                    profit_type=str(ws.cell(9, col_num).value or 'percentage').lower(),
+                    profit_percentage=float(ws.value(8, col_num) or 0),
+                    profit_type=str(ws.value(9, col_num) or 'percentage').lower(),
 
                     # Rejection with type
-                    rejection_percentage=float(ws.cell(10, col_num).value or 0),
-                    rejection_type=str(ws.cell(11, col_num).value or 'percentage').lower(),
-                )
+                    rejection_percentage=float(ws.value(10, col_num) or 0),
+                    rejection_type=str(ws.value(11, col_num) or 'percentage').lower(),
+                ))
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        batch.save()
         return count, errors
 
     @staticmethod
     def parse_packaging(file_path, quote):
         """Parse packaging from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         sheet_name = None
         for possible_name in ['Packaging', 'Package']:
@@ -783,43 +1096,45 @@ class ExcelParser:
         ws = wb[sheet_name]
         count = 0
         errors = []
+        batch = ComponentBatch()
 
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                category = ws.cell(1, col_num).value
+                category = ws.value(1, col_num)
                 if not category:
                     break
 
                 category = str(category).lower()
 
-                Packaging.objects.create(
+                batch.add(Packaging(
                     quote=quote,
                     packaging_category=category,
-                    parts_per_packaging=int(ws.cell(2, col_num).value or 0),
-                    maintenance_percentage=float(ws.cell(3, col_num).value or 0),
-                    packaging_length=float(ws.cell(5, col_num).value or 0) if category == 'box' else 0,
-                    packaging_breadth=float(ws.cell(6, col_num).value or 0) if category == 'box' else 0,
-                    packaging_height=float(ws.cell(7, col_num).value or 0) if category == 'box' else 0,
-                    cost=float(ws.cell(8, col_num).value or 0) if category == 'box' else 0,
-                    lifecycle=int(ws.cell(9, col_num).value or 0) if category == 'box' else 0,
-                    polybag_length=float(ws.cell(11, col_num).value or 0) if category == 'polybag' else 0,
-                    polybag_width=float(ws.cell(12, col_num).value or 0) if category == 'polybag' else 0,
-                    rate_per_kg=float(ws.cell(13, col_num).value or 0) if category == 'polybag' else 0,
-                    polybags_per_kg=float(ws.cell(14, col_num).value or 0) if category == 'polybag' else 0,
-                )
+                    parts_per_packaging=int(ws.value(2, col_num) or 0),
+                    maintenance_percentage=float(ws.value(3, col_num) or 0),
+                    packaging_length=float(ws.value(5, col_num) or 0) if category == 'box' else 0,
+                    packaging_breadth=float(ws.value(6, col_num) or 0) if category == 'box' else 0,
+                    packaging_height=float(ws.value(7, col_num) or 0) if category == 'box' else 0,
+                    cost=float(ws.value(8, col_num) or 0) if category == 'box' else 0,
+                    lifecycle=int(ws.value(9, col_num) or 0) if category == 'box' else 0,
+                    polybag_length=float(ws.value(11, col_num) or 0) if category == 'polybag' else 0,
+                    polybag_width=float(ws.value(12, col_num) or 0) if category == 'polybag' else 0,
+                    rate_per_kg=float(ws.value(13, col_num) or 0) if category == 'polybag' else 0,
+                    polybags_per_kg=float(ws.value(14, col_num) or 0) if category == 'polybag' else 0,
+                ))
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        batch.save()
         return count, errors
 
     @staticmethod
     def parse_transport(file_path, quote):
         """Parse transport from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         sheet_name = None
         for possible_name in ['Transport', 'Transportation']:
@@ -833,39 +1148,39 @@ class ExcelParser:
         ws = wb[sheet_name]
         count = 0
         errors = []
+        batch = ComponentBatch()
 
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                length = ws.cell(1, col_num).value
+                length = ws.value(1, col_num)
                 if length is None:
                     break
 
-                Transport.objects.create(
+                batch.add(Transport(
                     quote=quote,
                     transport_length=float(length or 0),
-                    transport_breadth=float(ws.cell(2, col_num).value or 0),
-                    transport_height=float(ws.cell(3, col_num).value or 0),
-                    trip_cost=float(ws.cell(4, col_num).value or 0),
-                    parts_per_box=int(ws.cell(5, col_num).value or 0),
-                )
+                    transport_breadth=float(ws.value(2, col_num) or 0),
+                    transport_height=float(ws.value(3, col_num) or 0),
+                    trip_cost=float(ws.value(4, col_num) or 0),
+                    parts_per_box=int(ws.value(5, col_num) or 0),
+                ))
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        batch.save()
         return count, errors
 
     @staticmethod
-    def parse_complete_quote(file_path, quote):
-        """Parse a complete quote from a single Excel file (vertical format)"""
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            for chunk in file_path.chunks():
-                tmp_file.write(chunk)
-            tmp_file_path = tmp_file.name
-
+    def parse_complete_quote(file_path, quote, preview=False):
+        """
+        Parse a complete quote from a single Excel file (vertical format).
+        With ``preview`` nothing is saved; ``results['preview']`` holds the
+        quote's totals including the parsed rows.
+        """
         results = {
             'raw_materials': 0,
             'moulding_machines': 0,
@@ -874,8 +1189,9 @@ class ExcelParser:
             'transport': 0
         }
         errors = []
+        batch = ComponentBatch()
 
-        wb = openpyxl.load_workbook(tmp_file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Raw Materials
         rm_sheet_name = 'Raw Materials' if 'Raw Materials' in wb.sheetnames else 'Raw_Materials'
@@ -884,48 +1200,48 @@ class ExcelParser:
             col_num = 2
             while col_num <= ws_rm.max_column:
                 try:
-                    material_name = ws_rm.cell(1, col_num).value
+                    material_name = ws_rm.value(1, col_num)
                     if not material_name:
                         break
 
-                    frozen_rate_value = ws_rm.cell(6, col_num).value
+                    frozen_rate_value = ws_rm.value(6, col_num)
                     frozen_rate = float(frozen_rate_value) if frozen_rate_value else None
 
-                    RawMaterial.objects.create(
+                    batch.add(RawMaterial(
                         quote=quote,
                         material_name=str(material_name),
-                        grade=str(ws_rm.cell(2, col_num).value or ''),
-                        rm_code=str(ws_rm.cell(3, col_num).value or ''),
-                        unit_of_measurement=str(ws_rm.cell(4, col_num).value or 'kg'),
-                        rm_rate=float(ws_rm.cell(5, col_num).value or 0),
+                        grade=str(ws_rm.value(2, col_num) or ''),
+                        rm_code=str(ws_rm.value(3, col_num) or ''),
+                        unit_of_measurement=str(ws_rm.value(4, col_num) or 'kg'),
+                        rm_rate=float(ws_rm.value(5, col_num) or 0),
                         frozen_rate=frozen_rate,
-                        part_weight=float(ws_rm.cell(7, col_num).value or 0),
-                        runner_weight=float(ws_rm.cell(8, col_num).value or 0),
-                        process_losses=float(ws_rm.cell(9, col_num).value or 0),
-                        purging_loss_cost=float(ws_rm.cell(10, col_num).value or 0),
-                        other_rm_cost=float(ws_rm.cell(11, col_num).value or 0),
-                        other_rm_cost_description=str(ws_rm.cell(12, col_num).value or ''),
+                        part_weight=float(ws_rm.value(7, col_num) or 0),
+                        runner_weight=float(ws_rm.value(8, col_num) or 0),
+                        process_losses=float(ws_rm.value(9, col_num) or 0),
+                        purging_loss_cost=float(ws_rm.value(10, col_num) or 0),
+                        other_rm_cost=float(ws_rm.value(11, col_num) or 0),
+                        other_rm_cost_description=str(ws_rm.value(12, col_num) or ''),
 
                         # ICC with type
-                        icc_percentage=float(ws_rm.cell(13, col_num).value or 0),
-                        icc_type=str(ws_rm.cell(14, col_num).value or 'percentage').lower(),
+                        icc_percentage=float(ws_rm.value(13, col_num) or 0),
+                        icc_type=str(ws_rm.value(14, col_num) or 'percentage').lower(),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_rm.cell(15, col_num).value or 0),
-                        rejection_type=str(ws_rm.cell(16, col_num).value or 'percentage').lower(),
+                        rejection_percentage=float(ws_rm.value(15, col_num) or 0),
+                        rejection_type=str(ws_rm.value(16, col_num) or 'percentage').lower(),
 
                         # Overhead with type
-                        overhead_percentage=float(ws_rm.cell(17, col_num).value or 0),
-                        overhead_type=str(ws_rm.cell(18, col_num).value or 'percentage').lower(),
+                        overhead_percentage=float(ws_rm.value(17, col_num) or 0),
+                        overhead_type=str(ws_rm.value(18, col_num) or 'percentage').lower(),
 
                         # Maintenance with type
-                        maintenance_percentage=float(ws_rm.cell(19, col_num).value or 0),
-                        maintenance_type=str(ws_rm.cell(20, col_num).value or 'percentage').lower(),
+                        maintenance_percentage=float(ws_rm.value(19, col_num) or 0),
+                        maintenance_type=str(ws_rm.value(20, col_num) or 'percentage').lower(),
 
                         # Profit with type
-                        profit_percentage=float(ws_rm.cell(21, col_num).value or 0),
-                        profit_type=str(ws_rm.cell(22, col_num).value or 'percentage').lower(),
-                    )
+                        profit_percentage=float(ws_rm.value(21, col_num) or 0),
+                        profit_type=str(ws_rm.value(22, col_num) or 'percentage').lower(),
+                    ))
                     results['raw_materials'] += 1
                     col_num += 1
                 except Exception as e:
@@ -939,36 +1255,36 @@ class ExcelParser:
             col_num = 2
             while col_num <= ws_mm.max_column:
                 try:
-                    cavity = ws_mm.cell(1, col_num).value
+                    cavity = ws_mm.value(1, col_num)
                     if cavity is None:
                         break
 
-                    MouldingMachineDetail.objects.create(
+                    batch.add(MouldingMachineDetail(
                         quote=quote,
                         cavity=int(cavity),
-                        machine_tonnage=float(ws_mm.cell(2, col_num).value or 0),
-                        cycle_time=float(ws_mm.cell(3, col_num).value or 0),
-                        efficiency=float(ws_mm.cell(4, col_num).value or 0),
-                        shift_rate=float(ws_mm.cell(5, col_num).value or 0),
-                        shift_rate_for_mtc=float(ws_mm.cell(6, col_num).value or 0),
-                        mtc_count=int(ws_mm.cell(7, col_num).value or 0),
+                        machine_tonnage=float(ws_mm.value(2, col_num) or 0),
+                        cycle_time=float(ws_mm.value(3, col_num) or 0),
+                        efficiency=float(ws_mm.value(4, col_num) or 0),
+                        shift_rate=float(ws_mm.value(5, col_num) or 0),
+                        shift_rate_for_mtc=float(ws_mm.value(6, col_num) or 0),
+                        mtc_count=int(ws_mm.value(7, col_num) or 0),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_mm.cell(8, col_num).value or 0),
-                        rejection_type=str(ws_mm.cell(9, col_num).value or 'percentage').lower(),
+                        rejection_percentage=float(ws_mm.value(8, col_num) or 0),
+                        rejection_type=str(ws_mm.value(9, col_num) or 'percentage').lower(),
 
                         # Overhead with type
-                        overhead_percentage=float(ws_mm.cell(10, col_num).value or 0),
-                        overhead_type=str(ws_mm.cell(11, col_num).value or 'percentage').lower(),
+                        overhead_percentage=float(ws_mm.value(10, col_num) or 0),
+                        overhead_type=str(ws_mm.value(11, col_num) or 'percentage').lower(),
 
                         # Maintenance with type
-                        maintenance_percentage=float(ws_mm.cell(12, col_num).value or 0),
-                        maintenance_type=str(ws_mm.cell(13, col_num).value or 'percentage').lower(),
+                        maintenance_percentage=float(ws_mm.value(12, col_num) or 0),
+                        maintenance_type=str(ws_mm.value(13, col_num) or 'percentage').lower(),
 
                         # Profit with type
-                        profit_percentage=float(ws_mm.cell(14, col_num).value or 0),
-                        profit_type=str(ws_mm.cell(15, col_num).value or 'percentage').lower(),
-                    )
+                        profit_percentage=float(ws_mm.value(14, col_num) or 0),
+                        profit_type=str(ws_mm.value(15, col_num) or 'percentage').lower(),
+                    ))
                     results['moulding_machines'] += 1
                     col_num += 1
                 except Exception as e:
@@ -978,45 +1294,37 @@ class ExcelParser:
         # Assemblies
         asm_sheet_name = 'Assemblies' if 'Assemblies' in wb.sheetnames else 'Assembly'
         if asm_sheet_name in wb.sheetnames:
-            from core.models import AssemblyType
+            assembly_types = AssemblyTypeLookup(quote.client_group)
             ws_asm = wb[asm_sheet_name]
             col_num = 2
             while col_num <= ws_asm.max_column:
                 try:
-                    assembly_name = ws_asm.cell(1, col_num).value
+                    assembly_name = ws_asm.value(1, col_num)
                     if not assembly_name:
                         break
 
                     # Try to find assembly type
-                    assembly_type_name = ws_asm.cell(2, col_num).value
-                    assembly_type = None
-                    if assembly_type_name and quote.client_group:
-                        try:
-                            assembly_type = AssemblyType.objects.get(
-                                customer_group=quote.client_group,
-                                name=str(assembly_type_name)
-                            )
-                        except AssemblyType.DoesNotExist:
-                            pass
-
-                    Assembly.objects.create(
+                    assembly_type_name = ws_asm.value(2, col_num)
+                    assembly_type = assembly_types.get(assembly_type_name) if assembly_type_name else None
+
+                    batch.add(Assembly(
                         quote=quote,
                         name=str(assembly_name),
                         assembly_type_config=assembly_type,
-                        remarks=str(ws_asm.cell(3, col_num).value or ''),
-                        manual_cost=float(ws_asm.cell(4, col_num).value or 0),
-                        other_cost=float(ws_asm.cell(5, col_num).value or 0),
-                        other_cost_description=str(ws_asm.cell(6, col_num).value or ''),
-                        inspection_handling_cost=float(ws_asm.cell(7, col_num).value or 0),
+                        remarks=str(ws_asm.value(3, col_num) or ''),
+                        manual_cost=float(ws_asm.value(4, col_num) or 0),
+                        other_cost=float(ws_asm.value(5, col_num) or 0),
+                        other_cost_description=str(ws_asm.value(6, col_num) or ''),
+                        inspection_handling_cost=float(ws_asm.value(7, col_num) or 0),
 
                         # Profit with type
-                        profit_percentage=float(ws_asm.cell(8, col_num).value or 0),
-                        profit_type=str(ws_asm.cell(9, col_num).value or 'percentage').lower(),
+                        profit_percentage=float(ws_asm.value(8, col_num) or 0),
+                        profit_type=str(ws_asm.value(9, col_num) or 'percentage').lower(),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_asm.cell(10, col_num).value or 0),
-                        rejection_type=str(ws_asm.cell(11, col_num).value or 'percentage').lower(),
-                    )
+                        rejection_percentage=float(ws_asm.value(10, col_num) or 0),
+                        rejection_type=str(ws_asm.value(11, col_num) or 'percentage').lower(),
+                    ))
                     results['assemblies'] += 1
                     col_num += 1
                 except Exception as e:
@@ -1030,27 +1338,27 @@ class ExcelParser:
             col_num = 2
             while col_num <= ws_pkg.max_column:
                 try:
-                    category = ws_pkg.cell(1, col_num).value
+                    category = ws_pkg.value(1, col_num)
                     if not category:
                         break
 
                     category = str(category).lower()
 
-                    Packaging.objects.create(
+                    batch.add(Packaging(
                         quote=quote,
                         packaging_category=category,
-                        parts_per_packaging=int(ws_pkg.cell(2, col_num).value or 0),
-                        maintenance_percentage=float(ws_pkg.cell(3, col_num).value or 0),
-                        packaging_length=float(ws_pkg.cell(5, col_num).value or 0) if category == 'box' else 0,
-                        packaging_breadth=float(ws_pkg.cell(6, col_num).value or 0) if category == 'box' else 0,
-                        packaging_height=float(ws_pkg.cell(7, col_num).value or 0) if category == 'box' else 0,
-                        cost=float(ws_pkg.cell(8, col_num).value or 0) if category == 'box' else 0,
-                        lifecycle=int(ws_pkg.cell(9, col_num).value or 0) if category == 'box' else 0,
-                        polybag_length=float(ws_pkg.cell(11, col_num).value or 0) if category == 'polybag' else 0,
-                        polybag_width=float(ws_pkg.cell(12, col_num).value or 0) if category == 'polybag' else 0,
-                        rate_per_kg=float(ws_pkg.cell(13, col_num).value or 0) if category == 'polybag' else 0,
-                        polybags_per_kg=float(ws_pkg.cell(14, col_num).value or 0) if category == 'polybag' else 0,
-                    )
+                        parts_per_packaging=int(ws_pkg.value(2, col_num) or 0),
+                        maintenance_percentage=float(ws_pkg.value(3, col_num) or 0),
+                        packaging_length=float(ws_pkg.value(5, col_num) or 0) if category == 'box' else 0,
+                        packaging_breadth=float(ws_pkg.value(6, col_num) or 0) if category == 'box' else 0,
+                        packaging_height=float(ws_pkg.value(7, col_num) or 0) if category == 'box' else 0,
+                        cost=float(ws_pkg.value(8, col_num) or 0) if category == 'box' else 0,
+                        lifecycle=int(ws_pkg.value(9, col_num) or 0) if category == 'box' else 0,
+                        polybag_length=float(ws_pkg.value(11, col_num) or 0) if category == 'polybag' else 0,
+                        polybag_width=float(ws_pkg.value(12, col_num) or 0) if category == 'polybag' else 0,
+                        rate_per_kg=float(ws_pkg.value(13, col_num) or 0) if category == 'polybag' else 0,
+                        polybags_per_kg=float(ws_pkg.value(14, col_num) or 0) if category == 'polybag' else 0,
+                    ))
                     results['packaging'] += 1
                     col_num += 1
                 except Exception as e:
@@ -1064,39 +1372,42 @@ class ExcelParser:
             col_num = 2
             while col_num <= ws_trans.max_column:
                 try:
-                    length = ws_trans.cell(1, col_num).value
+                    length = ws_trans.value(1, col_num)
                     if length is None:
                         break
 
-                    Transport.objects.create(
+                    batch.add(Transport(
                         quote=quote,
                         transport_length=float(length or 0),
-                        transport_breadth=float(ws_trans.cell(2, col_num).value or 0),
-                        transport_height=float(ws_trans.cell(3, col_num).value or 0),
-                        trip_cost=float(ws_trans.cell(4, col_num).value or 0),
-                        parts_per_box=int(ws_trans.cell(5, col_num).value or 0),
-                    )
+                        transport_breadth=float(ws_trans.value(2, col_num) or 0),
+                        transport_height=float(ws_trans.value(3, col_num) or 0),
+                        trip_cost=float(ws_trans.value(4, col_num) or 0),
+                        parts_per_box=int(ws_trans.value(5, col_num) or 0),
+                    ))
                     results['transport'] += 1
                     col_num += 1
                 except Exception as e:
                     errors.append(f"Transport Column {get_column_letter(col_num)}: {str(e)}")
                     col_num += 1
 
-        # Clean up temp file
-        os.unlink(tmp_file_path)
+        if preview:
+            results['preview'] = batch.preview([quote])[0]
+        else:
+            batch.save()
 
         return quote, errors, results
 
     @staticmethod
-    def parse_multiple_quotes_complete(file_path, project, customer_group, user):
-        """Parse multiple complete quotes from horizontal format Excel file"""
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            for chunk in file_path.chunks():
-                tmp_file.write(chunk)
-            tmp_file_path = tmp_file.name
-
-        wb = openpyxl.load_workbook(tmp_file_path, data_only=True)
+    def parse_multiple_quotes_complete(file_path, project, customer_group, user, progress=None, preview=False):
+        """
+        Parse multiple complete quotes from horizontal format Excel file.
+        ``progress(done, total)`` is called after each Quote Definition column.
+        The whole workbook is read before anything is written; the quotes are
+        then saved in one transaction with a savepoint each. With ``preview``
+        nothing is saved; ``results['preview']`` lists the totals and row
+        errors of every quote the file would create.
+        """
+        wb = UploadedWorkbook(file_path)
 
         results = {
             'quotes': 0,
@@ -1107,543 +1418,447 @@ class ExcelParser:
                 'packaging': 0,
                 'transport': 0,
             },
+            'quote_ids': [],
             'errors': []
         }
 
-        try:
-            # Parse Quote Definition sheet
-            if 'Quote Definition' not in wb.sheetnames:
-                results['errors'].append("Quote Definition sheet not found")
-                return results
-
-            ws_def = wb['Quote Definition']
-
-            # Read each column starting from column B
-            col_num = 2
-            while col_num <= ws_def.max_column:
-                try:
-                    quote_name = ws_def.cell(1, col_num).value
-                    if not quote_name:
-                        break
+        # Parse Quote Definition sheet
+        if 'Quote Definition' not in wb.sheetnames:
+            results['errors'].append("Quote Definition sheet not found")
+            return results
 
-                    # Create quote
-                    quote = Quote.objects.create(
-                        project=project,
-                        name=str(quote_name),
-                        client_group=customer_group,
-                        client_name=str(ws_def.cell(2, col_num).value or ''),
-                        sap_number=str(ws_def.cell(3, col_num).value or ''),
-                        part_number=str(ws_def.cell(4, col_num).value or ''),
-                        part_name=str(ws_def.cell(5, col_num).value or ''),
-                        amendment_number=str(ws_def.cell(6, col_num).value or ''),
-                        description=str(ws_def.cell(7, col_num).value or ''),
-                        quantity=int(ws_def.cell(8, col_num).value or 1),
-                        handling_charge=float(ws_def.cell(9, col_num).value or 0),
+        ws_def = wb['Quote Definition']
+        batch = ComponentBatch()
+        quote_columns = QuoteColumnIndex()
+        quote_columns.index_workbook(wb)
+        assembly_types = AssemblyTypeLookup(customer_group)
+        defined = {}
+        parsed = []
 
-                        # Profit with type
-                        profit_percentage=float(ws_def.cell(10, col_num).value or 0),
-                        profit_type=str(ws_def.cell(11, col_num).value or 'percentage').lower(),
-
-                        notes=str(ws_def.cell(12, col_num).value or ''),
-                        created_by=user,
-                        quote_definition_complete=True
-                    )
-
-                    # Parse components for this quote
-                    component_errors = ExcelParser._parse_components_horizontal(wb, quote, str(quote_name))
-                    results['errors'].extend(component_errors)
+        # Read each column starting from column B
+        col_num = 2
+        total_columns = max(ws_def.max_column - 1, 0)
+        while col_num <= ws_def.max_column:
+            if progress is not None and col_num > 2:
+                progress(col_num - 2, total_columns)
+            try:
+                quote_name = ws_def.value(1, col_num)
+                if not quote_name:
+                    break
 
-                    results['quotes'] += 1
+                if str(quote_name) in defined:
+                    results['errors'].append(
+                        f"Quote Column {get_column_letter(col_num)}: duplicate quote name \"{quote_name}\" "
+                        f"(already defined in column {get_column_letter(defined[str(quote_name)])}), skipped")
                     col_num += 1
+                    continue
+                defined[str(quote_name)] = col_num
+
+                # Create quote
+                quote = Quote(
+                    project=project,
+                    name=str(quote_name),
+                    client_group=customer_group,
+                    client_name=str(ws_def.value(2, col_num) or ''),
+                    sap_number=str(ws_def.value(3, col_num) or ''),
+                    part_number=str(ws_def.value(4, col_num) or ''),
+                    part_name=str(ws_def.value(5, col_num) or ''),
+                    amendment_number=str(ws_def.value(6, col_num) or ''),
+                    description=str(ws_def.value(7, col_num) or ''),
+                    quantity=int(ws_def.value(8, col_num) or 1),
+                    handling_charge=float(ws_def.value(9, col_num) or 0),
 
-                except Exception as e:
-                    results['errors'].append(f"Quote Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
+                    # Profit with type
+                    profit_percentage=float(ws_def.value(10, col_num) or 0),
+                    profit_type=str(ws_def.value(11, col_num) or 'percentage').lower(),
 
-            # Count total components across all quotes
-            for quote in Quote.objects.filter(project=project, created_by=user):
-                results['components']['raw_materials'] += quote.raw_materials.count()
-                results['components']['moulding_machines'] += quote.moulding_machines.count()
-                results['components']['assemblies'] += quote.assemblies.count()
-                results['components']['packaging'] += quote.packagings.count()
-                results['components']['transport'] += quote.transports.count()
+                    notes=str(ws_def.value(12, col_num) or ''),
+                    created_by=user,
+                    quote_definition_complete=True
+                )
+                validate_import_row(quote)
 
-        finally:
-            # Clean up temp file
-            os.unlink(tmp_file_path)
+                # Parse components for this quote
+                component_errors = ExcelParser._parse_components_horizontal(
+                    wb, quote, str(quote_name), batch, quote_columns, assembly_types)
+                results['errors'].extend(component_errors)
+                parsed.append((quote, component_errors))
+                col_num += 1
 
+            except Exception as e:
+                results['errors'].append(f"Quote Column {get_column_letter(col_num)}: {str(e)}")
+                col_num += 1
+
+        for title, quote_name, col_nums in quote_columns.orphans(defined):
+            letters = ', '.join(get_column_letter(col) for col in col_nums)
+            results['errors'].append(
+                f"{title} Column {letters}: quote \"{quote_name}\" is not in Quote Definition, skipped")
+
+        # Components created by this upload only, counted before the batch is flushed
+        counts = {
+            RawMaterial: batch.count(RawMaterial),
+            MouldingMachineDetail: batch.count(MouldingMachineDetail),
+            Assembly: batch.count(Assembly),
+            Packaging: batch.count(Packaging),
+            Transport: batch.count(Transport),
+        }
+        quotes = [quote for quote, _ in parsed]
+        if preview:
+            results['preview'] = batch.preview(quotes)
+            for summary, (_, quote_errors) in zip(results['preview'], parsed):
+                summary['errors'] = quote_errors
+        else:
+            queued = batch.queued_counts()
+            quotes, failed = batch.save_quotes(quotes)
+            for quote, error in failed:
+                for model, count in queued.get(id(quote), {}).items():
+                    counts[model] -= count
+                results['errors'].append(f'Quote "{quote.name}": {error}; nothing was saved for this quote')
+            results['quote_ids'] = [quote.pk for quote in quotes]
+
+        results['quotes'] = len(quotes)
+        results['components'] = {
+            'raw_materials': counts[RawMaterial],
+            'moulding_machines': counts[MouldingMachineDetail],
+            'assemblies': counts[Assembly],
+            'packaging': counts[Packaging],
+            'transport': counts[Transport],
+        }
         return results
 
     @staticmethod
-    def _parse_components_horizontal(wb, quote, quote_name):
-        """Parse components for a single quote from horizontal format sheets"""
+    def _parse_components_horizontal(wb, quote, quote_name, batch=None, quote_columns=None, assembly_types=None):
+        """
+        Parse components for a single quote from horizontal format sheets.
+        Rows are queued on ``batch`` when given, otherwise written before returning;
+        pass a shared ``quote_columns`` index and ``assembly_types`` lookup when
+        importing many quotes.
+        """
         errors = []
+        owns_batch = batch is None
+        if owns_batch:
+            batch = ComponentBatch()
+        if quote_columns is None:
+            quote_columns = QuoteColumnIndex()
 
         # Parse Raw Materials
         rm_sheet_name = 'Raw Materials' if 'Raw Materials' in wb.sheetnames else 'Raw_Materials'
         if rm_sheet_name in wb.sheetnames:
             ws_rm = wb[rm_sheet_name]
-            col_num = 2
-            while col_num <= ws_rm.max_column:
+            for col_num in quote_columns.columns(ws_rm, quote_name):
                 try:
-                    # Check if this column belongs to our quote
-                    col_quote_name = ws_rm.cell(row=1, column=col_num).value
-                    if not col_quote_name or str(col_quote_name) != quote_name:
-                        col_num += 1
-                        continue
-
-                    material_name = ws_rm.cell(row=2, column=col_num).value
+                    material_name = ws_rm.value(2, col_num)
                     if not material_name:
-                        col_num += 1
                         continue
 
                     # Get frozen rate (might be None)
-                    frozen_rate_value = ws_rm.cell(row=7, column=col_num).value
+                    frozen_rate_value = ws_rm.value(7, col_num)
                     frozen_rate = float(frozen_rate_value) if frozen_rate_value else None
 
-                    RawMaterial.objects.create(
+                    batch.add(RawMaterial(
                         quote=quote,
                         material_name=str(material_name),
-                        grade=str(ws_rm.cell(row=3, column=col_num).value or ''),
-                        rm_code=str(ws_rm.cell(row=4, column=col_num).value or ''),
-                        unit_of_measurement=str(ws_rm.cell(row=5, column=col_num).value or 'kg'),
-                        rm_rate=float(ws_rm.cell(row=6, column=col_num).value or 0),
+                        grade=str(ws_rm.value(3, col_num) or ''),
+                        rm_code=str(ws_rm.value(4, col_num) or ''),
+                        unit_of_measurement=str(ws_rm.value(5, col_num) or 'kg'),
+                        rm_rate=float(ws_rm.value(6, col_num) or 0),
                         frozen_rate=frozen_rate,
-                        part_weight=float(ws_rm.cell(row=8, column=col_num).value or 0),
-                        runner_weight=float(ws_rm.cell(row=9, column=col_num).value or 0),
-                        process_losses=float(ws_rm.cell(row=10, column=col_num).value or 0),
-                        purging_loss_cost=float(ws_rm.cell(row=11, column=col_num).value or 0),
-                        other_rm_cost=float(ws_rm.cell(row=12, column=col_num).value or 0),
-                        other_rm_cost_description=str(ws_rm.cell(row=13, column=col_num).value or ''),
+                        part_weight=float(ws_rm.value(8, col_num) or 0),
+                        runner_weight=float(ws_rm.value(9, col_num) or 0),
+                        process_losses=float(ws_rm.value(10, col_num) or 0),
+                        purging_loss_cost=float(ws_rm.value(11, col_num) or 0),
+                        other_rm_cost=float(ws_rm.value(12, col_num) or 0),
+                        other_rm_cost_description=str(ws_rm.value(13, col_num) or ''),
 
                         # ICC with type
-                        icc_percentage=float(ws_rm.cell(row=14, column=col_num).value or 0),
-                        icc_type=str(ws_rm.cell(row=15, column=col_num).value or 'percentage').lower(),
+                        icc_percentage=float(ws_rm.value(14, col_num) or 0),
+                        icc_type=str(ws_rm.value(15, col_num) or 'percentage').lower(),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_rm.cell(row=16, column=col_num).value or 0),
-                        rejection_type=str(ws_rm.cell(row=17, column=col_num).value or 'percentage').lower(),
+                        rejection_percentage=float(ws_rm.value(16, col_num) or 0),
+                        rejection_type=str(ws_rm.value(17, col_num) or 'percentage').lower(),
 
                         # Overhead with type
-                        overhead_percentage=float(ws_rm.cell(row=18, column=col_num).value or 0),
-                        overhead_type=str(ws_rm.cell(row=19, column=col_num).value or 'percentage').lower(),
+                        overhead_percentage=float(ws_rm.value(18, col_num) or 0),
+                        overhead_type=str(ws_rm.value(19, col_num) or 'percentage').lower(),
 
                         # Maintenance with type
-                        maintenance_percentage=float(ws_rm.cell(row=20, column=col_num).value or 0),
-                        maintenance_type=str(ws_rm.cell(row=21, column=col_num).value or 'percentage').lower(),
+                        maintenance_percentage=float(ws_rm.value(20, col_num) or 0),
+                        maintenance_type=str(ws_rm.value(21, col_num) or 'percentage').lower(),
 
                         # Profit with type
-                        profit_percentage=float(ws_rm.cell(row=22, column=col_num).value or 0),
-                        profit_type=str(ws_rm.cell(row=23, column=col_num).value or 'percentage').lower(),
-                    )
-                    col_num += 1
+                        profit_percentage=float(ws_rm.value(22, col_num) or 0),
+                        profit_type=str(ws_rm.value(23, col_num) or 'percentage').lower(),
+                    ))
                 except Exception as e:
                     errors.append(f"Raw Material - {quote_name} Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
 
         # Parse Moulding Machines
         mm_sheet_name = 'Moulding Machines' if 'Moulding Machines' in wb.sheetnames else 'Moulding_Machines'
         if mm_sheet_name in wb.sheetnames:
             ws_mm = wb[mm_sheet_name]
-            col_num = 2
-            while col_num <= ws_mm.max_column:
+            for col_num in quote_columns.columns(ws_mm, quote_name):
                 try:
-                    # Check if this column belongs to our quote
-                    col_quote_name = ws_mm.cell(row=1, column=col_num).value
-                    if not col_quote_name or str(col_quote_name) != quote_name:
-                        col_num += 1
-                        continue
-
-                    cavity = ws_mm.cell(row=2, column=col_num).value
+                    cavity = ws_mm.value(2, col_num)
                     if cavity is None:
-                        col_num += 1
                         continue
 
-                    MouldingMachineDetail.objects.create(
+                    batch.add(MouldingMachineDetail(
                         quote=quote,
                         cavity=int(cavity),
-                        machine_tonnage=float(ws_mm.cell(row=3, column=col_num).value or 0),
-                        cycle_time=float(ws_mm.cell(row=4, column=col_num).value or 0),
-                        efficiency=float(ws_mm.cell(row=5, column=col_num).value or 0),
-                        shift_rate=float(ws_mm.cell(row=6, column=col_num).value or 0),
-                        shift_rate_for_mtc=float(ws_mm.cell(row=7, column=col_num).value or 0),
-                        mtc_count=int(ws_mm.cell(row=8, column=col_num).value or 0),
+                        machine_tonnage=float(ws_mm.value(3, col_num) or 0),
+                        cycle_time=float(ws_mm.value(4, col_num) or 0),
+                        efficiency=float(ws_mm.value(5, col_num) or 0),
+                        shift_rate=float(ws_mm.value(6, col_num) or 0),
+                        shift_rate_for_mtc=float(ws_mm.value(7, col_num) or 0),
+                        mtc_count=int(ws_mm.value(8, col_num) or 0),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_mm.cell(row=9, column=col_num).value or 0),
-                        rejection_type=str(ws_mm.cell(row=10, column=col_num).value or 'percentage').lower(),
+                        rejection_percentage=float(ws_mm.value(9, col_num) or 0),
+                        rejection_type=str(ws_mm.value(10, col_num) or 'percentage').lower(),
 
                         # Overhead with type
-                        overhead_percentage=float(ws_mm.cell(row=11, column=col_num).value or 0),
-                        overhead_type=str(ws_mm.cell(row=12, column=col_num).value or 'percentage').lower(),
+                        overhead_percentage=float(ws_mm.value(11, col_num) or 0),
+                        overhead_type=str(ws_mm.value(12, col_num) or 'percentage').lower(),
 
                         # Maintenance with type
-                        maintenance_percentage=float(ws_mm.cell(row=13, column=col_num).value or 0),
-                        maintenance_type=str(ws_mm.cell(row=14, column=col_num).value or 'percentage').lower(),
+                        maintenance_percentage=float(ws_mm.value(13, col_num) or 0),
+                        maintenance_type=str(ws_mm.value(14, col_num) or 'percentage').lower(),
 
                         # Profit with type
-                        profit_percentage=float(ws_mm.cell(row=15, column=col_num).value or 0),
-                        profit_type=str(ws_mm.cell(row=16, column=col_num).value or 'percentage').lower(),
-                    )
-                    col_num += 1
+                        profit_percentage=float(ws_mm.value(15, col_num) or 0),
+                        profit_type=str(ws_mm.value(16, col_num) or 'percentage').lower(),
+                    ))
                 except Exception as e:
                     errors.append(f"Moulding Machine - {quote_name} Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
 
         # Parse Assemblies
         asm_sheet_name = 'Assemblies' if 'Assemblies' in wb.sheetnames else 'Assembly'
         if asm_sheet_name in wb.sheetnames:
-            from core.models import AssemblyType
+            if assembly_types is None:
+                assembly_types = AssemblyTypeLookup(quote.client_group)
             ws_asm = wb[asm_sheet_name]
-            col_num = 2
-            while col_num <= ws_asm.max_column:
+            for col_num in quote_columns.columns(ws_asm, quote_name):
                 try:
-                    # Check if this column belongs to our quote
-                    col_quote_name = ws_asm.cell(row=1, column=col_num).value
-                    if not col_quote_name or str(col_quote_name) != quote_name:
-                        col_num += 1
-                        continue
-
-                    assembly_name = ws_asm.cell(row=2, column=col_num).value
+                    assembly_name = ws_asm.value(2, col_num)
                     if not assembly_name:
-                        col_num += 1
                         continue
 
                     # Try to find assembly type
-                    assembly_type_name = ws_asm.cell(row=3, column=col_num).value
-                    assembly_type = None
-                    if assembly_type_name and quote.client_group:
-                        try:
-                            assembly_type = AssemblyType.objects.get(
-                                customer_group=quote.client_group,
-                                name=str(assembly_type_name)
-                            )
-                        except AssemblyType.DoesNotExist:
-                            pass
-
-                    Assembly.objects.create(
+                    assembly_type_name = ws_asm.value(3, col_num)
+                    assembly_type = assembly_types.get(assembly_type_name) if assembly_type_name else None
+
+                    batch.add(Assembly(
                         quote=quote,
                         name=str(assembly_name),
                         assembly_type_config=assembly_type,
-                        remarks=str(ws_asm.cell(row=4, column=col_num).value or ''),
-                        manual_cost=float(ws_asm.cell(row=5, column=col_num).value or 0),
-                        other_cost=float(ws_asm.cell(row=6, column=col_num).value or 0),
-                        other_cost_description=str(ws_asm.cell(row=7, column=col_num).value or ''),
-                        inspection_handling_cost=float(ws_asm.cell(row=8, column=col_num).value or 0),
+                        remarks=str(ws_asm.value(4, col_num) or ''),
+                        manual_cost=float(ws_asm.value(5, col_num) or 0),
+                        other_cost=float(ws_asm.value(6, col_num) or 0),
+                        other_cost_description=str(ws_asm.value(7, col_num) or ''),
+                        inspection_handling_cost=float(ws_asm.value(8, col_num) or 0),
 
                         # Profit with type
-                        profit_percentage=float(ws_asm.cell(row=9, column=col_num).value or 0),
-                        profit_type=str(ws_asm.cell(row=10, column=col_num).value or 'percentage').lower(),
+                        profit_percentage=float(ws_asm.value(9, col_num) or 0),
+                        profit_type=str(ws_asm.value(10, col_num) or 'percentage').lower(),
 
                         # Rejection with type
-                        rejection_percentage=float(ws_asm.cell(row=11, column=col_num).value or 0),
-                        rejection_type=str(ws_asm.cell(row=12, column=col_num).value or 'percentage').lower(),
-                    )
-                    col_num += 1
+                        rejection_percentage=float(ws_asm.value(11, col_num) or 0),
+                        rejection_type=str(ws_asm.value(12, col_num) or 'percentage').lower(),
+                    ))
                 except Exception as e:
                     errors.append(f"Assembly - {quote_name} Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
 
         # Parse Packaging
         pkg_sheet_name = 'Packaging' if 'Packaging' in wb.sheetnames else 'Package'
         if pkg_sheet_name in wb.sheetnames:
             ws_pkg = wb[pkg_sheet_name]
-            col_num = 2
-            while col_num <= ws_pkg.max_column:
+            for col_num in quote_columns.columns(ws_pkg, quote_name):
                 try:
-                    # Check if this column belongs to our quote
-                    col_quote_name = ws_pkg.cell(row=1, column=col_num).value
-                    if not col_quote_name or str(col_quote_name) != quote_name:
-                        col_num += 1
-                        continue
-
-                    category = ws_pkg.cell(row=2, column=col_num).value
+                    category = ws_pkg.value(2, col_num)
                     if not category:
-                        col_num += 1
                         continue
 
                     category = str(category).lower()
 
-                    Packaging.objects.create(
+                    batch.add(Packaging(
                         quote=quote,
                         packaging_category=category,
-                        parts_per_packaging=int(ws_pkg.cell(row=3, column=col_num).value or 0),
-                        maintenance_percentage=float(ws_pkg.cell(row=4, column=col_num).value or 0),
-                        packaging_length=float(ws_pkg.cell(row=6, column=col_num).value or 0) if category == 'box' else 0,
-                        packaging_breadth=float(ws_pkg.cell(row=7, column=col_num).value or 0) if category == 'box' else 0,
-                        packaging_height=float(ws_pkg.cell(row=8, column=col_num).value or 0) if category == 'box' else 0,
-                        cost=float(ws_pkg.cell(row=9, column=col_num).value or 0) if category == 'box' else 0,
-                        lifecycle=int(ws_pkg.cell(row=10, column=col_num).value or 0) if category == 'box' else 0,
-                        polybag_length=float(ws_pkg.cell(row=12, column=col_num).value or 0) if category == 'polybag' else 0,
-                        polybag_width=float(ws_pkg.cell(row=13, column=col_num).value or 0) if category == 'polybag' else 0,
-                        rate_per_kg=float(ws_pkg.cell(row=14, column=col_num).value or 0) if category == 'polybag' else 0,
-                        polybags_per_kg=float(ws_pkg.cell(row=15, column=col_num).value or 0) if category == 'polybag' else 0,
-                    )
-                    col_num += 1
+                        parts_per_packaging=int(ws_pkg.value(3, col_num) or 0),
+                        maintenance_percentage=float(ws_pkg.value(4, col_num) or 0),
+                        packaging_length=float(ws_pkg.value(6, col_num) or 0) if category == 'box' else 0,
+                        packaging_breadth=float(ws_pkg.value(7, col_num) or 0) if category == 'box' else 0,
+                        packaging_height=float(ws_pkg.value(8, col_num) or 0) if category == 'box' else 0,
+                        cost=float(ws_pkg.value(9, col_num) or 0) if category == 'box' else 0,
+                        lifecycle=int(ws_pkg.value(10, col_num) or 0) if category == 'box' else 0,
+                        polybag_length=float(ws_pkg.value(12, col_num) or 0) if category == 'polybag' else 0,
+                        polybag_width=float(ws_pkg.value(13, col_num) or 0) if category == 'polybag' else 0,
+                        rate_per_kg=float(ws_pkg.value(14, col_num) or 0) if category == 'polybag' else 0,
+                        polybags_per_kg=float(ws_pkg.value(15, col_num) or 0) if category == 'polybag' else 0,
+                    ))
                 except Exception as e:
                     errors.append(f"Packaging - {quote_name} Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
 
         # Parse Transport
         trans_sheet_name = 'Transport' if 'Transport' in wb.sheetnames else 'Transportation'
         if trans_sheet_name in wb.sheetnames:
             ws_trans = wb[trans_sheet_name]
-            col_num = 2
-            while col_num <= ws_trans.max_column:
+            for col_num in quote_columns.columns(ws_trans, quote_name):
                 try:
-                    # Check if this column belongs to our quote
-                    col_quote_name = ws_trans.cell(row=1, column=col_num).value
-                    if not col_quote_name or str(col_quote_name) != quote_name:
-                        col_num += 1
-                        continue
-
-                    length = ws_trans.cell(row=2, column=col_num).value
+                    length = ws_trans.value(2, col_num)
                     if length is None:
-                        col_num += 1
                         continue
 
-                    Transport.objects.create(
+                    batch.add(Transport(
                         quote=quote,
                         transport_length=float(length or 0),
-                        transport_breadth=float(ws_trans.cell(row=3, column=col_num).value or 0),
-                        transport_height=float(ws_trans.cell(row=4, column=col_num).value or 0),
-                        trip_cost=float(ws_trans.cell(row=5, column=col_num).value or 0),
-                        parts_per_box=int(ws_trans.cell(row=6, column=col_num).value or 0),
-                    )
-                    col_num += 1
+                        transport_breadth=float(ws_trans.value(3, col_num) or 0),
+                        transport_height=float(ws_trans.value(4, col_num) or 0),
+                        trip_cost=float(ws_trans.value(5, col_num) or 0),
+                        parts_per_box=int(ws_trans.value(6, col_num) or 0),
+                    ))
                 except Exception as e:
                     errors.append(f"Transport - {quote_name} Column {get_column_letter(col_num)}: {str(e)}")
-                    col_num += 1
 
+        if owns_batch:
+            batch.save()
         return errors
 
     @staticmethod
     def parse_material_types(file_path, customer_group):
         """Parse material types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-
-        # Import here to avoid circular imports
-        from core.models import MaterialType
-
-        sheet_name = None
-        for possible_name in ['Material Types', 'Material_Types', 'MaterialTypes']:
-            if possible_name in wb.sheetnames:
-                sheet_name = possible_name
-                break
-
-        if not sheet_name:
-            return 0, ["Sheet 'Material Types' not found"]
-
-        ws = wb[sheet_name]
-        count = 0
-        errors = []
-
-        # Read each column starting from column B
-        col_num = 2
-        while col_num <= ws.max_column:
-            try:
-                raw_material_name = ws.cell(1, col_num).value
-                if not raw_material_name:
-                    break
-
-                MaterialType.objects.update_or_create(
-                    customer_group=customer_group,
-                    raw_material_name=str(raw_material_name),
-                    defaults={
-                        'raw_material_grade': str(ws.cell(2, col_num).value or ''),
-                        'raw_material_code': str(ws.cell(3, col_num).value or ''),
-                        'raw_material_rate': float(ws.cell(4, col_num).value or 0),
-                        'remarks': str(ws.cell(5, col_num).value or '')
-                    })
-                count += 1
-                col_num += 1
-            except Exception as e:
-                errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
-                col_num += 1
-
-        return count, errors
+        return ConfigParser.parse_material_types(file_path, customer_group)
 
     @staticmethod
     def parse_machine_types(file_path, customer_group):
         """Parse moulding machine types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-
-        # Import here to avoid circular imports
-        from core.models import MouldingMachineType
-
-        sheet_name = None
-        for possible_name in ['Machine Types', 'Machine_Types', 'MachineTypes']:
-            if possible_name in wb.sheetnames:
-                sheet_name = possible_name
-                break
-
-        if not sheet_name:
-            return 0, ["Sheet 'Machine Types' not found"]
-
-        ws = wb[sheet_name]
-        count = 0
-        errors = []
-
-        col_num = 2
-        while col_num <= ws.max_column:
-            try:
-                name = ws.cell(1, col_num).value
-                if not name:
-                    break
-
-                MouldingMachineType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'shift_rate': float(ws.cell(2, col_num).value or 0),
-                        'shift_rate_for_mtc': float(ws.cell(3, col_num).value or 0),
-                        'mtc_count': int(ws.cell(4, col_num).value or 0),
-                        'remarks': str(ws.cell(5, col_num).value or '')
-                    })
-                count += 1
-                col_num += 1
-            except Exception as e:
-                errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
-                col_num += 1
-
-        return count, errors
+        return ConfigParser.parse_machine_types(file_path, customer_group)
 
     @staticmethod
     def parse_assembly_types(file_path, customer_group):
         """Parse assembly types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-
-        # Import here to avoid circular imports
-        from core.models import AssemblyType
-
-        sheet_name = None
-        for possible_name in ['Assembly Types', 'Assembly_Types', 'AssemblyTypes']:
-            if possible_name in wb.sheetnames:
-                sheet_name = possible_name
-                break
-
-        if not sheet_name:
-            return 0, ["Sheet 'Assembly Types' not found"]
-
-        ws = wb[sheet_name]
-        count = 0
-        errors = []
-
-        col_num = 2
-        while col_num <= ws.max_column:
-            try:
-                name = ws.cell(1, col_num).value
-                if not name:
-                    break
-
-                AssemblyType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'value': str(ws.cell(2, col_num).value or ''),
-                        'description': str(ws.cell(3, col_num).value or ''),
-                        'remarks': str(ws.cell(4, col_num).value or '')
-                    })
-                count += 1
-                col_num += 1
-            except Exception as e:
-                errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
-                col_num += 1
-
-        return count, errors
+        return ConfigParser.parse_assembly_types(file_path, customer_group)
 
     @staticmethod
     def parse_packaging_types(file_path, customer_group):
         """Parse packaging types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-
-        # Import here to avoid circular imports
-        from core.models import PackagingType
-
-        sheet_name = None
-        for possible_name in ['Packaging Types', 'Packaging_Types', 'PackagingTypes']:
-            if possible_name in wb.sheetnames:
-                sheet_name = possible_name
-                break
-
-        if not sheet_name:
-            return 0, ["Sheet 'Packaging Types' not found"]
-
-        ws = wb[sheet_name]
-        count = 0
-        errors = []
-
-        col_num = 2
-        while col_num <= ws.max_column:
-            try:
-                name = ws.cell(1, col_num).value
-                if not name:
-                    break
-
-                category = str(ws.cell(2, col_num).value or 'box').lower()
-
-                PackagingType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'packaging_category': category,
-                        'default_length': float(ws.cell(4, col_num).value or 600),
-                        'default_breadth': float(ws.cell(5, col_num).value or 400),
-                        'default_height': float(ws.cell(6, col_num).value or 250),
-                        'default_polybag_length': float(ws.cell(8, col_num).value or 0),
-                        'default_polybag_width': float(ws.cell(9, col_num).value or 0),
-                        'default_rate_per_kg': float(ws.cell(10, col_num).value or 0),
-                        'default_polybags_per_kg': float(ws.cell(11, col_num).value or 0),
-                        'remarks': str(ws.cell(12, col_num).value or '')
-                    })
-                count += 1
-                col_num += 1
-            except Exception as e:
-                errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
-                col_num += 1
-
-        return count, errors
+        return ConfigParser.parse_packaging_types(file_path, customer_group)
+
+
+class ExportSheet:
+    """
+    The content of one exported sheet as plain rows, so the same data can be
+    written into a regular workbook or streamed into a write-only one.
+    """
+
+    def __init__(self, title, rows, widths, label_style=None, header_style=None):
+        self.title = title
+        self.rows = rows
+        self.widths = widths
+        # Named style for every cell in column A, and for every cell of row 1
+        self.label_style = label_style
+        self.header_style = header_style
+
+    def styled_rows(self):
+        """Rows as (value, named style or None) pairs"""
+        for row_num, row in enumerate(self.rows, 1):
+            yield [
+                (value, self.header_style if row_num == 1 and self.header_style else
+                 self.label_style if col_num == 1 else None)
+                for col_num, value in enumerate(row, 1)
+            ]
 
 
 class ExcelExporter:
     """Export quotes to Excel with all calculated fields"""
 
-    @staticmethod
-    def _add_vertical_headers(ws, headers, color, start_row=1):
-        """Add vertical headers in column A with color coding"""
-        header_fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
+    # Header colors of the vertical component sheets
+    SECTION_COLORS = {
+        'Raw Materials': '4472C4',
+        'Moulding Machines': '70AD47',
+        'Assemblies': 'FFC000',
+        'Packaging': 'E26B0A',
+        'Transport': '9933FF',
+    }
 
-        for row_num, header in enumerate(headers, start_row):
-            cell = ws.cell(row=row_num, column=1)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='left', vertical='center')
+    BOLD_STYLE = 'Export Bold'
 
-        ws.column_dimensions['A'].width = 35
+    @staticmethod
+    def _header_style_name(color):
+        return f'Export Header {color}'
 
     @staticmethod
-    def export_quote(quote):
-        """Export a single quote with all components and calculated fields"""
-        wb = Workbook()
-        wb.remove(wb.active)
+    def _register_styles(wb):
+        """Add the shared named styles used by exported sheets to ``wb``"""
+        styles = [NamedStyle(name=ExcelExporter.BOLD_STYLE, font=Font(bold=True))]
+        for color in ExcelExporter.SECTION_COLORS.values():
+            styles.append(NamedStyle(
+                name=ExcelExporter._header_style_name(color),
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                alignment=Alignment(horizontal='left', vertical='center'),
+            ))
+        for style in styles:
+            if style.name not in wb.style_names:
+                wb.add_named_style(style)
 
-        # Sheet 1: Quote Definition
-        ws_def = wb.create_sheet("Quote Definition")
-        def_headers = [
-            'Field',
-            'Value'
+    @staticmethod
+    def _vertical_sheet(title, headers, columns):
+        """Sheet with the field names down column A and one column per component"""
+        rows = [
+            [header] + [column[row_num] for column in columns]
+            for row_num, header in enumerate(headers)
         ]
+        widths = {'A': 35}
+        for col_num in range(2, len(columns) + 2):
+            widths[get_column_letter(col_num)] = 18
+        return ExportSheet(title, rows, widths,
+                           label_style=ExcelExporter._header_style_name(ExcelExporter.SECTION_COLORS[title]))
 
-        # Add headers
-        ws_def.cell(row=1, column=1, value='Field').font = Font(bold=True)
-        ws_def.cell(row=1, column=2, value='Value').font = Font(bold=True)
+    @staticmethod
+    def quote_sheets(quote, breakdown=None):
+        """The sheets of a quote export, in workbook order"""
+        if breakdown is None:
+            breakdown = price_quote(quote)
+        raw_materials = breakdown.raw_materials.objects
+        moulding_machines = breakdown.moulding_machines.objects
+        assemblies = breakdown.assemblies
+        packagings = breakdown.packagings.objects
+        transports = breakdown.transports.objects
+        version = f"{quote.major_version}.{quote.minor_version}"
+
+        # Summary
+        summary_data = [
+            ('Quote Name', quote.name),
+            ('Version', version),
+            ('Quantity', quote.quantity),
+            ('', ''),
+            ('Total Raw Material Cost', float(breakdown.raw_materials.subtotal)),
+            ('Total Conversion Cost', float(breakdown.moulding_machines.subtotal)),
+            ('Total Assembly Cost', float(breakdown.assemblies.subtotal)),
+            ('Total Packaging Cost', float(breakdown.packagings.subtotal)),
+            ('Total Transport Cost', float(breakdown.transports.subtotal)),
+            ('', ''),
+            ('Base Cost', float(breakdown.base_cost)),
+            ('Profit Amount', float(breakdown.profit_amount)),
+            ('Handling Charge', float(breakdown.handling_charge)),
+            ('', ''),
+            ('Grand Total', float(breakdown.grand_total)),
+            ('Cost per Part', float(breakdown.cost_per_part)),
+        ]
+        yield ExportSheet(
+            "Summary",
+            [['Description', 'Amount']] + [
+                [desc, amt if isinstance(amt, (int, float)) else None] for desc, amt in summary_data
+            ],
+            {'A': 30, 'B': 20},
+            header_style=ExcelExporter.BOLD_STYLE,
+        )
 
-        # Add data
+        # Quote Definition
         quote_data = [
             ('Quote Name', quote.name),
-            ('Version', f"{quote.major_version}.{quote.minor_version}"),
+            ('Version', version),
             ('Client Group', quote.client_group.name if quote.client_group else ''),
             ('Client Name', quote.client_name),
             ('SAP Number', quote.sap_number),
@@ -1657,17 +1872,15 @@ class ExcelExporter:
             ('Status', quote.get_status_display()),
             ('Notes', quote.notes),
         ]
-
-        for row_num, (field, value) in enumerate(quote_data, 2):
-            ws_def.cell(row=row_num, column=1, value=field)
-            ws_def.cell(row=row_num, column=2, value=value)
-
-        ws_def.column_dimensions['A'].width = 25
-        ws_def.column_dimensions['B'].width = 50
-
-        # Sheet 2: Raw Materials (vertical format with calculated fields)
-        if quote.raw_materials.exists():
-            ws_rm = wb.create_sheet("Raw Materials")
+        yield ExportSheet(
+            "Quote Definition",
+            [['Field', 'Value']] + [list(item) for item in quote_data],
+            {'A': 25, 'B': 50},
+            header_style=ExcelExporter.BOLD_STYLE,
+        )
+
+        # Raw Materials (vertical format with calculated fields)
+        if raw_materials:
             rm_headers = [
                 'Material Name',
                 'Grade',
@@ -1693,38 +1906,37 @@ class ExcelExporter:
                 'Total (Without Profit)',
                 'Total Cost'
             ]
-
-            ExcelExporter._add_vertical_headers(ws_rm, rm_headers, "4472C4")
-
-            for col_num, rm in enumerate(quote.raw_materials.all(), 2):
-                ws_rm.cell(row=1, column=col_num, value=rm.material_name)
-                ws_rm.cell(row=2, column=col_num, value=rm.grade)
-                ws_rm.cell(row=3, column=col_num, value=rm.rm_code)
-                ws_rm.cell(row=4, column=col_num, value=rm.unit_of_measurement)
-                ws_rm.cell(row=5, column=col_num, value=float(rm.rm_rate))
-                ws_rm.cell(row=6, column=col_num, value=float(rm.frozen_rate) if rm.frozen_rate else None)
-                ws_rm.cell(row=7, column=col_num, value=float(rm.effective_rate_per_kg))
-                ws_rm.cell(row=8, column=col_num, value=float(rm.part_weight))
-                ws_rm.cell(row=9, column=col_num, value=float(rm.runner_weight))
-                ws_rm.cell(row=10, column=col_num, value=float(rm.process_losses))
-                ws_rm.cell(row=11, column=col_num, value=float(rm.purging_loss_cost))
-                ws_rm.cell(row=12, column=col_num, value=float(rm.gross_weight_in_grams))
-                ws_rm.cell(row=13, column=col_num, value=float(rm.other_rm_cost))
-                ws_rm.cell(row=14, column=col_num, value=rm.other_rm_cost_description)
-                ws_rm.cell(row=15, column=col_num, value=float(rm.icc_percentage))
-                ws_rm.cell(row=16, column=col_num, value=float(rm.rejection_percentage))
-                ws_rm.cell(row=17, column=col_num, value=float(rm.overhead_percentage))
-                ws_rm.cell(row=18, column=col_num, value=float(rm.maintenance_percentage))
-                ws_rm.cell(row=19, column=col_num, value=float(rm.profit_percentage))
-                ws_rm.cell(row=20, column=col_num, value=float(rm.base_rm_cost))
-                ws_rm.cell(row=21, column=col_num, value=float(rm.frozen_rm_cost) if rm.frozen_rm_cost else None)
-                ws_rm.cell(row=22, column=col_num, value=float(rm.total_rm_cost_without_profit))
-                ws_rm.cell(row=23, column=col_num, value=float(rm.rm_cost))
-                ws_rm.column_dimensions[get_column_letter(col_num)].width = 18
-
-        # Sheet 3: Moulding Machines (vertical format with calculated fields)
-        if quote.moulding_machines.exists():
-            ws_mm = wb.create_sheet("Moulding Machines")
+            yield ExcelExporter._vertical_sheet("Raw Materials", rm_headers, [
+                [
+                    rm.material_name,
+                    rm.grade,
+                    rm.rm_code,
+                    rm.unit_of_measurement,
+                    float(rm.rm_rate),
+                    float(rm.frozen_rate) if rm.frozen_rate else None,
+                    float(rm.effective_rate_per_kg),
+                    float(rm.part_weight),
+                    float(rm.runner_weight),
+                    float(rm.process_losses),
+                    float(rm.purging_loss_cost),
+                    float(rm.gross_weight_in_grams),
+                    float(rm.other_rm_cost),
+                    rm.other_rm_cost_description,
+                    float(rm.icc_percentage),
+                    float(rm.rejection_percentage),
+                    float(rm.overhead_percentage),
+                    float(rm.maintenance_percentage),
+                    float(rm.profit_percentage),
+                    float(rm.base_rm_cost),
+                    float(rm.frozen_rm_cost) if rm.frozen_rm_cost else None,
+                    float(rm.total_rm_cost_without_profit),
+                    float(rm.rm_cost),
+                ]
+                for rm in raw_materials
+            ])
+
+        # Moulding Machines (vertical format with calculated fields)
+        if moulding_machines:
             mm_headers = [
                 'Cavity',
                 'Machine Tonnage',
@@ -1746,34 +1958,33 @@ class ExcelExporter:
                 'Profit Cost',
                 'Total Conversion Cost'
             ]
-
-            ExcelExporter._add_vertical_headers(ws_mm, mm_headers, "70AD47")
-
-            for col_num, mm in enumerate(quote.moulding_machines.all(), 2):
-                ws_mm.cell(row=1, column=col_num, value=mm.cavity)
-                ws_mm.cell(row=2, column=col_num, value=float(mm.machine_tonnage))
-                ws_mm.cell(row=3, column=col_num, value=float(mm.cycle_time))
-                ws_mm.cell(row=4, column=col_num, value=float(mm.efficiency))
-                ws_mm.cell(row=5, column=col_num, value=float(mm.shift_rate))
-                ws_mm.cell(row=6, column=col_num, value=float(mm.shift_rate_for_mtc))
-                ws_mm.cell(row=7, column=col_num, value=mm.mtc_count)
-                ws_mm.cell(row=8, column=col_num, value=float(mm.rejection_percentage))
-                ws_mm.cell(row=9, column=col_num, value=float(mm.overhead_percentage))
-                ws_mm.cell(row=10, column=col_num, value=float(mm.maintenance_percentage))
-                ws_mm.cell(row=11, column=col_num, value=float(mm.profit_percentage))
-                ws_mm.cell(row=12, column=col_num, value=mm.number_of_parts_per_shift)
-                ws_mm.cell(row=13, column=col_num, value=float(mm.mtc_cost))
-                ws_mm.cell(row=14, column=col_num, value=float(mm.base_conversion_cost))
-                ws_mm.cell(row=15, column=col_num, value=float(mm.rejection_cost))
-                ws_mm.cell(row=16, column=col_num, value=float(mm.overhead_cost))
-                ws_mm.cell(row=17, column=col_num, value=float(mm.machine_maintenance_cost))
-                ws_mm.cell(row=18, column=col_num, value=float(mm.machine_profit_cost))
-                ws_mm.cell(row=19, column=col_num, value=float(mm.conversion_cost))
-                ws_mm.column_dimensions[get_column_letter(col_num)].width = 18
-
-        # Sheet 4: Assemblies (vertical format with calculated fields)
-        if quote.assemblies.exists():
-            ws_asm = wb.create_sheet("Assemblies")
+            yield ExcelExporter._vertical_sheet("Moulding Machines", mm_headers, [
+                [
+                    mm.cavity,
+                    float(mm.machine_tonnage),
+                    float(mm.cycle_time),
+                    float(mm.efficiency),
+                    float(mm.shift_rate),
+                    float(mm.shift_rate_for_mtc),
+                    mm.mtc_count,
+                    float(mm.rejection_percentage),
+                    float(mm.overhead_percentage),
+                    float(mm.maintenance_percentage),
+                    float(mm.profit_percentage),
+                    mm.number_of_parts_per_shift,
+                    float(mm.mtc_cost),
+                    float(mm.base_conversion_cost),
+                    float(mm.rejection_cost),
+                    float(mm.overhead_cost),
+                    float(mm.machine_maintenance_cost),
+                    float(mm.machine_profit_cost),
+                    float(mm.conversion_cost),
+                ]
+                for mm in moulding_machines
+            ])
+
+        # Assemblies (vertical format with calculated fields)
+        if assemblies:
             asm_headers = [
                 'Assembly Name',
                 'Remarks',
@@ -1788,28 +1999,26 @@ class ExcelExporter:
                 'Rejection Cost',
                 'Total Cost'
             ]
-
-            ExcelExporter._add_vertical_headers(ws_asm, asm_headers, "FFC000")
-
-            for col_num, asm in enumerate(quote.assemblies.all(), 2):
-                costs = asm.calculate_costs()
-                ws_asm.cell(row=1, column=col_num, value=asm.name)
-                ws_asm.cell(row=2, column=col_num, value=asm.remarks)
-                ws_asm.cell(row=3, column=col_num, value=float(asm.manual_cost))
-                ws_asm.cell(row=4, column=col_num, value=float(asm.other_cost))
-                ws_asm.cell(row=5, column=col_num, value=asm.other_cost_description)
-                ws_asm.cell(row=6, column=col_num, value=float(asm.inspection_handling_cost))
-                ws_asm.cell(row=7, column=col_num, value=float(asm.profit_percentage))
-                ws_asm.cell(row=8, column=col_num, value=float(asm.rejection_percentage))
-                ws_asm.cell(row=9, column=col_num, value=float(costs['base_cost']))
-                ws_asm.cell(row=10, column=col_num, value=float(costs['profit_cost']))
-                ws_asm.cell(row=11, column=col_num, value=float(costs['rejection_cost']))
-                ws_asm.cell(row=12, column=col_num, value=float(costs['total_assembly_cost']))
-                ws_asm.column_dimensions[get_column_letter(col_num)].width = 18
-
-        # Sheet 5: Packaging (vertical format with calculated fields)
-        if quote.packagings.exists():
-            ws_pkg = wb.create_sheet("Packaging")
+            yield ExcelExporter._vertical_sheet("Assemblies", asm_headers, [
+                [
+                    line.obj.name,
+                    line.obj.remarks,
+                    float(line.obj.manual_cost),
+                    float(line.obj.other_cost),
+                    line.obj.other_cost_description,
+                    float(line.obj.inspection_handling_cost),
+                    float(line.obj.profit_percentage),
+                    float(line.obj.rejection_percentage),
+                    float(line.details['base_cost']),
+                    float(line.details['profit_cost']),
+                    float(line.details['rejection_cost']),
+                    float(line.details['total_assembly_cost']),
+                ]
+                for line in assemblies
+            ])
+
+        # Packaging (vertical format with calculated fields)
+        if packagings:
             pkg_headers = [
                 'Packaging Category',
                 'Packaging Type',
@@ -1831,34 +2040,36 @@ class ExcelExporter:
                 'Cost per Part',
                 'Total Cost'
             ]
-
-            ExcelExporter._add_vertical_headers(ws_pkg, pkg_headers, "E26B0A")
-
-            for col_num, pkg in enumerate(quote.packagings.all(), 2):
-                ws_pkg.cell(row=1, column=col_num, value=pkg.get_packaging_category_display())
-                ws_pkg.cell(row=2, column=col_num, value=pkg.packaging_type.name if pkg.packaging_type else 'Custom')
-                ws_pkg.cell(row=3, column=col_num, value=pkg.parts_per_packaging)
-                ws_pkg.cell(row=4, column=col_num, value=float(pkg.maintenance_percentage))
-                # Box fields
-                ws_pkg.cell(row=6, column=col_num, value=float(pkg.packaging_length))
-                ws_pkg.cell(row=7, column=col_num, value=float(pkg.packaging_breadth))
-                ws_pkg.cell(row=8, column=col_num, value=float(pkg.packaging_height))
-                ws_pkg.cell(row=9, column=col_num, value=float(pkg.cost))
-                ws_pkg.cell(row=10, column=col_num, value=pkg.lifecycle)
-                # Polybag fields
-                ws_pkg.cell(row=12, column=col_num, value=float(pkg.polybag_length))
-                ws_pkg.cell(row=13, column=col_num, value=float(pkg.polybag_width))
-                ws_pkg.cell(row=14, column=col_num, value=float(pkg.rate_per_kg))
-                ws_pkg.cell(row=15, column=col_num, value=float(pkg.polybags_per_kg))
-                # Calculated
-                ws_pkg.cell(row=17, column=col_num, value=float(pkg.maintenance_cost))
-                ws_pkg.cell(row=18, column=col_num, value=float(pkg.cost_per_part))
-                ws_pkg.cell(row=19, column=col_num, value=float(pkg.total_cost))
-                ws_pkg.column_dimensions[get_column_letter(col_num)].width = 18
-
-        # Sheet 6: Transport (vertical format with calculated fields)
-        if quote.transports.exists():
-            ws_trans = wb.create_sheet("Transport")
+            yield ExcelExporter._vertical_sheet("Packaging", pkg_headers, [
+                [
+                    pkg.get_packaging_category_display(),
+                    pkg.packaging_type.name if pkg.packaging_type else 'Custom',
+                    pkg.parts_per_packaging,
+                    float(pkg.maintenance_percentage),
+                    None,
+                    # Box fields
+                    float(pkg.packaging_length),
+                    float(pkg.packaging_breadth),
+                    float(pkg.packaging_height),
+                    float(pkg.cost),
+                    pkg.lifecycle,
+                    None,
+                    # Polybag fields
+                    float(pkg.polybag_length),
+                    float(pkg.polybag_width),
+                    float(pkg.rate_per_kg),
+                    float(pkg.polybags_per_kg),
+                    None,
+                    # Calculated
+                    float(pkg.maintenance_cost),
+                    float(pkg.cost_per_part),
+                    float(pkg.total_cost),
+                ]
+                for pkg in packagings
+            ])
+
+        # Transport (vertical format with calculated fields)
+        if transports:
             trans_headers = [
                 'Length (ft)',
                 'Breadth (ft)',
@@ -1875,112 +2086,104 @@ class ExcelExporter:
                 'Total Parts per Trip',
                 'Trip Cost per Part'
             ]
+            yield ExcelExporter._vertical_sheet("Transport", trans_headers, [
+                [
+                    float(trans.transport_length),
+                    float(trans.transport_breadth),
+                    float(trans.transport_height),
+                    float(trans.trip_cost),
+                    trans.parts_per_box,
+                    float(trans.transport_length_mm),
+                    float(trans.transport_breadth_mm),
+                    float(trans.transport_height_mm),
+                    trans.boxes_on_length,
+                    trans.boxes_on_breadth,
+                    trans.boxes_on_height,
+                    trans.total_boxes,
+                    trans.total_parts_per_trip,
+                    float(trans.trip_cost_per_part),
+                ]
+                for trans in transports
+            ])
 
-            ExcelExporter._add_vertical_headers(ws_trans, trans_headers, "9933FF")
-
-            for col_num, trans in enumerate(quote.transports.all(), 2):
-                ws_trans.cell(row=1, column=col_num, value=float(trans.transport_length))
-                ws_trans.cell(row=2, column=col_num, value=float(trans.transport_breadth))
-                ws_trans.cell(row=3, column=col_num, value=float(trans.transport_height))
-                ws_trans.cell(row=4, column=col_num, value=float(trans.trip_cost))
-                ws_trans.cell(row=5, column=col_num, value=trans.parts_per_box)
-                ws_trans.cell(row=6, column=col_num, value=float(trans.transport_length_mm))
-                ws_trans.cell(row=7, column=col_num, value=float(trans.transport_breadth_mm))
-                ws_trans.cell(row=8, column=col_num, value=float(trans.transport_height_mm))
-                ws_trans.cell(row=9, column=col_num, value=trans.boxes_on_length)
-                ws_trans.cell(row=10, column=col_num, value=trans.boxes_on_breadth)
-                ws_trans.cell(row=11, column=col_num, value=trans.boxes_on_height)
-                ws_trans.cell(row=12, column=col_num, value=trans.total_boxes)
-                ws_trans.cell(row=13, column=col_num, value=trans.total_parts_per_trip)
-                ws_trans.cell(row=14, column=col_num, value=float(trans.trip_cost_per_part))
-                ws_trans.column_dimensions[get_column_letter(col_num)].width = 18
-
-        # Sheet 7: Summary
-        ws_summary = wb.create_sheet("Summary", 0)  # Insert at beginning
-        summary_headers = [
-            'Description',
-            'Amount'
-        ]
-
-        ws_summary.cell(row=1, column=1, value='Description').font = Font(bold=True)
-        ws_summary.cell(row=1, column=2, value='Amount').font = Font(bold=True)
+    @staticmethod
+    def _write_sheet(ws, sheet):
+        """Write an ExportSheet into a regular worksheet"""
+        for row_num, row in enumerate(sheet.styled_rows(), 1):
+            for col_num, (value, style) in enumerate(row, 1):
+                if value is None and style is None:
+                    continue
+                cell = ws.cell(row=row_num, column=col_num, value=value)
+                if style:
+                    cell.style = style
+        for letter, width in sheet.widths.items():
+            ws.column_dimensions[letter].width = width
 
-        summary_data = [
-            ('Quote Name', quote.name),
-            ('Version', f"{quote.major_version}.{quote.minor_version}"),
-            ('Quantity', quote.quantity),
-            ('', ''),
-            ('Total Raw Material Cost', float(quote.get_total_raw_material_cost())),
-            ('Total Conversion Cost', float(quote.get_total_conversion_cost())),
-            ('Total Assembly Cost', float(quote.get_total_assembly_cost())),
-            ('Total Packaging Cost', float(quote.get_total_packaging_cost())),
-            ('Total Transport Cost', float(quote.get_total_transport_cost())),
-            ('', ''),
-            ('Base Cost', float(quote.get_base_cost())),
-            ('Profit Amount', float(quote.get_profit_amount())),
-            ('Handling Charge', float(quote.handling_charge)),
-            ('', ''),
-            ('Grand Total', float(quote.get_grand_total())),
-            ('Cost per Part', float(quote.get_grand_total()) / quote.quantity if quote.quantity > 0 else 0),
-        ]
+    @staticmethod
+    def _stream_sheet(ws, sheet):
+        """Write an ExportSheet into a write-only worksheet and close it"""
+        for letter, width in sheet.widths.items():
+            ws.column_dimensions[letter].width = width
+        for row in sheet.styled_rows():
+            cells = []
+            for value, style in row:
+                if style:
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.style = style
+                    cells.append(cell)
+                else:
+                    cells.append(value)
+            ws.append(cells)
+        # Flush the sheet to its temp file now rather than holding it open until save
+        ws.close()
 
-        for row_num, (desc, amt) in enumerate(summary_data, 2):
-            ws_summary.cell(row=row_num, column=1, value=desc)
-            if isinstance(amt, (int, float)):
-                ws_summary.cell(row=row_num, column=2, value=amt)
+    @staticmethod
+    def export_quote(quote, breakdown=None):
+        """Export a single quote with all components and calculated fields"""
+        wb = Workbook()
+        wb.remove(wb.active)
+        ExcelExporter._register_styles(wb)
 
-        ws_summary.column_dimensions['A'].width = 30
-        ws_summary.column_dimensions['B'].width = 20
+        for sheet in ExcelExporter.quote_sheets(quote, breakdown):
+            ExcelExporter._write_sheet(wb.create_sheet(sheet.title), sheet)
 
         return wb
 
     @staticmethod
-    def export_project(project):
-        """Export entire project with all quotes"""
-        wb = Workbook()
-        wb.remove(wb.active)
-
-        # Create a summary sheet
-        ws_summary = wb.create_sheet("Project Summary")
-        ws_summary.cell(row=1, column=1, value='Project Name').font = Font(bold=True)
-        ws_summary.cell(row=1, column=2, value=project.name)
-        ws_summary.cell(row=2, column=1, value='Description').font = Font(bold=True)
-        ws_summary.cell(row=2, column=2, value=project.description)
-        ws_summary.cell(row=3, column=1, value='Total Quotes').font = Font(bold=True)
-        ws_summary.cell(row=3, column=2, value=project.quotes.count())
-
-        ws_summary.column_dimensions['A'].width = 20
-        ws_summary.column_dimensions['B'].width = 50
-
-        # Add a sheet for each quote
-        for quote in project.quotes.all():
-            # Export each quote to its own workbook
-            quote_wb = ExcelExporter.export_quote(quote)
-
-            # Copy all sheets from quote workbook to project workbook
-            for sheet_name in quote_wb.sheetnames:
-                source_sheet = quote_wb[sheet_name]
-                # Create unique sheet name with quote name prefix
-                target_sheet_name = f"{quote.name[:20]}_{sheet_name}"[:31]  # Excel sheet name limit
-                target_sheet = wb.create_sheet(target_sheet_name)
-
-                # Copy all cells
-                for row in source_sheet.iter_rows():
-                    for cell in row:
-                        target_cell = target_sheet[cell.coordinate]
-                        target_cell.value = cell.value
-                        if cell.has_style:
-                            target_cell.font = cell.font.copy()
-                            target_cell.fill = cell.fill.copy()
-                            target_cell.alignment = cell.alignment.copy()
-
-                # Copy column dimensions
-                for col_letter, col_dim in source_sheet.column_dimensions.items():
-                    target_sheet.column_dimensions[col_letter].width = col_dim.width
-
-        return wb# =============================================================================
+    def export_project(project, output):
+        """
+        Export entire project with all quotes into ``output`` (a path or a
+        seekable binary file). Sheets are streamed into a write-only workbook
+        one quote at a time, so memory does not grow with the project size.
+        """
+        wb = Workbook(write_only=True)
+        ExcelExporter._register_styles(wb)
 
+        quotes = project.quotes.with_cost_graph()
 
+        # Create a summary sheet
+        ExcelExporter._stream_sheet(wb.create_sheet("Project Summary"), ExportSheet(
+            "Project Summary",
+            [
+                ['Project Name', project.name],
+                ['Description', project.description],
+                ['Total Quotes', quotes.count()],
+            ],
+            {'A': 20, 'B': 50},
+            label_style=ExcelExporter.BOLD_STYLE,
+        ))
+
+        # Add the sheets of each quote, with the quote name as prefix
+        for quote in quotes.iterator(chunk_size=50):
+            for sheet in ExcelExporter.quote_sheets(quote):
+                title = f"{quote.name[:20]}_{sheet.title}"[:31]  # Excel sheet name limit
+                ExcelExporter._stream_sheet(wb.create_sheet(title), sheet)
+
+        wb.save(output)
+        return output
+
+
+# =============================================================================
 # Configuration Type Template Generators and Parsers
 # Add these classes at the end of the file
 
@@ -2139,7 +2342,7 @@ class ConfigParser:
     @staticmethod
     def parse_material_types(file_path, customer_group):
         """Parse material types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Import here to avoid circular imports
         from core.models import MaterialType
@@ -2157,43 +2360,44 @@ class ConfigParser:
         count = 0
         errors = []
 
+        upsert = ConfigTypeUpsert(MaterialType, 'raw_material_name', customer_group)
+
         # Read each column starting from column B
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                raw_material_name = ws.cell(1, col_num).value
+                raw_material_name = ws.value(1, col_num)
                 if not raw_material_name:
                     break
 
                 # MaterialType.objects.create(
                 #     customer_group=customer_group,
                 #     raw_material_name=str(raw_material_name),
-                #     raw_material_grade=str(ws.cell(2, col_num).value or ''),
-                #     raw_material_code=str(ws.cell(3, col_num).value or ''),
-                #     raw_material_rate=float(ws.cell(4, col_num).value or 0),
-                #     remarks=str(ws.cell(5, col_num).value or ''),  # NEW
+                #     raw_material_grade=str(ws.value(2, col_num) or ''),
+                #     raw_material_code=str(ws.value(3, col_num) or ''),
+                #     raw_material_rate=float(ws.value(4, col_num) or 0),
+                #     remarks=str(ws.value(5, col_num) or ''),  # NEW
                 # )
-                MaterialType.objects.update_or_create(
-                    customer_group=customer_group,
-                    raw_material_name=str(raw_material_name),
-                    defaults={
-                        'raw_material_grade': str(ws.cell(2, col_num).value or ''),
-                        'raw_material_code': str(ws.cell(3, col_num).value or ''),
-                        'raw_material_rate': float(ws.cell(4, col_num).value or 0),
-                        'remarks': str(ws.cell(5, col_num).value or '')
-                    })
+                upsert.add(str(raw_material_name), {
+                    'raw_material_grade': str(ws.value(2, col_num) or ''),
+                    'raw_material_code': str(ws.value(3, col_num) or ''),
+                    'raw_material_rate': float(ws.value(4, col_num) or 0),
+                    'remarks': str(ws.value(5, col_num) or '')
+                })
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        upsert.save()
+
         return count, errors
 
     @staticmethod
     def parse_machine_types(file_path, customer_group):
         """Parse moulding machine types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Import here to avoid circular imports
         from core.models import MouldingMachineType
@@ -2211,42 +2415,43 @@ class ConfigParser:
         count = 0
         errors = []
 
+        upsert = ConfigTypeUpsert(MouldingMachineType, 'name', customer_group)
+
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                name = ws.cell(1, col_num).value
+                name = ws.value(1, col_num)
                 if not name:
                     break
 
                 # MouldingMachineType.objects.create(
                 #     customer_group=customer_group,
                 #     name=str(name),
-                #     shift_rate=float(ws.cell(2, col_num).value or 0),
-                #     shift_rate_for_mtc=float(ws.cell(3, col_num).value or 0),
-                #     mtc_count=int(ws.cell(4, col_num).value or 0),
-                #     remarks=str(ws.cell(5, col_num).value or ''),  # NEW
+                #     shift_rate=float(ws.value(2, col_num) or 0),
+                #     shift_rate_for_mtc=float(ws.value(3, col_num) or 0),
+                #     mtc_count=int(ws.value(4, col_num) or 0),
+                #     remarks=str(ws.value(5, col_num) or ''),  # NEW
                 # )
-                MouldingMachineType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'shift_rate': float(ws.cell(2, col_num).value or 0),
-                        'shift_rate_for_mtc': float(ws.cell(3, col_num).value or 0),
-                        'mtc_count': int(ws.cell(4, col_num).value or 0),
-                        'remarks': str(ws.cell(5, col_num).value or '')
-                    })
+                upsert.add(str(name), {
+                    'shift_rate': float(ws.value(2, col_num) or 0),
+                    'shift_rate_for_mtc': float(ws.value(3, col_num) or 0),
+                    'mtc_count': int(ws.value(4, col_num) or 0),
+                    'remarks': str(ws.value(5, col_num) or '')
+                })
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        upsert.save()
+
         return count, errors
 
     @staticmethod
     def parse_assembly_types(file_path, customer_group):
         """Parse assembly types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Import here to avoid circular imports
         from core.models import AssemblyType
@@ -2264,40 +2469,41 @@ class ConfigParser:
         count = 0
         errors = []
 
+        upsert = ConfigTypeUpsert(AssemblyType, 'name', customer_group)
+
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                name = ws.cell(1, col_num).value
+                name = ws.value(1, col_num)
                 if not name:
                     break
 
                 # AssemblyType.objects.create(
                 #     customer_group=customer_group,
                 #     name=str(name),
-                #     value=str(ws.cell(2, col_num).value or ''),
-                #     description=str(ws.cell(3, col_num).value or ''),
-                #     remarks=str(ws.cell(4, col_num).value or ''),  # NEW
+                #     value=str(ws.value(2, col_num) or ''),
+                #     description=str(ws.value(3, col_num) or ''),
+                #     remarks=str(ws.value(4, col_num) or ''),  # NEW
                 # )
-                AssemblyType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'value': str(ws.cell(2, col_num).value or ''),
-                        'description': str(ws.cell(3, col_num).value or ''),
-                        'remarks': str(ws.cell(4, col_num).value or '')
-                    })
+                upsert.add(str(name), {
+                    'value': str(ws.value(2, col_num) or ''),
+                    'description': str(ws.value(3, col_num) or ''),
+                    'remarks': str(ws.value(4, col_num) or '')
+                })
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        upsert.save()
+
         return count, errors
 
     @staticmethod
     def parse_packaging_types(file_path, customer_group):
         """Parse packaging types from Excel (vertical format)"""
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = UploadedWorkbook(file_path)
 
         # Import here to avoid circular imports
         from core.models import PackagingType
@@ -2315,48 +2521,49 @@ class ConfigParser:
         count = 0
         errors = []
 
+        upsert = ConfigTypeUpsert(PackagingType, 'name', customer_group)
+
         col_num = 2
         while col_num <= ws.max_column:
             try:
-                name = ws.cell(1, col_num).value
+                name = ws.value(1, col_num)
                 if not name:
                     break
 
-                category = str(ws.cell(2, col_num).value or 'box').lower()
+                category = str(ws.value(2, col_num) or 'box').lower()
 
                 # PackagingType.objects.create(
                 #     customer_group=customer_group,
                 #     name=str(name),
                 #     packaging_category=category,
                 #     # Box fields (rows 4-6)
-                #     default_length=float(ws.cell(4, col_num).value or 600),
-                #     default_breadth=float(ws.cell(5, col_num).value or 400),
-                #     default_height=float(ws.cell(6, col_num).value or 250),
+                #     default_length=float(ws.value(4, col_num) or 600),
+                #     default_breadth=float(ws.value(5, col_num) or 400),
+                #     default_height=float(ws.value(6, col_num) or 250),
                 #     # Polybag fields (rows 8-11)
-                #     default_polybag_length=float(ws.cell(8, col_num).value or 0),
-                #     default_polybag_width=float(ws.cell(9, col_num).value or 0),
-                #     default_rate_per_kg=float(ws.cell(10, col_num).value or 0),
-                #     default_polybags_per_kg=float(ws.cell(11, col_num).value or 0),
-                #     remarks=str(ws.cell(12, col_num).value or ''),  # NEW - row 12
+                #     default_polybag_length=float(ws.value(8, col_num) or 0),
+                #     default_polybag_width=float(ws.value(9, col_num) or 0),
+                #     default_rate_per_kg=float(ws.value(10, col_num) or 0),
+                #     default_polybags_per_kg=float(ws.value(11, col_num) or 0),
+                #     remarks=str(ws.value(12, col_num) or ''),  # NEW - row 12
                 # )
-                PackagingType.objects.update_or_create(
-                    customer_group=customer_group,
-                    name=str(name),
-                    defaults={
-                        'packaging_category': category,
-                        'default_length': float(ws.cell(4, col_num).value or 600),
-                        'default_breadth': float(ws.cell(5, col_num).value or 400),
-                        'default_height': float(ws.cell(6, col_num).value or 250),
-                        'default_polybag_length': float(ws.cell(8, col_num).value or 0),
-                        'default_polybag_width': float(ws.cell(9, col_num).value or 0),
-                        'default_rate_per_kg': float(ws.cell(10, col_num).value or 0),
-                        'default_polybags_per_kg': float(ws.cell(11, col_num).value or 0),
-                        'remarks': str(ws.cell(12, col_num).value or '')
-                    })
+                upsert.add(str(name), {
+                    'packaging_category': category,
+                    'default_length': float(ws.value(4, col_num) or 600),
+                    'default_breadth': float(ws.value(5, col_num) or 400),
+                    'default_height': float(ws.value(6, col_num) or 250),
+                    'default_polybag_length': float(ws.value(8, col_num) or 0),
+                    'default_polybag_width': float(ws.value(9, col_num) or 0),
+                    'default_rate_per_kg': float(ws.value(10, col_num) or 0),
+                    'default_polybags_per_kg': float(ws.value(11, col_num) or 0),
+                    'remarks': str(ws.value(12, col_num) or '')
+                })
                 count += 1
                 col_num += 1
             except Exception as e:
                 errors.append(f"Column {get_column_letter(col_num)}: {str(e)}")
                 col_num += 1
 
+        upsert.save()
+
         return count, errors
@@ -0,0 +1,129 @@
+"""
+On-disk cache of exported quote and project workbooks.
+
+A quote export is keyed on the quote's id, version and status. A project
+export is keyed on a digest of its own fields and every member quote's
+version. Bumping a version therefore makes the next download miss and
+rebuild. Type propagation rewrites quote rows without a version bump, and
+the exporter reads packaging type names from the type itself, so both call
+``invalidate_quotes`` instead. The directory is kept under
+``EXPORT_CACHE_MAX_BYTES`` by evicting the least recently read files.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Quote
+
+# Bump when the exporter's output changes, so stale files are not served
+EXPORT_FORMAT = 1
+
+
+def cache_dir():
+    path = Path(settings.EXPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def quote_key(quote):
+    """Key for a quote export; everything before ``--`` identifies the quote"""
+    return f'quote-{quote.pk}--v{quote.major_version}.{quote.minor_version}-{quote.status}-f{EXPORT_FORMAT}'
+
+
+def project_key(project):
+    """Key for a project export; one query over the project's quotes"""
+    digest = hashlib.sha1()
+    digest.update(f'{project.name}\0{project.description}\0{EXPORT_FORMAT}'.encode())
+    versions = project.quotes.order_by('pk').values_list('pk', 'major_version', 'minor_version', 'status')
+    for row in versions:
+        digest.update(('\0' + ':'.join(map(str, row))).encode())
+    return f'project-{project.pk}--{digest.hexdigest()[:20]}'
+
+
+def _path(key):
+    return cache_dir() / f'{key}.xlsx'
+
+
+def _discard(pattern, keep=None):
+    for path in cache_dir().glob(pattern):
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def open_export(key, build):
+    """
+    Open the cached workbook for ``key``, calling ``build(file)`` to write it
+    first on a miss. Returns a binary file positioned at the start.
+    """
+    path = _path(key)
+    try:
+        cached = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        # The mtime is the last-read time used for LRU eviction
+        os.utime(path)
+        return cached
+
+    # Older versions of the same quote or project can never be requested again;
+    # a concurrent miss on the same key may already have written this one
+    _discard(f"{key.split('--')[0]}--*.xlsx", keep=path)
+
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir(), suffix='.tmp')
+    cached = None
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            build(tmp)
+        # Opened before it is published, so a concurrent discard or eviction
+        # can only unlink the name, never the file being returned
+        cached = open(tmp_path, 'rb')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if cached is not None:
+            cached.close()
+        os.unlink(tmp_path)
+        raise
+    evict()
+    return cached
+
+
+def evict(max_bytes=None):
+    """Delete the least recently read exports until the cache fits ``max_bytes``"""
+    if max_bytes is None:
+        max_bytes = settings.EXPORT_CACHE_MAX_BYTES
+    entries = []
+    for path in cache_dir().glob('*.xlsx'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def invalidate_quotes(quote_ids):
+    """Drop cached exports of these quotes and of the projects containing them"""
+    quote_ids = set(quote_ids)
+    if not quote_ids:
+        return
+    project_ids = Quote.objects.filter(pk__in=quote_ids).values_list('project_id', flat=True).distinct()
+    for quote_id in quote_ids:
+        _discard(f'quote-{quote_id}--*.xlsx')
+    for project_id in project_ids:
+        _discard(f'project-{project_id}--*.xlsx')
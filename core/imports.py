@@ -0,0 +1,168 @@
+"""
+Background processing of uploaded Excel workbooks.
+
+Upload views store the file on an ImportJob and return straight away; the
+``run_import_worker`` management command claims queued jobs and runs the
+parsers here, recording progress, row errors and counts on the job for the
+status page to poll. The worker reads the uploaded files from MEDIA_ROOT,
+so it must run where the web process's MEDIA_ROOT is mounted; each upload
+is deleted once its job has finished.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .excel_utils import ExcelParser, ConfigParser
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_import(kind, uploaded_file, user, project=None, quote=None, customer_group=None, dry_run=False):
+    """Store an uploaded workbook and queue it for the import worker"""
+    return ImportJob.objects.create(
+        kind=kind,
+        dry_run=dry_run,
+        file=uploaded_file,
+        original_name=getattr(uploaded_file, 'name', '')[:255],
+        project=project,
+        quote=quote,
+        customer_group=customer_group,
+        created_by=user,
+    )
+
+
+def claim_next_job(worker):
+    """
+    Mark the oldest queued job as running for ``worker`` and return it, or
+    None when the queue is empty. The claim is a conditional UPDATE, so
+    concurrent workers never pick up the same job.
+    """
+    queued = ImportJob.objects.filter(status='queued').order_by('created_at', 'pk')
+    while True:
+        job_id = queued.values_list('pk', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = ImportJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', worker=worker[:100], started_at=timezone.now(),
+            progress=0, message='Starting')
+        if claimed:
+            return ImportJob.objects.select_related(
+                'project', 'quote', 'customer_group', 'created_by').get(pk=job_id)
+
+
+def requeue_stale_jobs(started_before):
+    """
+    Put jobs left running by a worker that died back on the queue. Nothing
+    tells a dead worker from a slow one, so only call this when no worker
+    can still be running jobs started before ``started_before``.
+    """
+    return ImportJob.objects.filter(status='running', started_at__lt=started_before).update(
+        status='queued', worker='', started_at=None, progress=0, message='Requeued after worker stopped')
+
+
+class JobProgress:
+    """Writes progress for a running job, skipping writes that would not change it"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def __call__(self, percent, message=None):
+        percent = max(0, min(int(percent), 100))
+        if message is None:
+            message = self.job.message
+        if percent == self.job.progress and message == self.job.message:
+            return
+        self.job.progress = percent
+        self.job.message = message
+        # A plain UPDATE outside any import transaction, so pollers see it at once
+        ImportJob.objects.filter(pk=self.job.pk).update(progress=percent, message=message[:255])
+
+    def span(self, start, end, message):
+        """Callback mapping ``(done, total)`` onto the ``start``-``end`` percent range"""
+        def report(done, total):
+            fraction = done / total if total else 1
+            self(start + (end - start) * fraction, f'{message} ({done} of {total})')
+        return report
+
+
+def _import_complete_quote(job, workbook, progress):
+    if job.dry_run:
+        progress(10, 'Reading workbook')
+        quote, errors, results = ExcelParser.parse_complete_quote(workbook, job.quote, preview=True)
+        job.preview = [results.pop('preview')]
+        return results, errors
+
+    progress(10, 'Importing workbook')
+    # The new rows and the version they are recorded under commit together
+    with transaction.atomic():
+        quote, errors, results = ExcelParser.parse_complete_quote(workbook, job.quote)
+        job.quote.increment_version(job.created_by, 'Complete quote uploaded from Excel', 'quote_updated')
+    return results, errors
+
+
+def _import_multiple_quotes(job, workbook, progress):
+    progress(5, 'Reading workbook')
+    results = ExcelParser.parse_multiple_quotes_complete(
+        workbook, job.project, job.customer_group, job.created_by,
+        progress=progress.span(10, 90, 'Pricing quotes' if job.dry_run else 'Reading quotes'),
+        preview=job.dry_run)
+    if job.dry_run:
+        job.preview = results['preview']
+    counts = {'quotes': results['quotes'], **results['components']}
+    return counts, results['errors']
+
+
+def _config_importer(parse, label):
+    def run(job, workbook, progress):
+        progress(10, 'Reading workbook')
+        count, errors = parse(workbook, job.customer_group)
+        return {label: count}, errors
+    return run
+
+
+IMPORTERS = {
+    'complete_quote': _import_complete_quote,
+    'multiple_quotes': _import_multiple_quotes,
+    'material_types': _config_importer(ConfigParser.parse_material_types, 'material_types'),
+    'machine_types': _config_importer(ConfigParser.parse_machine_types, 'machine_types'),
+    'assembly_types': _config_importer(ConfigParser.parse_assembly_types, 'assembly_types'),
+    'packaging_types': _config_importer(ConfigParser.parse_packaging_types, 'packaging_types'),
+}
+
+
+def run_import_job(job):
+    """Run a claimed job to completion, recording its outcome on the job"""
+    progress = JobProgress(job)
+    try:
+        importer = IMPORTERS[job.kind]
+        if job.dry_run and job.kind not in ('complete_quote', 'multiple_quotes'):
+            raise ValueError('Only quote imports can be previewed.')
+        if job.kind == 'complete_quote' and not job.dry_run and not job.quote.can_edit_sections():
+            raise ValueError('This quote is completed or discarded and cannot be edited.')
+        with job.file.open('rb') as workbook:
+            counts, errors = importer(job, workbook, progress)
+    except Exception as e:
+        logger.exception('Import job %s failed', job.pk)
+        job.status = 'failed'
+        job.message = 'Import failed'
+        job.errors = [f'Error processing file: {e}']
+    else:
+        job.status = 'succeeded'
+        job.progress = 100
+        job.message = 'Preview finished, nothing was saved' if job.dry_run else 'Import finished'
+        job.counts = counts
+        job.errors = [str(error) for error in errors]
+    job.finished_at = timezone.now()
+    _delete_upload(job)
+    job.save(update_fields=['status', 'progress', 'message', 'counts', 'errors', 'preview', 'file', 'finished_at'])
+    return job
+
+
+def _delete_upload(job):
+    """Remove a finished job's workbook; the job keeps its original file name"""
+    try:
+        job.file.delete(save=False)
+    except OSError:
+        logger.exception('Could not delete the upload of import job %s', job.pk)
@@ -0,0 +1,88 @@
+import json
+import platform
+import sys
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core.benchmark import SCENARIO_NAMES, build_upload_files, run_scenarios, seed_dataset
+
+
+class Command(BaseCommand):
+    help = ('Seed a synthetic dataset and time quote pages, pricing, Excel imports and exports '
+            'and config type signals, reporting JSON. The dataset is rolled back unless --keep is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer-groups', type=int, default=2)
+        parser.add_argument('--types', type=int, default=10,
+                            help='Material, machine and assembly types per customer group')
+        parser.add_argument('--projects', type=int, default=4, help='Projects per customer group')
+        parser.add_argument('--quotes', type=int, default=10, help='Quotes per project')
+        parser.add_argument('--rows', type=int, default=5,
+                            help='Rows per quote section, per assembly child table and per uploaded sheet')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before timing a scenario')
+        parser.add_argument('--scenario', action='append', choices=SCENARIO_NAMES,
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated values')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded dataset')
+
+    def handle(self, *args, **options):
+        for option in ('customer_groups', 'types', 'projects', 'quotes', 'rows', 'repeat'):
+            if options[option] < 1:
+                raise CommandError(f'--{option.replace("_", "-")} must be at least 1')
+
+        names = options['scenario'] or SCENARIO_NAMES
+        progress = self.stderr if not options['output'] else self.stdout
+
+        def report(name, result):
+            progress.write(f'{name}: median {result["median_ms"]} ms, {result["queries"]} queries')
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            data = seed_dataset(
+                customer_groups=options['customer_groups'],
+                config_types=options['types'],
+                projects=options['projects'],
+                quotes_per_project=options['quotes'],
+                rows=options['rows'],
+                seed=options['seed'],
+            )
+            seed_seconds = time.perf_counter() - start
+            progress.write(f'Seeded {data.counts["quotes"]} quotes in {seed_seconds:.1f}s')
+
+            files = build_upload_files(options['rows'], options['quotes'], options['types'])
+            scenarios = run_scenarios(data, files, names, repeat=options['repeat'],
+                                      warmup=options['warmup'], report=report)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        result = {
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'platform': sys.platform,
+            },
+            'dataset': {
+                'customer_groups': options['customer_groups'],
+                'types': options['types'],
+                'projects': options['projects'],
+                'quotes': options['quotes'],
+                'rows': options['rows'],
+                'seed': options['seed'],
+                'kept': options['keep'],
+                'seed_seconds': round(seed_seconds, 3),
+                'counts': data.counts,
+            },
+            'scenarios': scenarios,
+        }
+        report_json = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report_json + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote benchmark report to {options["output"]}'))
+        else:
+            self.stdout.write(report_json)
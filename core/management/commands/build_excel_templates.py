@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from core.excel_templates import TEMPLATES, build_template, template_path
+
+
+class Command(BaseCommand):
+    help = 'Pre-build the static Excel upload templates into EXCEL_TEMPLATE_DIR (run on deploy)'
+
+    def handle(self, *args, **options):
+        for name in TEMPLATES:
+            path = template_path(name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            content = build_template(name)
+
+            # Write next to the target and swap it in, so a running process never reads half a file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(content)
+            os.replace(tmp_path, path)
+            self.stdout.write(f'{path.name}: {len(content)} bytes')
+
+        self.stdout.write(self.style.SUCCESS(f'Built {len(TEMPLATES)} templates in {path.parent}'))
@@ -0,0 +1,79 @@
+import importlib
+import json
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.migrations.operations import AddIndex
+from core.benchmark import dropped_indexes, explain_patterns, seed_dataset
+
+# The migration whose indexes --compare measures against
+INDEX_MIGRATION = 'core.migrations.0044_access_pattern_indexes'
+
+
+def migration_indexes():
+    """(model, index) for every index added by INDEX_MIGRATION"""
+    migration = importlib.import_module(INDEX_MIGRATION).Migration
+    return [
+        (apps.get_model('core', operation.model_name), operation.index)
+        for operation in migration.operations if isinstance(operation, AddIndex)
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Seed a large dataset and show the query plan and run time of the most frequent lookups, '
+            'optionally with and without the access pattern indexes. The dataset is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer-groups', type=int, default=4)
+        parser.add_argument('--types', type=int, default=50,
+                            help='Material, machine and assembly types per customer group')
+        parser.add_argument('--projects', type=int, default=50, help='Projects per customer group')
+        parser.add_argument('--quotes', type=int, default=10, help='Quotes per project')
+        parser.add_argument('--rows', type=int, default=3, help='Rows per quote section')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--compare', action='store_true',
+                            help=f'Also measure with the indexes from {INDEX_MIGRATION} dropped')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        with transaction.atomic():
+            data = seed_dataset(
+                customer_groups=options['customer_groups'],
+                config_types=options['types'],
+                projects=options['projects'],
+                quotes_per_project=options['quotes'],
+                rows=options['rows'],
+            )
+            results = {'indexed': explain_patterns(data, options['repeat'], 'indexed')}
+            if options['compare']:
+                with dropped_indexes(migration_indexes()):
+                    results['unindexed'] = explain_patterns(data, options['repeat'], 'unindexed')
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'dataset': data.counts, **results}, indent=2))
+            return
+
+        self.stdout.write(f'Dataset: {", ".join(f"{count} {name}" for name, count in data.counts.items())}\n')
+        for name, indexed in results['indexed'].items():
+            unindexed = results.get('unindexed', {}).get(name)
+            timing = f'{indexed["median_ms"]} ms'
+            if unindexed:
+                timing = f'{unindexed["median_ms"]} ms without indexes -> {timing}'
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {timing}'))
+            if unindexed and unindexed['plan'] != indexed['plan']:
+                self.stdout.write('  Without indexes:')
+                self.stdout.write(self._indent(unindexed['plan'], 4))
+                self.stdout.write('  With indexes:')
+                self.stdout.write(self._indent(indexed['plan'], 4))
+            else:
+                self.stdout.write(self._indent(indexed['plan'], 2))
+        self.stdout.write(self.style.SUCCESS(f'Explained {len(results["indexed"])} queries'))
+
+    @staticmethod
+    def _indent(text, spaces):
+        return '\n'.join(' ' * spaces + line for line in text.splitlines())
@@ -0,0 +1,79 @@
+import json
+import statistics
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Summarise the request profiles written by RequestProfileMiddleware, slowest views first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Profile log to read (default: REQUEST_PROFILE_LOG)')
+        parser.add_argument('--view', action='append', help='Only include this view name (repeatable)')
+        parser.add_argument('--top', type=int, default=5, help='Repeated query fingerprints to list')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        path = options['log'] or getattr(settings, 'REQUEST_PROFILE_LOG', None)
+        if not path:
+            raise CommandError('No profile log configured; pass --log')
+        try:
+            with open(path) as f:
+                profiles = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            raise CommandError(f'{path} does not exist; is REQUEST_PROFILING on?')
+        if options['view']:
+            profiles = [profile for profile in profiles if profile['view'] in options['view']]
+
+        by_view = defaultdict(list)
+        duplicates = Counter()
+        for profile in profiles:
+            by_view[profile['view'] or 'unresolved'].append(profile)
+            for entry in profile['duplicates']:
+                duplicates[(profile['view'], entry['sql'])] += entry['count'] - 1
+
+        views = []
+        for view, rows in by_view.items():
+            wall = [row['wall_ms'] for row in rows]
+            views.append({
+                'view': view,
+                'requests': len(rows),
+                'over_budget': sum(1 for row in rows if row['over_budget']),
+                'median_ms': round(statistics.median(wall), 1),
+                'p95_ms': round(_percentile(wall, 0.95), 1),
+                'max_ms': round(max(wall), 1),
+                'avg_queries': round(statistics.mean(row['queries'] for row in rows), 1),
+                'max_queries': max(row['queries'] for row in rows),
+                'avg_sql_ms': round(statistics.mean(row['sql_ms'] for row in rows), 1),
+                'avg_calculation_ms': round(statistics.mean(row['calculation_ms'] for row in rows), 1),
+            })
+        views.sort(key=lambda row: row['p95_ms'], reverse=True)
+        repeated = [
+            {'view': view, 'sql': sql, 'repeats': count}
+            for (view, sql), count in duplicates.most_common(options['top'])
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps({'views': views, 'repeated_queries': repeated}, indent=2))
+            return
+
+        self.stdout.write(f'{len(profiles)} requests in {path}')
+        self.stdout.write(f'{"View":<36}{"Reqs":>6}{"Over":>6}{"Median":>9}{"p95":>9}{"Max":>9}'
+                          f'{"Queries":>9}{"SQL ms":>8}{"Cost ms":>9}')
+        for row in views:
+            line = (f'{row["view"][:35]:<36}{row["requests"]:>6}{row["over_budget"]:>6}{row["median_ms"]:>9}'
+                    f'{row["p95_ms"]:>9}{row["max_ms"]:>9}{row["avg_queries"]:>9}{row["avg_sql_ms"]:>8}'
+                    f'{row["avg_calculation_ms"]:>9}')
+            self.stdout.write(self.style.WARNING(line) if row['over_budget'] else line)
+        if repeated:
+            self.stdout.write('\nMost repeated queries:')
+            for entry in repeated:
+                self.stdout.write(f'  {entry["repeats"]:>5}x {entry["view"]}: {entry["sql"][:160]}')
+        self.stdout.write(self.style.SUCCESS(f'Summarised {len(views)} views'))
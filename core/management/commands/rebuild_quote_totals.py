@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from core.costing import STORED_TOTAL_FIELDS, price_quote, stored_totals
+from core.models import Quote
+
+
+class Command(BaseCommand):
+    help = ('Rebuild (or with --verify, check) the materialized cost totals stored on quotes. '
+            'Run once after migrating past core 0041, which adds the columns at zero')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only report quotes whose stored totals are out of date')
+        parser.add_argument('--project', type=int, help='Limit to quotes of this project id')
+        parser.add_argument('--quote', type=int, action='append', help='Limit to this quote id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--tolerance', type=Decimal, default=Decimal('0.000001'),
+                            help='Largest difference treated as equal when verifying')
+
+    def handle(self, *args, **options):
+        quotes = Quote.objects.order_by('pk').prefetch_related(
+            'raw_materials',
+            'moulding_machines',
+            'assemblies__assembly_raw_materials',
+            'assemblies__manufacturing_printing_costs',
+            'packagings',
+            'transports__packaging',
+        )
+        if options['project']:
+            quotes = quotes.filter(project_id=options['project'])
+        if options['quote']:
+            quotes = quotes.filter(pk__in=options['quote'])
+
+        fields = sorted(STORED_TOTAL_FIELDS)
+        checked = 0
+        stale = []
+        pending = []
+
+        for quote in quotes.iterator(chunk_size=options['batch_size']):
+            checked += 1
+            expected = stored_totals(price_quote(quote))
+            mismatched = [
+                field for field in fields
+                if abs(Decimal(getattr(quote, field)) - expected[field]) > options['tolerance']
+            ]
+            if not mismatched:
+                continue
+            stale.append((quote, mismatched))
+            if not options['verify']:
+                for field in fields:
+                    setattr(quote, field, expected[field])
+                pending.append(quote)
+                if len(pending) >= options['batch_size']:
+                    Quote.objects.bulk_update(pending, fields)
+                    pending = []
+
+        if pending:
+            Quote.objects.bulk_update(pending, fields)
+
+        for quote, mismatched in stale:
+            self.stdout.write(self.style.WARNING(
+                f'Quote {quote.pk} "{quote.name}": stale {", ".join(mismatched)}'
+            ))
+
+        if options['verify']:
+            if stale:
+                raise CommandError(f'{len(stale)} of {checked} quotes have stale totals')
+            self.stdout.write(self.style.SUCCESS(f'All {checked} quotes have up-to-date totals'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Checked {checked} quotes, rebuilt {len(stale)}'))
@@ -0,0 +1,83 @@
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from core.imports import claim_next_job, requeue_stale_jobs, run_import_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued Excel imports (complete quotes, multiple quotes and configuration types)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Number of imports processed at the same time; SQLite supports only 1')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for new jobs')
+        parser.add_argument('--requeue-stale', type=int, metavar='MINUTES',
+                            help='On startup, requeue jobs left running longer than MINUTES. Only use when '
+                                 'no other worker is running, as a live worker\'s jobs would run twice')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if concurrency < 1:
+            raise CommandError('--concurrency must be at least 1')
+        if concurrency > 1 and connections['default'].vendor == 'sqlite':
+            # A second job's writes would wait on the first one's transaction
+            # and fail with "database is locked"
+            raise CommandError('SQLite allows one writer at a time; use --concurrency 1 or a server database')
+
+        if options['requeue_stale'] is not None:
+            if options['requeue_stale'] < 1:
+                raise CommandError('--requeue-stale must be at least 1 minute')
+            cutoff = timezone.now() - timedelta(minutes=options['requeue_stale'])
+            requeued = requeue_stale_jobs(cutoff)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale import job(s)'))
+
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+        self.stdout.write(f'Import worker {prefix} started with {concurrency} thread(s)')
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            loops = [
+                pool.submit(self.work, f'{prefix}:{n}', options['poll_interval'], options['once'])
+                for n in range(1, concurrency + 1)
+            ]
+            try:
+                for loop in loops:
+                    loop.result()
+            except KeyboardInterrupt:
+                self.stop.set()
+                self.stdout.write('Stopping after the running imports finish...')
+
+        self.stdout.write(self.style.SUCCESS(f'Import worker stopped after {self.processed} job(s)'))
+
+    def work(self, worker, poll_interval, once):
+        """Claim and run jobs until stopped, or until the queue is empty with --once"""
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_next_job(worker)
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+
+                run_import_job(job)
+                with self.lock:
+                    self.processed += 1
+                style = self.style.SUCCESS if job.status == 'succeeded' else self.style.ERROR
+                self.stdout.write(style(f'[{worker}] {job}: {job.message}'))
+        finally:
+            connections.close_all()
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.25 on 2026-10-18 00:14
+
+from django.db import migrations, models
+
+# The new columns start at zero. Pricing needs the model cost properties,
+# which historical models do not have, so existing quotes are filled in by
+# running `manage.py rebuild_quote_totals` once after migrating.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0040_assembly_profit_type_assembly_rejection_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quote',
+            name='base_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='grand_total',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='profit_amount',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='total_assembly_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='total_conversion_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='total_packaging_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='total_raw_material_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+        migrations.AddField(
+            model_name='quote',
+            name='total_transport_cost',
+            field=models.DecimalField(decimal_places=8, default=0, editable=False, max_digits=24),
+        ),
+    ]
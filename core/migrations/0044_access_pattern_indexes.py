@@ -0,0 +1,37 @@
+# Generated by Django 4.2.25 on 2026-10-18 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0043_import_job_preview'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assemblytype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['customer_group', 'name'], name='assemblytype_active_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materialtype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['customer_group', 'raw_material_name'], name='materialtype_active_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mouldingmachinetype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['customer_group', 'name'], name='machinetype_active_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='packagingtype',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['customer_group', 'name'], name='packagingtype_active_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['project', '-created_at'], name='quote_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotetimeline',
+            index=models.Index(fields=['quote', '-created_at'], name='timeline_quote_created_idx'),
+        ),
+    ]
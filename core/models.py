@@ -1,8 +1,20 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+from django.urls import reverse
 from decimal import Decimal
+import functools
 
+from . import costing
+from .money import (
+    HUNDRED, MILLION, THOUSAND, ZERO, calculation, divide, percent_of, quantize, to_decimal, typed_cost,
+)
+
+
+SHIFT_SECONDS = 28800
+SECONDS_PER_HOUR = 3600
+MM_PER_FOOT = Decimal('304.8')
 
 COST_TYPE_CHOICES = [
     ('percentage', 'Percentage'),
@@ -10,6 +22,45 @@ COST_TYPE_CHOICES = [
 ]
 
 
+def cost_property(func):
+    """
+    Read-only property computed under ``money.CONTEXT`` and memoized per
+    instance until a field changes or save() runs
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        cache = self.__dict__.setdefault('_cost_cache', {})
+        if name not in cache:
+            cache[name] = compute(self)
+        return cache[name]
+
+    compute = calculation(func)
+    return property(getter)
+
+
+class CostCacheMixin:
+    """
+    Holds the memoized results of ``cost_property`` methods.
+    Assigning any public attribute (model fields, related objects) or saving
+    the instance drops every cached cost so the next read recomputes it.
+    """
+
+    def __setattr__(self, name, value):
+        if not name.startswith('_'):
+            self.__dict__.pop('_cost_cache', None)
+        super().__setattr__(name, value)
+
+    def invalidate_cost_cache(self):
+        """Drop all memoized cost values for this instance"""
+        self.__dict__.pop('_cost_cache', None)
+
+    def save(self, *args, **kwargs):
+        self.invalidate_cost_cache()
+        super().save(*args, **kwargs)
+
+
 class CustomerGroup(models.Model):
     """Customer Group configuration"""
     name = models.CharField(max_length=100, unique=True, default="")
@@ -57,6 +108,11 @@ class MouldingMachineType(models.Model):
                 name='unique_moulding_machine_type_name_customer_group'
             )
         ]
+        indexes = [
+            # Active types of a customer group, in display order
+            models.Index(fields=['customer_group', 'name'], condition=models.Q(is_active=True),
+                         name='machinetype_active_group_idx'),
+        ]
 
     def __str__(self):
         if self.name:
@@ -66,8 +122,7 @@ class MouldingMachineType(models.Model):
     @property
     def mtc_cost(self):
         """Calculate MTC cost = mtc_count * shift_rate_for_mtc"""
-        from decimal import Decimal
-        return float(Decimal(str(self.mtc_count)) * Decimal(str(self.shift_rate_for_mtc)))
+        return to_decimal(self.mtc_count) * to_decimal(self.shift_rate_for_mtc)
 
 
 class MaterialType(models.Model):
@@ -97,11 +152,35 @@ class MaterialType(models.Model):
                 name='unique_material_type_raw_material_name_customer_group'
             )
         ]
+        indexes = [
+            # Active types of a customer group, in display order
+            models.Index(fields=['customer_group', 'raw_material_name'], condition=models.Q(is_active=True),
+                         name='materialtype_active_group_idx'),
+        ]
 
     def __str__(self):
         return f"{self.raw_material_name} - {self.raw_material_grade} ({self.customer_group.name if self.customer_group else 'No Group'})"
 
 
+class ProjectQuerySet(models.QuerySet):
+    """Query helpers for projects"""
+
+    def with_totals(self):
+        """
+        Annotate quote counts and live cost totals across each project's
+        quotes, priced in floating point by the database; for checking the
+        stored totals, not for display
+        """
+        return self.annotate(**costing.project_total_annotations())
+
+    def with_stored_totals(self):
+        """Annotate quote counts and the sum of the quotes' stored grand totals"""
+        return self.annotate(
+            quotes_count=models.Count('quotes'),
+            grand_total=models.Sum('quotes__grand_total', default=Decimal(0)),
+        )
+
+
 class Project(models.Model):
     """
     Project model - each project belongs to a user and contains multiple quotes
@@ -113,6 +192,8 @@ class Project(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Project'
@@ -123,6 +204,8 @@ class Project(models.Model):
 
     def get_quotes_count(self):
         """Return the number of quotes in this project"""
+        if hasattr(self, 'quotes_count'):
+            return self.quotes_count
         return self.quotes.count()
 
 
@@ -147,6 +230,41 @@ class MaterialGroup(models.Model):
         return f"{self.name} ({self.value}) - {self.customer_group.name if self.customer_group else 'No Group'}"
 
 
+class QuoteQuerySet(models.QuerySet):
+    """Query helpers for quotes"""
+
+    def with_cost_graph(self):
+        """
+        Load the full component graph needed to price and display a quote in a
+        fixed number of queries, independent of how many rows each section has.
+        """
+        return self.select_related('project', 'client_group', 'created_by').prefetch_related(
+            'raw_materials',
+            models.Prefetch('moulding_machines',
+                            queryset=MouldingMachineDetail.objects.select_related('moulding_machine_type')),
+            models.Prefetch('assemblies',
+                            queryset=Assembly.objects.select_related('assembly_type_config').prefetch_related(
+                                'assembly_raw_materials', 'manufacturing_printing_costs')),
+            models.Prefetch('packagings', queryset=Packaging.objects.select_related('packaging_type')),
+            models.Prefetch('transports', queryset=Transport.objects.select_related('packaging')),
+        )
+
+    def with_timeline(self):
+        """Prefetch timeline entries together with their users"""
+        return self.prefetch_related(
+            models.Prefetch('timeline_entries', queryset=QuoteTimeline.objects.select_related('user')),
+        )
+
+    def with_totals(self):
+        """
+        Annotate live section totals, base cost, profit, grand total and
+        per-section row counts, computed by the database from the child tables
+        in floating point. Pages show the stored Decimal totals; these are for
+        checking them.
+        """
+        return self.annotate(**costing.quote_total_annotations())
+
+
 class Quote(models.Model):
     """
     Quote model - each quote belongs to a project
@@ -179,6 +297,16 @@ class Quote(models.Model):
     major_version = models.IntegerField(default=1, help_text="Major version (e.g., 1 in 1.5)")
     minor_version = models.IntegerField(default=0, help_text="Minor version (e.g., 5 in 1.5)")
 
+    # Materialized cost totals (maintained by costing.refresh_quote_totals)
+    total_raw_material_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    total_conversion_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    total_assembly_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    total_packaging_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    total_transport_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    base_cost = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    profit_amount = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+    grand_total = models.DecimalField(max_digits=24, decimal_places=8, default=0, editable=False)
+
     sap_number = models.CharField(max_length=100, blank=True, null=True, default="", verbose_name="SAP Number")
     part_number = models.CharField(max_length=100, default="")
     part_name = models.CharField(max_length=200, default="")
@@ -199,14 +327,64 @@ class Quote(models.Model):
     packaging_complete = models.BooleanField(default=False)
     transport_complete = models.BooleanField(default=False)
 
+    objects = QuoteQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Quote'
         verbose_name_plural = 'Quotes'
+        indexes = [
+            # A project's quotes, newest first
+            models.Index(fields=['project', '-created_at'], name='quote_project_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.project.name} (v{self.get_version()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_profit_inputs = {
+            name: getattr(instance, name) for name in costing.PROFIT_INPUT_FIELDS if name in field_names
+        }
+        return instance
+
+    def _changed_profit_inputs(self, update_fields):
+        """Profit inputs about to be saved whose value differs from the one loaded"""
+        names = costing.PROFIT_INPUT_FIELDS
+        if update_fields is not None:
+            names = names.intersection(update_fields)
+        loaded = getattr(self, '_loaded_profit_inputs', {})
+        deferred = self.get_deferred_fields()
+        return {
+            name for name in names
+            if name not in deferred and (name not in loaded or getattr(self, name) != loaded[name])
+        }
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            costing.apply_quote_totals(self)
+        elif kwargs.get('update_fields') is None and not kwargs.get('force_insert') and self.pk:
+            # Never write the materialized totals from memory: child rows keep
+            # them current in the database and this instance may hold stale copies
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+                and field.name not in costing.STORED_TOTAL_FIELDS
+            ]
+        changed = self._changed_profit_inputs(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+        self._loaded_profit_inputs = {
+            **getattr(self, '_loaded_profit_inputs', {}),
+            **{name: getattr(self, name) for name in changed},
+        }
+
+        # Profit and grand total depend on the quote's own financial fields
+        if changed and not adding:
+            costing.refresh_quote_totals(self, sections=())
+
     def get_version(self):
         """Return version as string (e.g., '1.5')"""
         return f"{self.major_version}.{self.minor_version}"
@@ -325,36 +503,24 @@ class Quote(models.Model):
         """Calculate total transport cost per part from all transports"""
         return sum(transport.trip_cost_per_part for transport in self.transports.all())
 
+    def get_cost_breakdown(self):
+        """Price the whole quote once and return the immutable cost breakdown"""
+        return costing.price_quote(self)
+
     def get_base_cost(self):
         """Calculate base cost before profit and handling charge"""
-        return (
-            Decimal(self.get_total_raw_material_cost()) +
-            Decimal(self.get_total_conversion_cost()) +
-            Decimal(self.get_total_assembly_cost()) +
-            Decimal(self.get_total_packaging_cost()) +
-            Decimal(self.get_total_transport_cost())
-        )
+        return self.get_cost_breakdown().base_cost
 
     def get_profit_amount(self):
         """Calculate profit amount"""
-        from decimal import Decimal
-        base_cost = Decimal(str(self.get_base_cost()))
-        profit_percentage = Decimal(str(self.profit_percentage))
-        if self.profit_type == 'fixed':
-            return profit_percentage
-        else:
-            return base_cost * (profit_percentage / Decimal('100'))
+        return self.get_cost_breakdown().profit_amount
 
     def get_grand_total(self):
         """Calculate grand total including profit and handling charge"""
-        from decimal import Decimal
-        base_cost = Decimal(str(self.get_base_cost()))
-        profit = Decimal(str(self.get_profit_amount()))
-        handling = Decimal(str(self.handling_charge))
-        return base_cost + profit + handling
+        return self.get_cost_breakdown().grand_total
 
 
-class RawMaterial(models.Model):
+class RawMaterial(CostCacheMixin, models.Model):
     """Raw Material for a quote"""
     UNIT_CHOICES = [
         ('kg', 'Kilogram (kg)'),
@@ -430,221 +596,117 @@ class RawMaterial(models.Model):
     def __str__(self):
         return f"{self.material_name} - {self.quote.name}"
 
-    @property
+    @cost_property
     def gross_weight(self):
         """Calculate gross weight (part + runner) in the selected unit"""
-        from decimal import Decimal
-        net_wt = Decimal(str(self.part_weight)) + Decimal(str(self.runner_weight))
-        return float(net_wt
-            + Decimal(str(self.process_losses)) * net_wt / Decimal('100')
-            + Decimal(str(self.purging_loss_cost)) * net_wt / Decimal('100'))
+        net_wt = to_decimal(self.part_weight) + to_decimal(self.runner_weight)
+        return (net_wt
+                + to_decimal(self.process_losses) * net_wt / HUNDRED
+                + to_decimal(self.purging_loss_cost) * net_wt / HUNDRED)
 
-    @property
+    @cost_property
     def gross_weight_in_grams(self):
         """Convert gross weight to grams based on unit of measurement"""
-        from decimal import Decimal
-
-        gross = Decimal(str(self.gross_weight))
-
-        # Convert to grams based on unit
         if self.unit_of_measurement == 'kg':
             # 1 kg = 1000 grams
-            return float(gross * Decimal('1000'))
+            return self.gross_weight * THOUSAND
         elif self.unit_of_measurement == 'ton':
             # 1 ton = 1,000,000 grams
-            return float(gross * Decimal('1000000'))
+            return self.gross_weight * MILLION
         elif self.unit_of_measurement == 'pcs':
-            return 0
+            return ZERO
         else:  # 'gm'
             # Already in grams
-            return float(gross)
+            return self.gross_weight
 
-    @property
+    @cost_property
     def effective_rate_per_kg(self):
         """Get effective rate per kg (frozen rate if available, otherwise rm_rate)"""
-        return float(self.rm_rate)
+        return to_decimal(self.rm_rate)
 
-    @property
+    @cost_property
     def effective_rate_per_gram(self):
         """Convert effective rate from per kg to per gram (divide by 1000)"""
-        from decimal import Decimal
-        rate_per_kg = Decimal(str(self.effective_rate_per_kg))
-        # 1 kg = 1000 grams, so rate per gram = rate per kg / 1000
-        return float(rate_per_kg / Decimal('1000'))
+        return self.effective_rate_per_kg / THOUSAND
 
-    @property
+    @cost_property
     def base_rm_cost(self):
         """Calculate base RM cost using gross weight in grams and rate per gram"""
-        from decimal import Decimal
-
         if self.unit_of_measurement != 'pcs':
-            # Use gross weight in grams
-            weight_in_grams = Decimal(str(self.gross_weight_in_grams))
-
-            # Rate per gram (converted from per kg)
-            rate_per_gram = Decimal(str(self.effective_rate_per_gram))
-
-            # Base cost = weight in grams × rate per gram + additional costs
-            base = float(weight_in_grams * rate_per_gram)
-
-            icc_value = float(Decimal(str(self.icc_percentage)))
-            if self.icc_type == 'fixed':
-                icc_cost = icc_value
-            else:  # percentage
-                icc_cost = float(base * (icc_value / 100))
-            # # Add ICC percentage
-            # icc_cost = base * (Decimal(str(self.icc_percentage)) / Decimal('100'))
-
-            return float(base + icc_cost)
+            # Base cost = weight in grams × rate per gram
+            base = self.gross_weight_in_grams * self.effective_rate_per_gram
         else:
-            weight_in_pcs = Decimal(str(self.gross_weight))
-
-            rate_per_pcs = Decimal(str(self.rm_rate))
-
-            base = (weight_in_pcs * rate_per_pcs)
+            base = self.gross_weight * to_decimal(self.rm_rate)
 
-            icc_value = Decimal(str(self.icc_percentage))
-            if self.icc_type == 'fixed':
-                icc_cost = float(icc_value)
-            else:  # percentage
-                icc_cost = float(base * (icc_value / Decimal('100')))
+        # ICC is a fixed amount or a percentage of the base
+        return base + typed_cost(self.icc_type, self.icc_percentage, base)
 
-            return float(base + icc_cost)
-
-    @property
+    @cost_property
     def rejection_cost(self):
         """Calculate rejection cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_rm_cost))
-        rejection_value = Decimal(str(self.rejection_percentage))
+        return typed_cost(self.rejection_type, self.rejection_percentage, self.base_rm_cost)
 
-        if self.rejection_type == 'fixed':
-            return float(rejection_value)
-        else:  # percentage
-            return float(base * (rejection_value / Decimal('100')))
-
-    @property
+    @cost_property
     def overhead_cost(self):
         """Calculate overhead cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_rm_cost))
-        overhead_value = Decimal(str(self.overhead_percentage))
-
-        if self.overhead_type == 'fixed':
-            return float(overhead_value)
-        else:  # percentage
-            return float(base * (overhead_value / Decimal('100')))
+        return typed_cost(self.overhead_type, self.overhead_percentage, self.base_rm_cost)
 
-    @property
+    @cost_property
     def maintenance_cost(self):
         """Calculate maintenance cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_rm_cost))
-        maintenance_value = Decimal(str(self.maintenance_percentage))
-
-        if self.maintenance_type == 'fixed':
-            return float(maintenance_value)
-        else:  # percentage
-            return float(base * (maintenance_value / Decimal('100')))
+        return typed_cost(self.maintenance_type, self.maintenance_percentage, self.base_rm_cost)
 
-    @property
+    @cost_property
     def frozen_rm_cost(self):
         """Calculate frozen RM cost if frozen rate is available"""
-        from decimal import Decimal
-
-        if self.frozen_rate and Decimal(str(self.frozen_rate)) > 0 and self.unit_of_measurement != 'pcs':
-            # Frozen rate is per kg, gross weight is in grams
-            frozen_rate_per_kg = Decimal(str(self.frozen_rate))
-            gross_weight_grams = Decimal(str(self.gross_weight_in_grams))
-
-            # Convert: frozen_rate (per kg) × gross_weight (grams) / 1000
-            frozen_cost = (frozen_rate_per_kg * gross_weight_grams) / Decimal('1000')
-
-            return float(frozen_cost)
-        elif self.frozen_rate and Decimal(str(self.frozen_rate)) > 0 and self.unit_of_measurement == 'pcs':
-            frozen_rate_per_pc = Decimal(str(self.frozen_rate))
-            weight_in_pcs = Decimal(str(self.gross_weight))
-
-            frozen_cost = (frozen_rate_per_pc * weight_in_pcs)
-
-            return float(frozen_cost)
+        frozen_rate = to_decimal(self.frozen_rate)
+        if frozen_rate > 0:
+            if self.unit_of_measurement != 'pcs':
+                # Frozen rate is per kg, gross weight is in grams
+                return frozen_rate * self.gross_weight_in_grams / THOUSAND
+            return frozen_rate * self.gross_weight
 
         return None  # Return None if no frozen rate is set
 
-    @property
+    @cost_property
     def profit_cost(self):
         """Calculate profit cost"""
-        from decimal import Decimal
-
-        # If frozen rate is not there, it is equal to rm_rate
         # If profit type is fixed, it is fixed value
         if self.profit_type == 'fixed':
-            return Decimal(str(self.profit_percentage))
-        elif self.unit_of_measurement != 'pcs':
-            if self.frozen_rate:
-                if self.icc_type == 'fixed':
-                    return float(
-                        (Decimal(str(self.gross_weight_in_grams)) * Decimal(str(self.frozen_rate)) + self.icc_percentage) * (Decimal(str(self.profit_percentage)) / Decimal('100') / Decimal('1000'))
-                        )
-                else:
-                    return float(
-                        Decimal(str(self.gross_weight_in_grams)) * Decimal(str(self.frozen_rate)) * (1 + (Decimal(str(self.icc_percentage)) / Decimal('100'))) * (Decimal(str(self.profit_percentage)) / Decimal('100') / Decimal('1000'))
-                        )
-            else:
-                if self.icc_type == 'fixed':
-                    return float(
-                        (Decimal(str(self.gross_weight_in_grams)) * Decimal(str(self.rm_rate)) + self.icc_percentage) * (Decimal(str(self.profit_percentage)) / Decimal('100') / Decimal('1000'))
-                        )
-                else:
-                    return float(
-                        Decimal(str(self.gross_weight_in_grams)) * Decimal(str(self.rm_rate)) * (1 + (Decimal(str(self.icc_percentage)) / Decimal('100'))) * (Decimal(str(self.profit_percentage)) / Decimal('100') / Decimal('1000'))
-                        )
+            return to_decimal(self.profit_percentage)
+
+        # If frozen rate is not there, it is equal to rm_rate
+        rate = to_decimal(self.frozen_rate or self.rm_rate)
+        icc = to_decimal(self.icc_percentage)
+        if self.unit_of_measurement != 'pcs':
+            material = self.gross_weight_in_grams * rate
         else:
-            if self.frozen_rate:
-                if self.icc_type == 'fixed':
-                    return float(
-                        (Decimal(str(self.gross_weight)) * Decimal(str(self.frozen_rate)) + self.icc_percentage) * (Decimal(str(self.profit_percentage)) / Decimal('100'))
-                        )
-                else:
-                    return float(
-                        Decimal(str(self.gross_weight)) * Decimal(str(self.frozen_rate)) * (1 + (Decimal(str(self.icc_percentage)) / Decimal('100'))) * (Decimal(str(self.profit_percentage)) / Decimal('100'))
-                        )
-            else:
-                if self.icc_type == 'fixed':
-                    return float(
-                        (Decimal(str(self.gross_weight)) * Decimal(str(self.rm_rate)) + self.icc_percentage) * (Decimal(str(self.profit_percentage)) / Decimal('100'))
-                        )
-                else:
-                    return float(
-                        Decimal(str(self.gross_weight)) * Decimal(str(self.rm_rate)) * (1 + (Decimal(str(self.icc_percentage)) / Decimal('100'))) * (Decimal(str(self.profit_percentage)) / Decimal('100'))
-                        )
+            material = self.gross_weight * rate
 
-    @property
+        if self.icc_type == 'fixed':
+            material = material + icc
+        else:
+            material = material * (1 + icc / HUNDRED)
+
+        profit = material * to_decimal(self.profit_percentage) / HUNDRED
+        if self.unit_of_measurement != 'pcs':
+            # Rates are per kg and the weight is in grams
+            return profit / THOUSAND
+        return profit
+
+    @cost_property
     def total_rm_cost_without_profit(self):
         """Calculate total RM cost without profit percentage"""
-        from decimal import Decimal
-
-        return float(
-            Decimal(str(self.base_rm_cost)) +
-            Decimal(str(self.rejection_cost)) +
-            Decimal(str(self.overhead_cost)) +
-            Decimal(str(self.maintenance_cost)) +
-            Decimal(str(self.other_rm_cost))
-        )
+        return (self.base_rm_cost
+                + self.rejection_cost
+                + self.overhead_cost
+                + self.maintenance_cost
+                + to_decimal(self.other_rm_cost))
 
-    @property
+    @cost_property
     def rm_cost(self):
         """Calculate total RM cost"""
-        from decimal import Decimal
-
-        return float(
-            Decimal(str(self.base_rm_cost)) +
-            Decimal(str(self.rejection_cost)) +
-            Decimal(str(self.overhead_cost)) +
-            Decimal(str(self.maintenance_cost)) +
-            Decimal(str(self.profit_cost)) +
-            Decimal(str(self.other_rm_cost))
-        )
+        return self.total_rm_cost_without_profit + self.profit_cost
 
 
 class AssemblyType(models.Model):
@@ -670,6 +732,11 @@ class AssemblyType(models.Model):
                 name='unique_assembly_type_name_customer_group'
             )
         ]
+        indexes = [
+            # Active types of a customer group, in display order
+            models.Index(fields=['customer_group', 'name'], condition=models.Q(is_active=True),
+                         name='assemblytype_active_group_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.value}) - {self.customer_group.name if self.customer_group else 'No Group'}"
@@ -719,12 +786,17 @@ class PackagingType(models.Model):
                 name='unique_packaging_type_name_customer_group'
             )
         ]
+        indexes = [
+            # Active types of a customer group, in display order
+            models.Index(fields=['customer_group', 'name'], condition=models.Q(is_active=True),
+                         name='packagingtype_active_group_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.customer_group.name})"
 
 
-class MouldingMachineDetail(models.Model):
+class MouldingMachineDetail(CostCacheMixin, models.Model):
     """Moulding Machine details for a quote"""
     quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='moulding_machines')
     moulding_machine_type = models.ForeignKey(MouldingMachineType, on_delete=models.SET_NULL, null=True, blank=True,
@@ -774,101 +846,66 @@ class MouldingMachineDetail(models.Model):
     def __str__(self):
         return f"Machine {self.cavity} cavity - {self.quote.name}"
 
-    @property
+    @cost_property
     def number_of_parts_per_shift(self):
         """Calculate number of parts per shift"""
-        if self.cycle_time > 0 and self.efficiency > 0:
+        cycle_time = to_decimal(self.cycle_time)
+        efficiency = to_decimal(self.efficiency)
+        if cycle_time > 0 and efficiency > 0:
             # Assuming 8-hour shift = 28800 seconds
-            shift_seconds = 28800
-            effective_time = shift_seconds * (self.efficiency / 100)
-            parts = (effective_time / self.cycle_time) * self.cavity
+            effective_time = SHIFT_SECONDS * (efficiency / HUNDRED)
+            parts = (effective_time / cycle_time) * to_decimal(self.cavity)
             return round(parts, 4)
-        return 0
+        return ZERO
 
     @property
     def number_of_mtc(self):
         """Calculate number of MTC (tool changes)"""
         return self.mtc_count
 
-    @property
+    @cost_property
     def mtc_cost(self):
         """Calculate MTC cost = mtc_count * shift_rate_for_mtc"""
-        from decimal import Decimal
-        return float(Decimal(str(self.mtc_count)) * Decimal(str(self.shift_rate_for_mtc)))
+        return to_decimal(self.mtc_count) * to_decimal(self.shift_rate_for_mtc)
 
-    @property
+    @cost_property
     def base_conversion_cost(self):
         """Calculate base conversion cost per part before percentages"""
-        parts_per_shift = self.number_of_parts_per_shift
-        if parts_per_shift > 0:
-            from decimal import Decimal
-            # Base cost includes shift rate + MTC cost
-            total_shift_cost = Decimal(str(self.shift_rate)) + Decimal(str(self.mtc_cost))
-            return float(total_shift_cost / parts_per_shift)
-        return 0
+        # Base cost includes shift rate + MTC cost
+        total_shift_cost = to_decimal(self.shift_rate) + self.mtc_cost
+        return divide(total_shift_cost, self.number_of_parts_per_shift)
 
-    @property
+    @cost_property
     def rejection_cost(self):
         """Calculate rejection cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_conversion_cost))
-        rejection_value = Decimal(str(self.rejection_percentage))
-
-        if self.rejection_type == 'fixed':
-            return float(rejection_value)
-        else:  # percentage
-            return float(base * (rejection_value / Decimal('100')))
+        return typed_cost(self.rejection_type, self.rejection_percentage, self.base_conversion_cost)
 
-    @property
+    @cost_property
     def overhead_cost(self):
         """Calculate overhead cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_conversion_cost))
-        overhead_value = Decimal(str(self.overhead_percentage))
-
-        if self.overhead_type == 'fixed':
-            return float(overhead_value)
-        else:  # percentage
-            return float(base * (overhead_value / Decimal('100')))
+        return typed_cost(self.overhead_type, self.overhead_percentage, self.base_conversion_cost)
 
-    @property
+    @cost_property
     def machine_maintenance_cost(self):
         """Calculate maintenance cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_conversion_cost))
-        maintenance_value = Decimal(str(self.maintenance_percentage))
+        return typed_cost(self.maintenance_type, self.maintenance_percentage, self.base_conversion_cost)
 
-        if self.maintenance_type == 'fixed':
-            return float(maintenance_value)
-        else:  # percentage
-            return float(base * (maintenance_value / Decimal('100')))
-
-    @property
+    @cost_property
     def machine_profit_cost(self):
         """Calculate profit cost based on type"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_conversion_cost))
-        profit_value = Decimal(str(self.profit_percentage))
+        return typed_cost(self.profit_type, self.profit_percentage, self.base_conversion_cost)
 
-        if self.profit_type == 'fixed':
-            return float(profit_value)
-        else:  # percentage
-            return float(base * (profit_value / Decimal('100')))
-
-    @property
+    @cost_property
     def conversion_cost(self):
         """Calculate total conversion cost per part including all percentages"""
-        from decimal import Decimal
-        base = Decimal(str(self.base_conversion_cost))
-        rejection = Decimal(str(self.rejection_cost))
-        overhead = Decimal(str(self.overhead_cost))
-        maintenance = Decimal(str(self.machine_maintenance_cost))
-        profit = Decimal(str(self.machine_profit_cost))
-        total = base + rejection + overhead + maintenance + profit
-        return float(total)
+        return (self.base_conversion_cost
+                + self.rejection_cost
+                + self.overhead_cost
+                + self.machine_maintenance_cost
+                + self.machine_profit_cost)
 
 
-class Assembly(models.Model):
+class Assembly(CostCacheMixin, models.Model):
     """Assembly for a quote"""
     quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='assemblies')
     assembly_type_config = models.ForeignKey(AssemblyType, on_delete=models.SET_NULL, null=True, blank=True,
@@ -910,92 +947,123 @@ class Assembly(models.Model):
             return f"{self.name} - {self.quote.name}"
         return f"Assembly - {self.quote.name}"
 
-    @property
+    @cost_property
     def total_assembly_rm_cost(self):
-        return sum(
-            Decimal(str(rm.total_cost)) for rm in self.assembly_raw_materials.all()
-        )
+        # An unsaved assembly (e.g. an import preview) has no child rows yet
+        if self.pk is None:
+            return ZERO
+        return sum((rm.total_cost for rm in self.assembly_raw_materials.all()), ZERO)
 
-    @property
+    @cost_property
     def total_manufacturing_printing_cost(self):
-        return sum(
-            Decimal(str(cost.per_cost)) for cost in self.manufacturing_printing_costs.all()
-        )
-
-
-    def calculate_costs(self):
-        """Calculate all assembly costs"""
-        from decimal import Decimal
-
-        # Get total assembly RM cost
-        total_assembly_rm_cost = sum(
-            Decimal(str(rm.total_cost)) for rm in self.assembly_raw_materials.all()
-        )
-
-        # Get total manufacturing/printing cost
-        total_manufacturing_printing_cost = sum(
-            Decimal(str(cost.per_cost)) for cost in self.manufacturing_printing_costs.all()
-        )
+        if self.pk is None:
+            return ZERO
+        return sum((to_decimal(cost.per_cost) for cost in self.manufacturing_printing_costs.all()), ZERO)
 
+    @cost_property
+    def _cost_breakdown(self):
+        """Compute all assembly costs once; calculate_costs() hands out copies"""
         # Base cost is sum of manual cost, assembly RM, and manufacturing/printing
-        base_cost = (Decimal(str(self.manual_cost)) +
-                    total_assembly_rm_cost +
-                    total_manufacturing_printing_cost)
+        base_cost = (to_decimal(self.manual_cost) +
+                     self.total_assembly_rm_cost +
+                     self.total_manufacturing_printing_cost)
 
         # Calculate percentage-based costs
-        profit_cost = base_cost * (Decimal(str(self.profit_percentage)) / Decimal('100'))
-        rejection_cost = base_cost * (Decimal(str(self.rejection_percentage)) / Decimal('100'))
+        profit_cost = percent_of(base_cost, self.profit_percentage)
+        rejection_cost = percent_of(base_cost, self.rejection_percentage)
 
         # Inspection & handling is now a fixed cost (not percentage-based)
-        inspection_handling_cost = Decimal(str(self.inspection_handling_cost))
+        inspection_handling_cost = to_decimal(self.inspection_handling_cost)
 
         # Total assembly cost
         total = (base_cost +
-                Decimal(str(self.other_cost)) +
-                profit_cost +
-                rejection_cost +
-                inspection_handling_cost)
+                 to_decimal(self.other_cost) +
+                 profit_cost +
+                 rejection_cost +
+                 inspection_handling_cost)
 
         return {
-            'base_cost': float(base_cost),
-            'profit_cost': float(profit_cost),
-            'rejection_cost': float(rejection_cost),
-            'inspection_handling_cost': float(inspection_handling_cost),
-            'total_assembly_cost': float(total),
+            'base_cost': base_cost,
+            'profit_cost': profit_cost,
+            'rejection_cost': rejection_cost,
+            'inspection_handling_cost': inspection_handling_cost,
+            'total_assembly_cost': total,
         }
 
+    def calculate_costs(self):
+        """Calculate all assembly costs"""
+        return dict(self._cost_breakdown)
+
     @property
     def base_cost(self):
         """Get base cost"""
-        return self.calculate_costs()['base_cost']
+        return self._cost_breakdown['base_cost']
 
     @property
     def profit_cost(self):
         """Get profit cost"""
-        return self.calculate_costs()['profit_cost']
+        return self._cost_breakdown['profit_cost']
 
     @property
     def rejection_cost(self):
         """Get rejection cost"""
-        return self.calculate_costs()['rejection_cost']
+        return self._cost_breakdown['rejection_cost']
 
     @property
     def inspection_handling_cost_calculated(self):
         """Get inspection & handling cost (already a fixed value)"""
-        return self.calculate_costs()['inspection_handling_cost']
+        return self._cost_breakdown['inspection_handling_cost']
 
     @property
     def total_assembly_cost(self):
         """Get total assembly cost"""
-        return self.calculate_costs()['total_assembly_cost']
+        return self._cost_breakdown['total_assembly_cost']
+
+    def child_row_changed(self, related_name, row, pk, deleted=False):
+        """
+        Apply a saved or deleted child row to this in-memory assembly: patch
+        the prefetched children if present and drop the memoized costs,
+        without reloading anything.
+        """
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get(related_name)
+        if prefetched is not None:
+            rows = list(prefetched)
+            index = next((i for i, child in enumerate(rows) if child is row or child.pk == pk), None)
+            if deleted:
+                if index is not None:
+                    del rows[index]
+            elif index is None:
+                rows.append(row)
+            else:
+                rows[index] = row
+            prefetched._result_cache = rows
+        self.invalidate_cost_cache()
+
+
+class AssemblyChildMixin:
+    """Keeps the parent assembly's cached costs in step with child row saves and deletes"""
+    assembly_related_name = None
+
+    def _notify_assembly(self, pk, deleted=False):
+        # Only an assembly already loaded on this row can hold stale costs
+        if self.assembly_id and self._meta.get_field('assembly').is_cached(self):
+            self.assembly.child_row_changed(self.assembly_related_name, self, pk, deleted)
 
     def save(self, *args, **kwargs):
-        """Override save to trigger cost recalculation"""
         super().save(*args, **kwargs)
+        self._notify_assembly(self.pk)
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        self._notify_assembly(pk, deleted=True)
+        return result
 
 
-class AssemblyRawMaterial(models.Model):
+class AssemblyRawMaterial(AssemblyChildMixin, models.Model):
     """Raw Material for an assembly"""
+    assembly_related_name = 'assembly_raw_materials'
+
     UNIT_CHOICES = [
         ('kg', 'Kilogram (kg)'),
         ('gm', 'Gram (gm)'),
@@ -1032,20 +1100,16 @@ class AssemblyRawMaterial(models.Model):
     @property
     def total_cost(self):
         """Calculate total cost"""
-        from decimal import Decimal
-        if Decimal(str(self.production_quantity)) > 0:
-            total = Decimal(str(self.cost_per_unit)) * Decimal(str(self.production_quantity))
-            return float(total)
-        return 0
+        quantity = to_decimal(self.production_quantity)
+        if quantity > 0:
+            return to_decimal(self.cost_per_unit) * quantity
+        return ZERO
 
-    def save(self, *args, **kwargs):
-        """Override save to trigger assembly recalculation"""
-        super().save(*args, **kwargs)
-        self.assembly.save()
 
-
-class ManufacturingPrintingCost(models.Model):
+class ManufacturingPrintingCost(AssemblyChildMixin, models.Model):
     """Manufacturing/Printing costs for assembly"""
+    assembly_related_name = 'manufacturing_printing_costs'
+
     assembly = models.ForeignKey(Assembly, on_delete=models.CASCADE, related_name='manufacturing_printing_costs')
 
     process = models.CharField(max_length=200, default="", help_text="Process name/description")
@@ -1073,20 +1137,12 @@ class ManufacturingPrintingCost(models.Model):
 
     def save(self, *args, **kwargs):
         """Calculate per cost before saving"""
-        from decimal import Decimal
-
-        mc_rate_per_hour = Decimal(str(self.mc_rate_per_hour or 0))
-        cycle_time = Decimal(str(self.cycle_time or 0))
-
-        # Formula: (Rate/Hr × Cycle Time) / 3600
-        self.per_cost = (mc_rate_per_hour * cycle_time) / Decimal('3600')
+        # Formula: (Rate/Hr × Cycle Time) / 3600, rounded as the column stores it
+        self.per_cost = quantize(to_decimal(self.mc_rate_per_hour) * to_decimal(self.cycle_time) / SECONDS_PER_HOUR)
 
+        # Parent assembly costs are refreshed by AssemblyChildMixin
         super().save(*args, **kwargs)
 
-        # Update parent assembly costs (avoid recursion issues)
-        if self.assembly_id:
-            self.assembly.calculate_costs()
-
 
 class Packaging(models.Model):
     """Packaging for a quote"""
@@ -1148,53 +1204,40 @@ class Packaging(models.Model):
         return f"{type_display} - {self.quote.name}"
 
     @property
+    @calculation
     def maintenance_cost(self):
         """Calculate maintenance cost"""
-        from decimal import Decimal
-        return float(Decimal(str(self.cost)) * (Decimal(str(self.maintenance_percentage)) / Decimal('100')))
+        return percent_of(to_decimal(self.cost), self.maintenance_percentage)
 
     @property
+    @calculation
     def total_cost(self):
         """Calculate total packaging cost for the quote"""
-        from decimal import Decimal
-
         if self.quote.quantity > 0:
-            cost_per_part = Decimal(str(self.cost_per_part))
-            quantity = Decimal(str(self.quote.quantity))
-            return float(cost_per_part * quantity)
-
-        return 0
+            return self.cost_per_part * to_decimal(self.quote.quantity)
+        return ZERO
 
     def get_packaging_type_display(self):
         """Return packaging type name"""
         return self.packaging_type.name if self.packaging_type else ""
 
     @property
+    @calculation
     def cost_per_part(self):
         """Calculate cost per part based on packaging category"""
-        from decimal import Decimal
-
+        parts_per_pkg = to_decimal(self.parts_per_packaging)
         if self.packaging_category == 'polybag':
             # Cost per part for polybag: rate / (polybags_per_kg × parts_per_packaging)
-            if self.polybags_per_kg > 0 and self.parts_per_packaging > 0:
-                rate = Decimal(str(self.rate_per_kg))
-                polybags_per_kg = Decimal(str(self.polybags_per_kg))
-                parts_per_pkg = Decimal(str(self.parts_per_packaging))
-
-                cost = rate / (polybags_per_kg * parts_per_pkg)
-                return float(cost)
-            return 0
+            polybags_per_kg = to_decimal(self.polybags_per_kg)
+            if polybags_per_kg > 0 and parts_per_pkg > 0:
+                return to_decimal(self.rate_per_kg) / (polybags_per_kg * parts_per_pkg)
+            return ZERO
         else:  # box
             # Cost per part for box: ((cost + maintenance_cost) / lifecycle) / parts_per_packaging
-            if self.lifecycle > 0 and self.parts_per_packaging > 0:
-                base_cost = Decimal(str(self.cost))
-                maintenance = Decimal(str(self.maintenance_cost))
-                lifecycle = Decimal(str(self.lifecycle))
-                parts_per_pkg = Decimal(str(self.parts_per_packaging))
-
-                cost = ((base_cost + maintenance) / lifecycle) / parts_per_pkg
-                return float(cost)
-            return 0
+            lifecycle = to_decimal(self.lifecycle)
+            if lifecycle > 0 and parts_per_pkg > 0:
+                return ((to_decimal(self.cost) + self.maintenance_cost) / lifecycle) / parts_per_pkg
+            return ZERO
 
     def save(self, *args, **kwargs):
         """Override save to auto-populate dimensions from packaging type if available"""
@@ -1246,43 +1289,46 @@ class Transport(models.Model):
     @property
     def transport_length_mm(self):
         """Convert transport length from feet to mm (1 ft = 304.8 mm)"""
-        from decimal import Decimal
-        return float(Decimal(str(self.transport_length)) * Decimal('304.8'))
+        return to_decimal(self.transport_length) * MM_PER_FOOT
 
     @property
     def transport_breadth_mm(self):
         """Convert transport breadth from feet to mm (1 ft = 304.8 mm)"""
-        from decimal import Decimal
-        return float(Decimal(str(self.transport_breadth)) * Decimal('304.8'))
+        return to_decimal(self.transport_breadth) * MM_PER_FOOT
 
     @property
     def transport_height_mm(self):
         """Convert transport height from feet to mm (1 ft = 304.8 mm)"""
-        from decimal import Decimal
-        return float(Decimal(str(self.transport_height)) * Decimal('304.8'))
+        return to_decimal(self.transport_height) * MM_PER_FOOT
+
+    def _boxes_along(self, transport_mm, packaging_mm):
+        packaging_mm = to_decimal(packaging_mm)
+        if transport_mm > 0 and packaging_mm > 0:
+            return int(transport_mm / packaging_mm)
+        return 0
 
     @property
+    @calculation
     def boxes_on_length(self):
         """Calculate boxes on length"""
-        if self.packaging and self.transport_length_mm > 0 and self.packaging.packaging_length > 0:
-            from decimal import Decimal
-            return int(Decimal(str(self.transport_length_mm)) / Decimal(str(self.packaging.packaging_length)))
+        if self.packaging:
+            return self._boxes_along(self.transport_length_mm, self.packaging.packaging_length)
         return 0
 
     @property
+    @calculation
     def boxes_on_breadth(self):
         """Calculate boxes on breadth"""
-        if self.packaging and self.transport_breadth_mm > 0 and self.packaging.packaging_breadth > 0:
-            from decimal import Decimal
-            return int(Decimal(str(self.transport_breadth_mm)) / Decimal(str(self.packaging.packaging_breadth)))
+        if self.packaging:
+            return self._boxes_along(self.transport_breadth_mm, self.packaging.packaging_breadth)
         return 0
 
     @property
+    @calculation
     def boxes_on_height(self):
         """Calculate boxes on height"""
-        if self.packaging and self.transport_height_mm > 0 and self.packaging.packaging_height > 0:
-            from decimal import Decimal
-            return int(Decimal(str(self.transport_height_mm)) / Decimal(str(self.packaging.packaging_height)))
+        if self.packaging:
+            return self._boxes_along(self.transport_height_mm, self.packaging.packaging_height)
         return 0
 
     @property
@@ -1296,12 +1342,10 @@ class Transport(models.Model):
         return self.total_boxes * self.parts_per_box
 
     @property
+    @calculation
     def trip_cost_per_part(self):
         """Calculate trip cost per part"""
-        if self.total_parts_per_trip > 0:
-            from decimal import Decimal
-            return float(Decimal(str(self.trip_cost)) / Decimal(str(self.total_parts_per_trip)))
-        return 0
+        return divide(self.trip_cost, self.total_parts_per_trip)
 
 
 class QuoteTimeline(models.Model):
@@ -1342,6 +1386,10 @@ class QuoteTimeline(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Quote Timeline Entry'
         verbose_name_plural = 'Quote Timeline Entries'
+        indexes = [
+            # A quote's timeline, newest first
+            models.Index(fields=['quote', '-created_at'], name='timeline_quote_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_activity_type_display()} - {self.quote.name} - {self.created_at}"
@@ -1355,3 +1403,95 @@ class QuoteTimeline(models.Model):
             description=description,
             user=user
         )
+
+
+class ImportJob(models.Model):
+    """An uploaded Excel workbook waiting for, or processed by, the import worker"""
+
+    KIND_CHOICES = [
+        ('complete_quote', 'Complete Quote'),
+        ('multiple_quotes', 'Multiple Quotes'),
+        ('material_types', 'Material Types'),
+        ('machine_types', 'Machine Types'),
+        ('assembly_types', 'Assembly Types'),
+        ('packaging_types', 'Packaging Types'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='imports/%Y/%m/')
+    original_name = models.CharField(max_length=255, blank=True)
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='import_jobs')
+    quote = models.ForeignKey(Quote, on_delete=models.CASCADE, null=True, blank=True, related_name='import_jobs')
+    customer_group = models.ForeignKey(CustomerGroup, on_delete=models.CASCADE, null=True, blank=True,
+                                       related_name='import_jobs')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='import_jobs')
+
+    # Progress reported by the worker while the job runs
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete")
+    message = models.CharField(max_length=255, blank=True)
+    counts = models.JSONField(default=dict, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+
+    # Preview imports price the workbook without saving anything
+    dry_run = models.BooleanField(default=False)
+    preview = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder,
+                               help_text="Per-quote totals the import would produce")
+    worker = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        label = 'preview' if self.dry_run else 'import'
+        return f"{self.get_kind_display()} {label} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    @property
+    def count_rows(self):
+        """Final counts as (label, count) pairs for display"""
+        return [(name.replace('_', ' ').capitalize(), count) for name, count in self.counts.items()]
+
+    def get_return_url(self):
+        """Page the user goes back to once the import has finished"""
+        if self.kind == 'complete_quote' and self.quote_id:
+            return reverse('quote_detail', kwargs={'project_id': self.project_id, 'quote_id': self.quote_id})
+        if self.kind == 'multiple_quotes' and self.project_id:
+            return reverse('project_detail', kwargs={'project_id': self.project_id})
+        return reverse('config')
+
+    def as_status(self):
+        """JSON-serialisable state polled by the import status page"""
+        return {
+            'id': self.pk,
+            'kind': self.kind,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'progress': self.progress,
+            'message': self.message,
+            'counts': self.counts,
+            'errors': self.errors,
+            'dry_run': self.dry_run,
+            'preview': self.preview,
+            'finished': self.is_finished,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'return_url': self.get_return_url(),
+        }
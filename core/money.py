@@ -0,0 +1,114 @@
+"""
+Decimal arithmetic for cost calculations.
+
+Cost properties read their inputs through ``to_decimal`` and stay in
+Decimal until a value leaves the app (a template, an Excel cell). Field
+values loaded from the database are already Decimal and pass straight
+through; only genuine floats (form or spreadsheet values assigned before
+a save) are converted, once, through their shortest repr, so 0.1 is
+priced as 0.1 rather than as its binary approximation.
+
+Every calculation runs under ``CONTEXT``: 28 significant digits with
+banker's rounding, far more than the 8 decimal places the cost columns
+store. ``quantize`` applies that storage rule where a value is written.
+"""
+import decimal
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+CONTEXT = decimal.Context(prec=28, rounding=decimal.ROUND_HALF_EVEN)
+
+ZERO = Decimal('0')
+HUNDRED = Decimal('100')
+THOUSAND = Decimal('1000')
+MILLION = Decimal('1000000')
+
+# Cost columns are DecimalField(decimal_places=8)
+STORED_EXPONENT = Decimal('1E-8')
+
+_local = threading.local()
+
+
+def to_decimal(value):
+    """Decimal for a field value or intermediate result; None counts as zero"""
+    if value is None:
+        return ZERO
+    if type(value) is Decimal:
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value))
+
+
+def typed_cost(cost_type, value, base):
+    """A fixed amount, or ``value`` percent of ``base``, depending on a *_type field"""
+    value = to_decimal(value)
+    if cost_type == 'fixed':
+        return value
+    return base * value / HUNDRED
+
+
+def percent_of(base, percentage):
+    return base * to_decimal(percentage) / HUNDRED
+
+
+def divide(numerator, denominator):
+    """``numerator / denominator``, or zero when the denominator is not positive"""
+    denominator = to_decimal(denominator)
+    if denominator > 0:
+        return to_decimal(numerator) / denominator
+    return ZERO
+
+
+def quantize(value):
+    """Round to the precision the cost columns store"""
+    return to_decimal(value).quantize(STORED_EXPONENT, context=CONTEXT)
+
+
+class CalculationTimer:
+    """Time spent in outermost ``calculation`` calls while ``timed_calculations`` is active"""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+
+@contextmanager
+def timed_calculations():
+    """Collect calculation time on this thread into the yielded CalculationTimer"""
+    timer = CalculationTimer()
+    previous = getattr(_local, 'timer', None)
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+def calculation(func):
+    """
+    Run ``func`` under ``CONTEXT``. Only the outermost call in a thread
+    enters the context, so cost properties calling each other pay for it
+    once.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_local, 'active', False):
+            return func(*args, **kwargs)
+        _local.active = True
+        timer = getattr(_local, 'timer', None)
+        if timer is not None:
+            start = time.perf_counter()
+        try:
+            with decimal.localcontext(CONTEXT):
+                return func(*args, **kwargs)
+        finally:
+            _local.active = False
+            if timer is not None:
+                timer.calls += 1
+                timer.seconds += time.perf_counter() - start
+
+    return wrapper
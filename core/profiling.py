@@ -0,0 +1,181 @@
+"""
+Opt-in per-request profiling.
+
+With ``REQUEST_PROFILING`` on, ``RequestProfileMiddleware`` records for
+every request the view name, wall time, SQL query count and time, SQL
+statements repeated within the request (grouped by fingerprint, so an N+1
+loop shows up as one entry) and the time spent inside cost calculations.
+Requests over their ``REQUEST_PROFILE_BUDGETS`` are logged as warnings on
+the ``core.profiling`` logger; every profile is appended as one JSON line
+to ``REQUEST_PROFILE_LOG``, which ``manage.py profile_report`` summarises.
+
+Wall time ends when the view returns its response, so the body of a
+streamed or file response (cached exports) is not included.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+from .money import timed_calculations
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS = {
+    'wall_ms': 1000,
+    'queries': 50,
+    'sql_ms': 300,
+    'duplicate_queries': 10,
+}
+
+# Literals and IN lists vary between otherwise identical statements
+_FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+_log_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    """``sql`` with literals, placeholders lists and whitespace normalised"""
+    for pattern, replacement in _FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def budgets_for(view_name):
+    """The default budgets with any overrides configured for ``view_name``"""
+    configured = getattr(settings, 'REQUEST_PROFILE_BUDGETS', {})
+    budgets = {**DEFAULT_BUDGETS, **configured.get('default', {})}
+    budgets.update(configured.get(view_name, {}))
+    return budgets
+
+
+class QueryRecorder:
+    """Database execute wrapper collecting statement fingerprints and durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_seconds = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            self.count += 1
+            self.seconds += elapsed
+            self.fingerprints[key] += 1
+            self.fingerprint_seconds[key] += elapsed
+
+    def duplicates(self, limit=10):
+        """The most repeated fingerprints as dicts, most frequent first"""
+        return [
+            {'sql': sql[:500], 'count': count, 'ms': round(self.fingerprint_seconds[sql] * 1000, 3)}
+            for sql, count in self.fingerprints.most_common(limit) if count > 1
+        ]
+
+
+class RequestProfile:
+    """Measurements for one request"""
+
+    def __init__(self, request, response, wall_seconds, queries, calculations):
+        match = getattr(request, 'resolver_match', None)
+        self.view = match.view_name if match else ''
+        self.method = request.method
+        self.path = request.path
+        self.status = response.status_code
+        self.wall_ms = wall_seconds * 1000
+        self.queries = queries.count
+        self.sql_ms = queries.seconds * 1000
+        self.duplicates = queries.duplicates()
+        self.duplicate_queries = sum(entry['count'] - 1 for entry in self.duplicates)
+        self.calculation_ms = calculations.seconds * 1000
+        self.calculation_calls = calculations.calls
+        self.budgets = budgets_for(self.view)
+        self.over_budget = [
+            metric for metric, limit in self.budgets.items()
+            if limit is not None and getattr(self, metric) > limit
+        ]
+
+    def as_dict(self):
+        return {
+            'at': timezone.now().isoformat(),
+            'view': self.view,
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'wall_ms': round(self.wall_ms, 3),
+            'queries': self.queries,
+            'sql_ms': round(self.sql_ms, 3),
+            'duplicate_queries': self.duplicate_queries,
+            'duplicates': self.duplicates,
+            'calculation_ms': round(self.calculation_ms, 3),
+            'calculation_calls': self.calculation_calls,
+            'over_budget': self.over_budget,
+        }
+
+    def server_timing(self):
+        return (f'app;dur={self.wall_ms:.1f}, sql;dur={self.sql_ms:.1f};desc="{self.queries} queries", '
+                f'cost;dur={self.calculation_ms:.1f}')
+
+    def summary(self):
+        return (f'{self.method} {self.path} ({self.view or "unresolved"}) {self.status}: '
+                f'{self.wall_ms:.0f} ms, {self.queries} queries in {self.sql_ms:.0f} ms, '
+                f'{self.duplicate_queries} repeated, {self.calculation_ms:.0f} ms in cost calculations')
+
+
+def write_profile(profile):
+    """Append ``profile`` to ``REQUEST_PROFILE_LOG`` as a JSON line"""
+    path = getattr(settings, 'REQUEST_PROFILE_LOG', None)
+    if not path:
+        return
+    line = json.dumps(profile.as_dict()) + '\n'
+    with _log_lock, open(path, 'a') as f:
+        f.write(line)
+
+
+class RequestProfileMiddleware:
+    """Profiles each request when ``REQUEST_PROFILING`` is on; removed from the stack otherwise"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            calculations = stack.enter_context(timed_calculations())
+            response = self.get_response(request)
+        profile = RequestProfile(request, response, time.perf_counter() - start, queries, calculations)
+
+        if profile.over_budget:
+            logger.warning('Over budget (%s): %s', ', '.join(profile.over_budget), profile.summary())
+        else:
+            logger.info(profile.summary())
+        try:
+            write_profile(profile)
+        except OSError:
+            logger.exception('Could not write request profile')
+        if settings.DEBUG:
+            response['Server-Timing'] = profile.server_timing()
+        return response
@@ -1,11 +1,20 @@
-from django.db.models.signals import post_save
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
 from decimal import Decimal
+from .costing import refresh_quote_totals, refresh_many_quote_totals
+from .export_cache import invalidate_quotes
 from .models import (
     MaterialType, MouldingMachineType, AssemblyType,
     RawMaterial, MouldingMachineDetail, Assembly,
-    CustomerGroup, PackagingType
+    AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport,
+    CustomerGroup, PackagingType, QuoteTimeline
 )
 
 
@@ -64,82 +73,365 @@ def create_default_packaging_types(sender, instance, created, **kwargs):
 # =============================================================================
 
 
-@receiver(post_save, sender=MaterialType)
-def update_quotes_on_material_type_change(sender, instance, **kwargs):
+class TypePropagation:
+    """How a config type's fields are copied onto the quote rows that use it"""
+
+    def __init__(self, model, type_field, fields, priced_fields, section, activity_type, label_field, description):
+        self.model = model
+        self.type_field = type_field
+        # config type field -> dependent row field
+        self.fields = fields
+        # dependent row fields that feed its cost
+        self.priced_fields = frozenset(priced_fields)
+        self.section = section
+        self.activity_type = activity_type
+        self.label_field = label_field
+        self.description = description
+
+
+TYPE_PROPAGATIONS = {
+    MaterialType: TypePropagation(
+        model=RawMaterial,
+        type_field='material_type',
+        fields={
+            'raw_material_name': 'material_name',
+            'raw_material_grade': 'grade',
+            'raw_material_code': 'rm_code',
+            'raw_material_rate': 'rm_rate',
+        },
+        priced_fields={'rm_rate'},
+        section='raw_materials',
+        activity_type='raw_material_auto_updated',
+        label_field='material_name',
+        description="Raw material '{label}' auto-updated from Material Type template changes",
+    ),
+    MouldingMachineType: TypePropagation(
+        model=MouldingMachineDetail,
+        type_field='moulding_machine_type',
+        fields={
+            'shift_rate': 'shift_rate',
+            'shift_rate_for_mtc': 'shift_rate_for_mtc',
+            'mtc_count': 'mtc_count',
+        },
+        priced_fields={'shift_rate', 'shift_rate_for_mtc', 'mtc_count'},
+        section='moulding_machines',
+        activity_type='machine_auto_updated',
+        label_field='cavity',
+        description="Moulding machine (Cavity: {label}) auto-updated from Machine Type template changes",
+    ),
+}
+
+# Queued type changes while a propagation_batch() is open: (type model, pk) -> (instance, changes)
+_pending_propagation = ContextVar('pending_propagation', default=None)
+
+
+@contextmanager
+def propagation_batch():
+    """
+    Defer config type propagation until the block ends, then apply one merged
+    UPDATE per changed type, so each dependent row is written at most once
+    however many times its type was saved. Nested batches join the outer one.
+    """
+    if _pending_propagation.get() is not None:
+        yield
+        return
+    pending = {}
+    token = _pending_propagation.set(pending)
+    try:
+        yield
+    finally:
+        _pending_propagation.reset(token)
+        # Type rows saved so far are committed; bring their dependents in line
+        # unless the surrounding transaction is already being rolled back
+        if pending and not transaction.get_connection().needs_rollback:
+            _propagate_type_changes(pending.values())
+
+
+def _comparable(field, value):
+    """A field value normalised the way it is stored, so unchanged values compare equal"""
+    value = field.to_python(value)
+    if isinstance(field, models.DecimalField) and value is not None:
+        value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    return value
+
+
+def _changed_fields(instance, before, propagation):
+    """{dependent field: new value} for the synced fields whose stored value changed"""
+    changes = {}
+    for field_name, target in propagation.fields.items():
+        field = instance._meta.get_field(field_name)
+        value = getattr(instance, field_name)
+        if _comparable(field, before[field_name]) != _comparable(field, value):
+            changes[target] = value
+    return changes
+
+
+def _propagate_type_changes(items):
     """
-    When a MaterialType is updated, update all RawMaterials that reference it
+    Apply ``(type instance, {dependent field: value})`` changes: one read of
+    the dependent rows per type model, one UPDATE per type that has any, one
+    bulk INSERT of timeline entries and one re-pricing pass per affected
+    section, all in a single transaction. Cached exports of the affected
+    quotes are dropped once it commits.
     """
-    # Find all RawMaterials that use this MaterialType
-    raw_materials = RawMaterial.objects.filter(material_type=instance)
-
-    for rm in raw_materials:
-        # Update the fields that come from MaterialType
-        rm.material_name = instance.raw_material_name
-        rm.grade = instance.raw_material_grade
-        rm.rm_code = instance.raw_material_code
-        rm.rm_rate = instance.raw_material_rate
-        rm.save()
-
-        # Log the update to quote timeline
-        from .models import QuoteTimeline
-        QuoteTimeline.add_entry(
-            quote=rm.quote,
-            user=instance.created_by or rm.quote.created_by,
-            description=f"Raw material '{rm.material_name}' auto-updated from Material Type template changes",
-            activity_type="raw_material_auto_updated"
-        )
+    by_model = {}
+    for instance, changes in items:
+        by_model.setdefault(type(instance), []).append((instance, changes))
 
+    timeline_entries = []
+    repriced = {}
+    touched = set()
+    with transaction.atomic():
+        for type_model, type_changes in by_model.items():
+            propagation = TYPE_PROPAGATIONS[type_model]
+            type_attname = f'{propagation.type_field}_id'
+            dependents = {}
+            pks = [instance.pk for instance, _ in type_changes]
+            for start in range(0, len(pks), 500):
+                # Unordered, so the type's foreign key index is all the read needs
+                rows = propagation.model.objects.filter(
+                    **{f'{type_attname}__in': pks[start:start + 500]}).order_by()
+                for row in rows.values_list(type_attname, 'quote_id', propagation.label_field,
+                                            'quote__created_by_id'):
+                    dependents.setdefault(row[0], []).append(row[1:])
 
+            for instance, changes in type_changes:
+                rows = dependents.get(instance.pk)
+                if not rows:
+                    continue
+                # update() skips auto_now, which the per-row save() used to set
+                propagation.model.objects.filter(**{type_attname: instance.pk}).update(
+                    **changes, updated_at=timezone.now())
+
+                label_override = changes.get(propagation.label_field)
+                timeline_entries.extend(
+                    QuoteTimeline(
+                        quote_id=quote_id,
+                        user_id=instance.created_by_id or quote_owner_id,
+                        description=propagation.description.format(
+                            label=label if label_override is None else label_override),
+                        activity_type=propagation.activity_type,
+                    )
+                    for quote_id, label, quote_owner_id in rows
+                )
+                touched.update(quote_id for quote_id, _, _ in rows)
+                if propagation.priced_fields.intersection(changes):
+                    repriced.setdefault(propagation.section, set()).update(quote_id for quote_id, _, _ in rows)
+
+        QuoteTimeline.objects.bulk_create(timeline_entries, batch_size=500)
+        for section, quote_ids in repriced.items():
+            refresh_many_quote_totals(quote_ids, (section,))
+        # The rows changed without a version bump, so cached exports are stale
+        if touched:
+            transaction.on_commit(lambda: invalidate_quotes(touched))
+
+
+@receiver(pre_save, sender=MaterialType)
+@receiver(pre_save, sender=MouldingMachineType)
+def snapshot_synced_type_fields(sender, instance, raw=False, **kwargs):
+    """Remember the synced fields as stored, so the post_save handler can tell what changed"""
+    instance._synced_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._synced_before = sender.objects.filter(pk=instance.pk).values(
+        *TYPE_PROPAGATIONS[sender].fields).first()
+
+
+@receiver(post_save, sender=MaterialType)
 @receiver(post_save, sender=MouldingMachineType)
-def update_quotes_on_machine_type_change(sender, instance, **kwargs):
+def update_quotes_on_type_change(sender, instance, created, raw=False, **kwargs):
+    """
+    When a MaterialType or MouldingMachineType is updated, copy the fields
+    that changed to every quote row that references it. Inside a
+    propagation_batch() the change is queued and merged instead.
     """
-    When a MouldingMachineType is updated, update all MouldingMachineDetails that reference it
+    before = getattr(instance, '_synced_before', None)
+    if raw or created or before is None:
+        return
+    propagate_type_update(instance, before)
+
+
+def propagate_type_update(instance, before):
     """
-    # Find all MouldingMachineDetails that use this MouldingMachineType
-    machines = MouldingMachineDetail.objects.filter(moulding_machine_type=instance)
-
-    for machine in machines:
-        # Update the fields that come from MouldingMachineType
-        machine.shift_rate = instance.shift_rate
-        machine.shift_rate_for_mtc = instance.shift_rate_for_mtc
-        machine.mtc_count = instance.mtc_count
-        machine.save()
-
-        # Log the update to quote timeline
-        from .models import QuoteTimeline
-        QuoteTimeline.add_entry(
-            quote=machine.quote,
-            user=instance.created_by or machine.quote.created_by,
-            description=f"Moulding machine (Cavity: {machine.cavity}) auto-updated from Machine Type template changes",
-            activity_type="machine_auto_updated"
-        )
+    Copy the synced fields of a MaterialType or MouldingMachineType that
+    differ from ``before`` (their stored values) to its dependent quote rows.
+    Call this directly when types are written without save(), e.g. bulk_update.
+    """
+    changes = _changed_fields(instance, before, TYPE_PROPAGATIONS[type(instance)])
+    if not changes:
+        return
+
+    pending = _pending_propagation.get()
+    if pending is None:
+        _propagate_type_changes([(instance, changes)])
+        return
+    key = (type(instance), instance.pk)
+    _, queued = pending.get(key, (None, {}))
+    queued.update(changes)
+    pending[key] = (instance, queued)
 
 
 @receiver(post_save, sender=AssemblyType)
-def update_quotes_on_assembly_type_change(sender, instance, **kwargs):
+def update_quotes_on_assembly_type_change(sender, instance, raw=False, **kwargs):
     """
     When an AssemblyType is updated, update all Assemblies that reference it
 
     Note: AssemblyType mainly stores metadata (name, value, description).
     Most Assembly costs are entered manually, so this signal primarily updates
-    the assembly name if the user wants to keep it in sync.
+    the assembly name if the user wants to keep it in sync. Only assemblies
+    still named after the type (or unnamed) are touched, so custom names are
+    kept. One UPDATE and one bulk INSERT of timeline entries, however many
+    assemblies use the type.
     """
-    # Find all Assemblies that use this AssemblyType
-    assemblies = Assembly.objects.filter(assembly_type_config=instance)
-
-    for assembly in assemblies:
-        # Update the name to match the AssemblyType name
-        # Only update if the assembly name matches the old type name
-        # This prevents overwriting custom assembly names
-        if assembly.name == instance.name or not assembly.name:
-            assembly.name = instance.name
-            assembly.save()
-
-            # Log the update to quote timeline
-            from .models import QuoteTimeline
-            QuoteTimeline.add_entry(
-                quote=assembly.quote,
-                user=instance.created_by or assembly.quote.created_by,
-                description=f"Assembly '{assembly.name}' auto-updated from Assembly Type template changes",
-                activity_type="assembly_auto_updated"
+    if raw:
+        return
+    assemblies = Assembly.objects.filter(
+        models.Q(name=instance.name) | models.Q(name='') | models.Q(name__isnull=True),
+        assembly_type_config=instance,
+    )
+    rows = list(assemblies.order_by().values_list('quote_id', 'quote__created_by_id'))
+    if not rows:
+        return
+
+    with transaction.atomic():
+        # Names do not affect costs, so there is nothing to re-price
+        assemblies.update(name=instance.name, updated_at=timezone.now())
+        QuoteTimeline.objects.bulk_create([
+            QuoteTimeline(
+                quote_id=quote_id,
+                user_id=instance.created_by_id or quote_owner_id,
+                description=f"Assembly '{instance.name}' auto-updated from Assembly Type template changes",
+                activity_type='assembly_auto_updated',
             )
+            for quote_id, quote_owner_id in rows
+        ], batch_size=500)
+        touched = {quote_id for quote_id, _ in rows}
+        transaction.on_commit(lambda: invalidate_quotes(touched))
+
+
+# =============================================================================
+# DROP CACHED EXPORTS WHEN TYPE FIELDS THEY PRINT CHANGE
+# =============================================================================
+
+# Type model -> (dependent row model, its type foreign key, type fields the
+# exporter reads through that key rather than from the row)
+EXPORTED_TYPE_FIELDS = {
+    PackagingType: (Packaging, 'packaging_type', ('name',)),
+}
+
+
+@receiver(pre_save, sender=PackagingType)
+def snapshot_exported_type_fields(sender, instance, raw=False, **kwargs):
+    """Remember the exported fields as stored, so the post_save handler can tell what changed"""
+    instance._exported_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._exported_before = sender.objects.filter(pk=instance.pk).values(
+        *EXPORTED_TYPE_FIELDS[sender][2]).first()
+
+
+@receiver(post_save, sender=PackagingType)
+def invalidate_exports_on_type_change(sender, instance, created, raw=False, **kwargs):
+    """Renaming a PackagingType changes the exports of every quote using it"""
+    before = getattr(instance, '_exported_before', None)
+    if raw or created or before is None:
+        return
+    invalidate_type_exports(instance, before)
+
+
+def invalidate_type_exports(instance, before):
+    """
+    Drop cached exports of the quotes using ``instance`` once the transaction
+    commits, if a field the exporter reads from it differs from ``before``
+    (its stored values). Call this directly when types are written without
+    save(), e.g. bulk_update.
+    """
+    model, type_field, fields = EXPORTED_TYPE_FIELDS[type(instance)]
+    if all(before[field] == getattr(instance, field) for field in fields):
+        return
+    quote_ids = set(model.objects.filter(**{type_field: instance}).order_by().values_list('quote_id', flat=True))
+    if quote_ids:
+        transaction.on_commit(lambda: invalidate_quotes(quote_ids))
+
+
+# =============================================================================
+# KEEP MATERIALIZED QUOTE TOTALS CURRENT
+# =============================================================================
+
+# Component model -> quote sections whose subtotal it affects
+QUOTE_TOTAL_SECTIONS = {
+    RawMaterial: ('raw_materials',),
+    MouldingMachineDetail: ('moulding_machines',),
+    Assembly: ('assemblies',),
+    # Transport costs are derived from the linked packaging's box dimensions
+    Packaging: ('packagings', 'transports'),
+    Transport: ('transports',),
+}
+
+
+def _deleted_directly(origin, *models):
+    """
+    True when the delete was started on one of ``models`` (an instance or a
+    queryset). Rows removed by a cascade from their quote, project or
+    assembly are skipped; the parent's own handler covers them.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model in models
+
+
+def _quote_for(instance):
+    """The loaded quote instance if cached on the row, otherwise its pk"""
+    if type(instance).quote.is_cached(instance):
+        return instance.quote
+    return instance.quote_id
+
+
+@receiver(post_save, sender=RawMaterial)
+@receiver(post_save, sender=MouldingMachineDetail)
+@receiver(post_save, sender=Assembly)
+@receiver(post_save, sender=Packaging)
+@receiver(post_save, sender=Transport)
+def refresh_totals_on_component_save(sender, instance, raw=False, **kwargs):
+    """Re-price the affected section(s) of the quote after a component row is saved"""
+    if raw:
+        return
+    refresh_quote_totals(_quote_for(instance), QUOTE_TOTAL_SECTIONS[sender])
+
+
+@receiver(post_delete, sender=RawMaterial)
+@receiver(post_delete, sender=MouldingMachineDetail)
+@receiver(post_delete, sender=Assembly)
+@receiver(post_delete, sender=Packaging)
+@receiver(post_delete, sender=Transport)
+def refresh_totals_on_component_delete(sender, instance, origin=None, **kwargs):
+    """Re-price the affected section(s) of the quote after a component row is deleted"""
+    if origin is not None and not _deleted_directly(origin, sender):
+        return
+    refresh_quote_totals(_quote_for(instance), QUOTE_TOTAL_SECTIONS[sender])
+
+
+def _refresh_assembly_section(instance):
+    if type(instance).assembly.is_cached(instance):
+        quote = _quote_for(instance.assembly)
+    else:
+        quote = Assembly.objects.filter(pk=instance.assembly_id).values_list('quote_id', flat=True).first()
+    if quote is not None:
+        refresh_quote_totals(quote, ('assemblies',))
+
+
+@receiver(post_save, sender=AssemblyRawMaterial)
+@receiver(post_save, sender=ManufacturingPrintingCost)
+def refresh_totals_on_assembly_child_save(sender, instance, raw=False, **kwargs):
+    """Assembly child rows change the assembly section subtotal"""
+    if raw:
+        return
+    _refresh_assembly_section(instance)
+
+
+@receiver(post_delete, sender=AssemblyRawMaterial)
+@receiver(post_delete, sender=ManufacturingPrintingCost)
+def refresh_totals_on_assembly_child_delete(sender, instance, origin=None, **kwargs):
+    """Assembly child rows change the assembly section subtotal"""
+    if origin is not None and not _deleted_directly(origin, AssemblyRawMaterial, ManufacturingPrintingCost):
+        return
+    _refresh_assembly_section(instance)
@@ -1,5 +1,7 @@
 from django import template
-from decimal import Decimal
+from decimal import InvalidOperation
+
+from core.money import to_decimal
 
 register = template.Library()
 
@@ -18,14 +20,14 @@ def smart_decimal(value, max_decimals=8):
     
     try:
         # Convert to Decimal for precise handling
-        dec_value = Decimal(str(value))
+        dec_value = to_decimal(value)
         
         # Check if value is zero
         if dec_value == 0:
             return '0'
         
         # Convert to string and remove trailing zeros
-        str_value = str(dec_value)
+        str_value = f'{dec_value:f}'
         
         # Split into integer and decimal parts
         if '.' in str_value:
@@ -50,7 +52,7 @@ def smart_decimal(value, max_decimals=8):
         else:
             return str_value
             
-    except (ValueError, TypeError, decimal.InvalidOperation):
+    except (ValueError, TypeError, InvalidOperation):
         return str(value)
 
 
@@ -67,7 +69,7 @@ def smart_decimal_fixed(value, decimals=2):
     
     try:
         # Convert to Decimal for precise handling
-        dec_value = Decimal(str(value))
+        dec_value = to_decimal(value)
         
         # Check if value is zero
         if dec_value == 0:
@@ -82,7 +84,7 @@ def smart_decimal_fixed(value, decimals=2):
         
         return formatted
             
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, InvalidOperation):
         return str(value)
 
 
@@ -98,13 +100,13 @@ def percentage_display(value):
         return '0'
     
     try:
-        dec_value = Decimal(str(value))
+        dec_value = to_decimal(value)
         
         if dec_value == 0:
             return '0'
         
         # Convert to string
-        str_value = str(dec_value)
+        str_value = f'{dec_value:f}'
         
         if '.' in str_value:
             integer_part, decimal_part = str_value.split('.')
@@ -116,5 +118,5 @@ def percentage_display(value):
         else:
             return str_value
             
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, InvalidOperation):
         return str(value)
@@ -1,3 +1,1095 @@
+import io
+import json
+import os
+import tempfile
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import openpyxl
+from openpyxl.styles import Font, PatternFill
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from . import excel_templates, export_cache, urls
+from .benchmark import build_upload_files, seed_dataset
+from .cloning import clone_project, clone_quote
+from .costing import price_quote, profit_amount, stored_totals
+from .excel_utils import (
+    ComponentBatch, ConfigParser, ConfigTemplateGenerator, ConfigTypeUpsert, ExcelExporter, ExcelParser,
+    ExcelTemplateGenerator, UploadedWorkbook,
+)
+from .signals import propagation_batch
+from .imports import claim_next_job, enqueue_import, run_import_job
+from .models import (
+    Project, Quote, QuoteTimeline, ImportJob, MaterialType, MouldingMachineType, AssemblyType, PackagingType, RawMaterial,
+    MouldingMachineDetail, Assembly, AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport,
+)
+
+# URL name -> (most queries, most milliseconds) for one GET against the seeded
+# dataset. Query counts are the real guard: each is the measured count plus
+# two, while one extra query per row would add at least eight. Wall time is
+# generous so slow CI machines pass, and only catches something pathological.
+VIEW_BUDGETS = {
+    'home': (4, 2000),
+    'projects': (5, 2000),
+    'project_create': (4, 2000),
+    'project_detail': (7, 2000),
+    'quote_create': (6, 2000),
+    'quote_detail': (14, 2000),
+    'quote_definition_edit': (8, 2000),
+    'raw_material_add': (8, 2000),
+    'raw_material_delete': (15, 2000),
+    'raw_material_complete': (14, 2000),
+    'moulding_machine_add': (8, 2000),
+    'moulding_machine_delete': (15, 2000),
+    'moulding_machine_complete': (14, 2000),
+    'customer_group_create': (4, 2000),
+    'customer_group_delete': (6, 2000),
+    'config': (11, 2000),
+    'config_create': (5, 2000),
+    'config_delete': (12, 2000),
+    'assembly_add': (8, 2000),
+    'assembly_detail': (11, 2000),
+    'assembly_delete': (21, 2000),
+    'assembly_raw_material_add': (7, 2000),
+    'assembly_raw_material_delete': (19, 2000),
+    'manufacturing_printing_cost_add': (7, 2000),
+    'manufacturing_printing_cost_delete': (19, 2000),
+    'assembly_complete': (14, 2000),
+    'assembly_edit': (12, 2000),
+    'packaging_add': (8, 2000),
+    'packaging_delete': (18, 2000),
+    'packaging_complete': (14, 2000),
+    'transport_add': (9, 2000),
+    'transport_delete': (17, 2000),
+    'transport_complete': (14, 2000),
+    'timeline_add_manual': (6, 2000),
+    'quote_summary': (13, 2000),
+    'admin_dashboard': (8, 2000),
+    'admin_user_create': (4, 2000),
+    'admin_user_edit': (5, 2000),
+    'admin_user_delete': (18, 2000),
+    'admin_user_toggle_active': (6, 2000),
+    'quote_mark_completed': (10, 2000),
+    'quote_reopen': (6, 2000),
+    'quote_discard': (6, 2000),
+    'quote_clone': (25, 2000),
+    'project_clone': (32, 5000),
+    'material_type_create': (5, 2000),
+    'material_type_delete': (4, 2000),
+    'moulding_machine_type_create': (5, 2000),
+    'moulding_machine_type_delete': (4, 2000),
+    'download_raw_materials_template': (4, 2000),
+    'download_moulding_machines_template': (4, 2000),
+    'download_complete_quote_template': (4, 2000),
+    'upload_raw_materials': (6, 2000),
+    'upload_moulding_machines': (6, 2000),
+    'upload_complete_quote': (6, 2000),
+    'raw_material_edit': (10, 2000),
+    'moulding_machine_edit': (9, 2000),
+    'assembly_raw_material_edit': (8, 2000),
+    'manufacturing_printing_cost_edit': (8, 2000),
+    'packaging_edit': (10, 2000),
+    'download_multiple_quotes_template': (4, 2000),
+    'upload_multiple_quotes': (6, 2000),
+    'transport_edit': (11, 2000),
+    'packaging_type_add': (5, 2000),
+    'packaging_type_edit': (5, 2000),
+    'packaging_type_delete': (5, 2000),
+    'export_quote': (14, 5000),
+    'export_project': (15, 10000),
+    'upload_material_types': (5, 2000),
+    'upload_machine_types': (5, 2000),
+    'upload_assembly_types': (5, 2000),
+    'upload_packaging_types': (5, 2000),
+    'import_job_detail': (5, 2000),
+    'import_job_status': (5, 2000),
+    'download_material_types_template': (4, 2000),
+    'download_machine_types_template': (4, 2000),
+    'download_assembly_types_template': (4, 2000),
+    'download_packaging_types_template': (4, 2000),
+    'material_type_edit': (5, 2000),
+    'moulding_machine_type_edit': (5, 2000),
+    'assembly_type_edit': (5, 2000),
+}
+
+# Every other view must run the same number of queries however many component
+# rows, quotes and config types there are. Project clones split their bulk
+# inserts into batches by the backend's parameter limit.
+SIZE_DEPENDENT_VIEWS = ('project_clone',)
+
+# Views that only act on POST, measured by posting to them
+POST_VIEWS = ('quote_clone', 'project_clone')
+
+# Query strings some views need to get past their redirects
+QUERY_STRINGS = {
+    'config': 'customer_group={customer_group}',
+    'config_create': 'customer_group={customer_group}',
+}
+
+
+class SeededViews:
+    """URL arguments for every core route, pointing at one quote of a seeded dataset"""
+
+    def __init__(self, data, other_user):
+        quote = data.quote
+        assembly = Assembly.objects.filter(quote=quote).order_by('pk').first()
+        self.data = data
+        self.kwargs = {
+            'project_id': data.project.pk,
+            'quote_id': quote.pk,
+            'rm_id': RawMaterial.objects.filter(quote=quote).order_by('pk').first().pk,
+            'mm_id': MouldingMachineDetail.objects.filter(quote=quote).order_by('pk').first().pk,
+            'assembly_id': assembly.pk,
+            'arm_id': AssemblyRawMaterial.objects.filter(assembly=assembly).order_by('pk').first().pk,
+            'mpc_id': ManufacturingPrintingCost.objects.filter(assembly=assembly).order_by('pk').first().pk,
+            'cost_id': ManufacturingPrintingCost.objects.filter(assembly=assembly).order_by('pk').first().pk,
+            'packaging_id': Packaging.objects.filter(quote=quote).order_by('pk').first().pk,
+            'transport_id': Transport.objects.filter(quote=quote).order_by('pk').first().pk,
+            'customer_group_id': data.customer_group.pk,
+            'material_type_id': MaterialType.objects.filter(customer_group=data.customer_group).first().pk,
+            'machine_type_id': MouldingMachineType.objects.filter(customer_group=data.customer_group).first().pk,
+            'assembly_type_id': AssemblyType.objects.filter(customer_group=data.customer_group).first().pk,
+            'packaging_type_id': PackagingType.objects.filter(customer_group=data.customer_group).first().pk,
+            'user_id': other_user.pk,
+            'job_id': ImportJob.objects.create(
+                kind='complete_quote', project=data.project, quote=quote, created_by=data.user).pk,
+            'config_type': 'assembly-type',
+            'item_id': AssemblyType.objects.filter(customer_group=data.customer_group).first().pk,
+        }
+
+    def url(self, pattern):
+        kwargs = {name: self.kwargs[name] for name in pattern.pattern.converters}
+        url = reverse(pattern.name, kwargs=kwargs)
+        query = QUERY_STRINGS.get(pattern.name)
+        if query:
+            url += '?' + query.format(customer_group=self.data.customer_group.pk)
+        return url
+
+
+def core_patterns():
+    return [pattern for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)]
+
+
+class ViewQueryBudgetTests(TestCase):
+    """
+    GET (or for POST_VIEWS, POST) every core URL against a seeded dataset
+    and hold each to its VIEW_BUDGETS entry. Each request runs in a rolled back savepoint, so
+    deletes and status changes do not affect the next view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_dataset(customer_groups=1, config_types=5, projects=1, quotes_per_project=2, rows=2)
+        cls.large = seed_dataset(customer_groups=1, config_types=10, projects=2, quotes_per_project=6, rows=8)
+        other_user = User.objects.create_user('budget-other-user')
+        cls.urls = {cls.small: SeededViews(cls.small, other_user), cls.large: SeededViews(cls.large, other_user)}
+
+    def setUp(self):
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        # Exports are measured on a cache miss, building the workbook
+        override = self.settings(EXPORT_CACHE_DIR=export_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def measure(self, data, pattern):
+        """(queries, milliseconds, status) of one request to ``pattern`` as ``data``'s user"""
+        self.client.force_login(data.user)
+        url = self.urls[data].url(pattern)
+        send = self.client.post if pattern.name in POST_VIEWS else self.client.get
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = send(url)
+                elapsed = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(True)
+        return len(queries), elapsed, response.status_code
+
+    def test_every_url_has_a_budget(self):
+        missing = [pattern.name for pattern in core_patterns() if pattern.name not in VIEW_BUDGETS]
+        self.assertEqual(missing, [], 'Add a VIEW_BUDGETS entry for new core URLs')
+
+    def test_views_stay_within_budget(self):
+        for pattern in core_patterns():
+            max_queries, max_ms = VIEW_BUDGETS[pattern.name]
+            with self.subTest(view=pattern.name):
+                queries, elapsed, status = self.measure(self.large, pattern)
+                self.assertLess(status, 500)
+                self.assertLessEqual(queries, max_queries, f'{pattern.name} ran {queries} queries')
+                self.assertLessEqual(elapsed, max_ms, f'{pattern.name} took {elapsed:.0f} ms')
+
+    def test_query_count_does_not_grow_with_dataset(self):
+        for pattern in core_patterns():
+            if pattern.name in SIZE_DEPENDENT_VIEWS:
+                continue
+            with self.subTest(view=pattern.name):
+                small_queries, _, _ = self.measure(self.small, pattern)
+                large_queries, _, _ = self.measure(self.large, pattern)
+                self.assertEqual(
+                    large_queries, small_queries,
+                    f'{pattern.name} ran {small_queries} queries for {self.small.counts["raw_materials"]} rows '
+                    f'but {large_queries} for {self.large.counts["raw_materials"]}; is there an N+1?')
+
+
+# Component model -> (path from a row to its quote, a field that changes its cost)
+TOTAL_SOURCES = (
+    (RawMaterial, 'quote', 'part_weight'),
+    (MouldingMachineDetail, 'quote', 'cycle_time'),
+    (Assembly, 'quote', 'manual_cost'),
+    (AssemblyRawMaterial, 'assembly__quote', 'cost_per_unit'),
+    (ManufacturingPrintingCost, 'assembly__quote', 'cycle_time'),
+    (Packaging, 'quote', 'parts_per_packaging'),
+    (Transport, 'quote', 'trip_cost'),
+)
+
+
+
+class RequestProfileTests(TestCase):
+    """Request profiles are logged as JSON lines and summarised per view by profile_report"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=2, projects=1, quotes_per_project=2, rows=1)
+
+    def setUp(self):
+        log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(log_dir.cleanup)
+        self.log = os.path.join(log_dir.name, 'profiles.jsonl')
+        # Before the first request, which is when the test client loads the middleware
+        override = self.settings(REQUEST_PROFILING=True, REQUEST_PROFILE_LOG=self.log, REQUEST_PROFILE_BUDGETS={
+            'project_detail': {'duplicate_queries': 0},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_repeated_query_is_logged_and_reported(self):
+        self.client.force_login(self.data.user)
+        with self.assertLogs('core.profiling', 'INFO') as logs:
+            self.client.get(reverse('home'))
+            self.client.get(reverse('project_detail', kwargs={'project_id': self.data.project.pk}))
+        self.assertTrue(logs.output[1].startswith('WARNING:core.profiling:Over budget (duplicate_queries)'))
+
+        with open(self.log) as f:
+            profiles = {profile['view']: profile for profile in map(json.loads, f)}
+        self.assertEqual(profiles['home']['over_budget'], [])
+        detail = profiles['project_detail']
+        self.assertEqual(detail['over_budget'], ['duplicate_queries'])
+        self.assertEqual(len(detail['duplicates']), 1)
+        self.assertEqual(detail['duplicates'][0]['count'], 2)
+
+        out = StringIO()
+        call_command('profile_report', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        views = {row['view']: row for row in report['views']}
+        self.assertEqual((views['home']['requests'], views['home']['over_budget']), (1, 0))
+        self.assertEqual((views['project_detail']['requests'], views['project_detail']['over_budget']), (1, 1))
+        self.assertEqual(report['repeated_queries'], [
+            {'view': 'project_detail', 'sql': detail['duplicates'][0]['sql'], 'repeats': 1},
+        ])
+
+class QuoteTotalsTests(TestCase):
+    """The materialized totals on Quote follow every change to the rows they are priced from"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=2, rows=2)
+        cls.quote = cls.data.quote
+
+    def stored(self, quote=None):
+        quote = Quote.objects.get(pk=(quote or self.quote).pk)
+        return {field: getattr(quote, field) for field in stored_totals(price_quote(quote))}
+
+    def assertTotalsCurrent(self, quote=None):
+        quote = Quote.objects.with_cost_graph().get(pk=(quote or self.quote).pk)
+        expected = stored_totals(price_quote(quote))
+        self.assertEqual({field: getattr(quote, field) for field in expected}, expected)
+
+    def first_row(self, model, quote_path):
+        return model.objects.filter(**{quote_path: self.quote}).order_by('pk').first()
+
+    def test_seeded_totals_are_current(self):
+        for quote in Quote.objects.all():
+            self.assertTotalsCurrent(quote)
+
+    def test_creating_a_row_updates_totals(self):
+        for model, quote_path, _ in TOTAL_SOURCES:
+            with self.subTest(model=model.__name__):
+                before = self.stored()
+                row = self.first_row(model, quote_path)
+                row.pk = None
+                row._state.adding = True
+                row.save()
+                self.assertTotalsCurrent()
+                self.assertNotEqual(self.stored()['grand_total'], before['grand_total'])
+
+    def test_editing_a_row_updates_totals(self):
+        for model, quote_path, field in TOTAL_SOURCES:
+            with self.subTest(model=model.__name__):
+                before = self.stored()
+                row = self.first_row(model, quote_path)
+                setattr(row, field, getattr(row, field) * 2 + 1)
+                row.save()
+                self.assertTotalsCurrent()
+                self.assertNotEqual(self.stored()['grand_total'], before['grand_total'])
+
+    def test_deleting_a_row_updates_totals(self):
+        for model, quote_path, _ in TOTAL_SOURCES:
+            with self.subTest(model=model.__name__):
+                self.first_row(model, quote_path).delete()
+                self.assertTotalsCurrent()
+
+    def test_queryset_delete_updates_totals(self):
+        RawMaterial.objects.filter(quote=self.quote).delete()
+        AssemblyRawMaterial.objects.filter(assembly__quote=self.quote).delete()
+        self.assertTotalsCurrent()
+        self.assertEqual(self.stored()['total_raw_material_cost'], 0)
+
+    def test_deleting_an_assembly_cascades_to_its_children(self):
+        assembly = self.first_row(Assembly, 'quote')
+        self.assertTrue(assembly.assembly_raw_materials.exists())
+        assembly.delete()
+        self.assertFalse(AssemblyRawMaterial.objects.filter(assembly_id=assembly.pk).exists())
+        self.assertTotalsCurrent()
+
+    def test_deleting_packaging_reprices_its_transports(self):
+        packaging = self.first_row(Packaging, 'quote')
+        self.assertTrue(packaging.transports.exists())
+        packaging.delete()
+        self.assertTotalsCurrent()
+
+    def test_deleting_a_quote_leaves_other_quotes_alone(self):
+        other = Quote.objects.exclude(pk=self.quote.pk).get()
+        before = self.stored(other)
+        self.quote.delete()
+        self.assertEqual(self.stored(other), before)
+        self.assertTotalsCurrent(other)
+
+    def test_profit_input_change_updates_totals(self):
+        quote = Quote.objects.get(pk=self.quote.pk)
+        quote.profit_percentage += 5
+        quote.handling_charge += 100
+        quote.save()
+        self.assertTotalsCurrent()
+        self.assertEqual(quote.grand_total, self.stored()['grand_total'])
+
+    def test_plain_save_does_not_reprice_or_write_totals(self):
+        quote = Quote.objects.get(pk=self.quote.pk)
+        before = self.stored()
+        quote.grand_total = Decimal('0')
+        quote.name = 'Renamed'
+        with self.assertNumQueries(1):
+            quote.save()
+        self.assertEqual(self.stored(), before)
+
+    def test_save_of_a_deferred_quote_only_writes_loaded_fields(self):
+        quote = Quote.objects.only('name', 'project').get(pk=self.quote.pk)
+        quote.name = 'Renamed'
+        with self.assertNumQueries(1):
+            quote.save()
+        self.assertEqual(Quote.objects.get(pk=self.quote.pk).name, 'Renamed')
+
+    def test_project_totals_sum_the_stored_quote_totals(self):
+        project = Project.objects.with_stored_totals().get(pk=self.data.project.pk)
+        quotes = list(Quote.objects.filter(project=project))
+        self.assertEqual(project.quotes_count, 2)
+        self.assertEqual(project.grand_total, sum(quote.grand_total for quote in quotes))
+        # The live database-side pricing agrees, up to floating point
+        live = Project.objects.with_totals().get(pk=project.pk)
+        self.assertAlmostEqual(live.live_grand_total, float(project.grand_total), places=4)
+
+    def test_rebuild_verify_reports_and_rebuild_repairs_stale_totals(self):
+        Quote.objects.filter(pk=self.quote.pk).update(grand_total=0, total_packaging_cost=0)
+        with self.assertRaisesMessage(CommandError, '1 of 2 quotes have stale totals'):
+            call_command('rebuild_quote_totals', '--verify', stdout=StringIO())
+
+        out = StringIO()
+        call_command('rebuild_quote_totals', stdout=out)
+        self.assertIn('rebuilt 1', out.getvalue())
+        self.assertTotalsCurrent()
+        call_command('rebuild_quote_totals', '--verify', stdout=out)
+        self.assertIn('All 2 quotes have up-to-date totals', out.getvalue())
+
+
+class ImportJobTests(TestCase):
+    """Queued imports run by the worker"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=1, rows=1)
+
+    def setUp(self):
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = self.settings(MEDIA_ROOT=media_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def run_job(self, name, content):
+        job = enqueue_import('material_types', SimpleUploadedFile(name, content), self.data.user,
+                             customer_group=self.data.customer_group)
+        path = job.file.path
+        self.assertTrue(os.path.exists(path))
+        return run_import_job(claim_next_job('test-worker')), path
+
+    def test_upload_is_deleted_when_the_job_succeeds(self):
+        name, content = build_upload_files(rows=1, quotes=1, config_types=3)['material_types']
+        job, path = self.run_job(name, content)
+        self.assertEqual(job.status, 'succeeded')
+        self.assertFalse(os.path.exists(path))
+        job.refresh_from_db()
+        self.assertFalse(job.file)
+        self.assertEqual(job.original_name, name)
+
+    def test_worker_refuses_concurrency_on_sqlite(self):
+        with self.assertRaisesMessage(CommandError, 'SQLite allows one writer at a time'):
+            call_command('run_import_worker', '--concurrency', '2', '--once', stdout=StringIO())
+
+    def test_upload_is_deleted_when_the_job_fails(self):
+        with self.assertLogs('core.imports', 'ERROR'):
+            job, path = self.run_job('broken.xlsx', b'not a workbook')
+        self.assertEqual(job.status, 'failed')
+        self.assertFalse(os.path.exists(path))
+
+
+class ComponentBatchTests(TestCase):
+    """Bulk writes of imported quotes and their components"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=2, rows=1)
+
+    def new_quote(self, name):
+        return Quote(project=self.data.project, name=name, client_group=self.data.customer_group,
+                     created_by=self.data.user, profit_percentage=Decimal('10'))
+
+    def test_save_quotes_rolls_back_only_the_failing_quote(self):
+        batch = ComponentBatch()
+        quotes = [self.new_quote(f'Imported {n}') for n in range(3)]
+        for quote in quotes:
+            batch.add(RawMaterial(quote=quote, material_name='PP', unit_of_measurement='kg',
+                                  rm_rate=Decimal('120'), part_weight=Decimal('0.5')))
+            batch.add(Packaging(quote=quote, packaging_category='box', cost=Decimal('300'),
+                                lifecycle=10, parts_per_packaging=100))
+        # NOT NULL fails on the packaging insert, after this quote and its raw material went in
+        bad = quotes[1]
+        next(row for row in batch.rows[Packaging] if row.quote is bad).cost = None
+
+        saved, failed = batch.save_quotes(quotes)
+
+        self.assertEqual(saved, [quotes[0], quotes[2]])
+        self.assertEqual([quote for quote, _ in failed], [bad])
+        self.assertIsNone(bad.pk)
+        self.assertFalse(Quote.objects.filter(name='Imported 1').exists())
+        self.assertFalse(RawMaterial.objects.filter(quote__name='Imported 1').exists())
+        for quote in saved:
+            self.assertEqual(quote.raw_materials.count(), 1)
+            self.assertEqual(quote.packagings.count(), 1)
+            stored = Quote.objects.with_cost_graph().get(pk=quote.pk)
+            expected = stored_totals(price_quote(stored))
+            self.assertEqual({field: getattr(stored, field) for field in expected}, expected)
+            self.assertGreater(stored.grand_total, 0)
+
+    def test_complete_quote_import_queries_do_not_grow_with_columns(self):
+        small, large = Quote.objects.filter(project=self.data.project).order_by('pk')[:2]
+
+        def upload_of(rows):
+            name, content = build_upload_files(rows=rows, quotes=1, config_types=1)['complete_quote']
+            return SimpleUploadedFile(name, content)
+
+        existing = large.raw_materials.count()
+        with CaptureQueriesContext(connection) as queries:
+            _, errors, results = ExcelParser.parse_complete_quote(upload_of(2), small)
+        self.assertEqual(errors, [])
+        with self.assertNumQueries(len(queries)):
+            _, errors, results = ExcelParser.parse_complete_quote(upload_of(25), large)
+        self.assertEqual(errors, [])
+        self.assertEqual(results['raw_materials'], 25)
+        self.assertEqual(large.raw_materials.count(), existing + 25)
+
+
+
+class SheetValuesTests(TestCase):
+    """Uploaded sheets are read into plain values addressed like ws.cell(row, col)"""
+
+    def test_formatted_empty_cells_are_trimmed(self):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'Data'
+        ws['A1'], ws['B1'], ws['C1'] = 'Name', 'First', 'Second'
+        ws['A2'], ws['C2'] = 'Rate', 12.5
+        ws['A3'], ws['B3'] = 'Count', 4
+        # Formatting alone pushes the stored dimensions out to GR500
+        ws.cell(500, 200).fill = PatternFill('solid', fgColor='FFFF00')
+        ws.cell(4, 5).font = Font(bold=True)
+        file = upload(wb)
+        stored = openpyxl.load_workbook(file, read_only=True)
+        self.assertEqual((stored['Data'].max_row, stored['Data'].max_column), (500, 200))
+        stored.close()
+
+        sheet = UploadedWorkbook(file)['Data']
+
+        self.assertEqual((sheet.max_row, sheet.max_column), (3, 3))
+        self.assertEqual(sheet.column(1), ('Name', 'Rate', 'Count'))
+        self.assertEqual(sheet.column(2), ('First', None, 4))
+        self.assertEqual(sheet.column(3), ('Second', 12.5))
+        self.assertEqual(sheet.value(2, 3), 12.5)
+        self.assertEqual(sheet.value(3, 2), 4)
+        self.assertIsNone(sheet.value(3, 3))
+        self.assertIsNone(sheet.value(500, 200))
+        self.assertEqual(sheet.column(0), ())
+
+class ExportCacheTests(TestCase):
+    """Cached export workbooks are reused until their quote or project changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=2, rows=1)
+
+    def setUp(self):
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        override = self.settings(EXPORT_CACHE_DIR=export_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.builds = []
+
+    def export(self, key, content=b'workbook'):
+        def build(f):
+            self.builds.append(key)
+            f.write(content)
+        with export_cache.open_export(key, build) as f:
+            return f.read()
+
+    def cached_keys(self):
+        return sorted(path.stem for path in export_cache.cache_dir().glob('*.xlsx'))
+
+    def test_miss_builds_and_hit_reuses(self):
+        key = export_cache.quote_key(self.data.quote)
+        self.assertEqual(self.export(key, b'first'), b'first')
+        self.assertEqual(self.export(key, b'second'), b'first')
+        self.assertEqual(self.builds, [key])
+
+    def test_version_bump_changes_the_key_and_drops_the_old_file(self):
+        quote = Quote.objects.get(pk=self.data.quote.pk)
+        old_quote_key = export_cache.quote_key(quote)
+        old_project_key = export_cache.project_key(self.data.project)
+        self.export(old_quote_key)
+        self.export(old_project_key)
+
+        quote.increment_version(self.data.user)
+        new_quote_key = export_cache.quote_key(quote)
+        new_project_key = export_cache.project_key(self.data.project)
+        self.assertNotEqual(new_quote_key, old_quote_key)
+        self.assertNotEqual(new_project_key, old_project_key)
+
+        self.export(new_quote_key)
+        self.export(new_project_key)
+        self.assertEqual(self.builds, [old_quote_key, old_project_key, new_quote_key, new_project_key])
+        self.assertEqual(self.cached_keys(), sorted([new_quote_key, new_project_key]))
+
+    def test_eviction_drops_the_least_recently_read_files(self):
+        for n, key in enumerate(['quote-1--a', 'quote-2--a', 'quote-3--a']):
+            self.export(key, b'x' * 100)
+            os.utime(export_cache._path(key), (1000 + n, 1000 + n))
+        # Reading the oldest makes it the most recently used
+        self.export('quote-1--a')
+        export_cache.evict(max_bytes=250)
+        self.assertEqual(self.cached_keys(), ['quote-1--a', 'quote-3--a'])
+
+    def test_miss_survives_a_concurrent_discard_of_its_file(self):
+        key = export_cache.quote_key(self.data.quote)
+        replace = os.replace
+
+        def replace_then_discard(src, dst):
+            replace(src, dst)
+            os.unlink(dst)
+
+        with mock.patch('core.export_cache.os.replace', side_effect=replace_then_discard):
+            self.assertEqual(self.export(key, b'built'), b'built')
+
+    def test_renaming_a_packaging_type_drops_the_exports_using_it(self):
+        packaging = Packaging.objects.filter(quote=self.data.quote, packaging_type__isnull=False).first()
+        other = Quote.objects.exclude(pk=self.data.quote.pk).get()
+        other.packagings.filter(packaging_type=packaging.packaging_type).update(packaging_type=None)
+        quote_key = export_cache.quote_key(self.data.quote)
+        other_key = export_cache.quote_key(other)
+        project_key = export_cache.project_key(self.data.project)
+        for key in (quote_key, other_key, project_key):
+            self.export(key)
+
+        packaging_type = PackagingType.objects.get(pk=packaging.packaging_type_id)
+        packaging_type.remarks = 'Not exported'
+        with self.captureOnCommitCallbacks(execute=True):
+            packaging_type.save()
+        self.assertEqual(self.cached_keys(), sorted([quote_key, other_key, project_key]))
+
+        packaging_type.name = 'Renamed box'
+        with self.captureOnCommitCallbacks(execute=True):
+            packaging_type.save()
+        self.assertEqual(self.cached_keys(), [other_key])
+
+
+
+class ProjectExportTests(TestCase):
+    """Project exports stream every quote into one write-only workbook"""
+
+    SECTIONS = ['Summary', 'Quote Definition', 'Raw Materials', 'Moulding Machines', 'Assemblies', 'Packaging',
+                'Transport']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=2, projects=1, quotes_per_project=2, rows=1)
+
+    def test_export_project_workbook(self):
+        output = ExcelExporter.export_project(self.data.project, io.BytesIO())
+        output.seek(0)
+        wb = openpyxl.load_workbook(output)
+        quotes = list(self.data.project.quotes.all())
+
+        self.assertEqual(wb.sheetnames, ['Project Summary'] + [
+            f'{quote.name}_{section}' for quote in quotes for section in self.SECTIONS
+        ])
+        summary = {row[0]: row[1] for row in wb['Project Summary'].iter_rows(values_only=True)}
+        self.assertEqual(summary['Project Name'], self.data.project.name)
+        self.assertEqual(summary['Total Quotes'], 2)
+        for quote in quotes:
+            totals = {row[0]: row[1] for row in wb[f'{quote.name}_Summary'].iter_rows(values_only=True)}
+            self.assertAlmostEqual(totals['Grand Total'], float(quote.grand_total), places=6)
+            self.assertAlmostEqual(totals['Base Cost'], float(quote.base_cost), places=6)
+
+
+class ExcelTemplateTests(TestCase):
+    """Upload templates are pre-built on deploy and revalidated by ETag"""
+
+    def setUp(self):
+        template_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(template_dir.cleanup)
+        override = self.settings(EXCEL_TEMPLATE_DIR=template_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        excel_templates.clear_cache()
+        self.addCleanup(excel_templates.clear_cache)
+        self.template_dir = template_dir.name
+
+    def test_build_excel_templates_writes_every_template(self):
+        call_command('build_excel_templates', stdout=StringIO())
+
+        self.assertEqual(sorted(os.listdir(self.template_dir)),
+                         sorted(filename for filename, _ in excel_templates.TEMPLATES.values()))
+        path = excel_templates.template_path('complete_quote')
+        built = openpyxl.load_workbook(path, read_only=True)
+        self.assertIn('Raw Materials', built.sheetnames)
+        built.close()
+        # Processes serve the built file rather than generating their own
+        self.assertEqual(excel_templates.get_template('complete_quote').content, path.read_bytes())
+
+    def test_matching_etag_gets_not_modified(self):
+        self.client.force_login(User.objects.create_user('templates'))
+        url = reverse('download_complete_quote_template')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+class CloningTests(TestCase):
+    """Quote and project copies"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=3, rows=2)
+        cls.quote = cls.data.quote
+
+    def row_counts(self, quote):
+        return {
+            model.__name__: model.objects.filter(**{quote_path: quote}).count()
+            for model, quote_path, _ in TOTAL_SOURCES
+        }
+
+    def assertCopied(self, source, clone):
+        self.assertNotEqual(clone.pk, source.pk)
+        self.assertEqual(self.row_counts(clone), self.row_counts(source))
+        self.assertGreater(AssemblyRawMaterial.objects.filter(assembly__quote=clone).count(), 0)
+
+        transports = Transport.objects.filter(quote=clone).select_related('packaging')
+        self.assertTrue(transports)
+        for transport in transports:
+            self.assertEqual(transport.packaging.quote_id, clone.pk)
+
+        clone = Quote.objects.with_cost_graph().get(pk=clone.pk)
+        expected = stored_totals(price_quote(clone))
+        self.assertEqual({field: getattr(clone, field) for field in expected}, expected)
+        self.assertEqual(clone.grand_total, Quote.objects.get(pk=source.pk).grand_total)
+
+    def test_clone_quote_copies_every_row(self):
+        clone = clone_quote(self.quote, self.data.user)
+        self.assertEqual(clone.name, f'{self.quote.name} (Copy)')
+        self.assertEqual(clone.get_version(), '1.0')
+        self.assertCopied(self.quote, clone)
+        self.assertTrue(QuoteTimeline.objects.filter(quote=clone, activity_type='quote_created').exists())
+
+    def test_clone_project_copies_every_quote_in_order(self):
+        sources = list(self.data.project.quotes.order_by('created_at', 'pk'))
+        clone = clone_project(self.data.project, self.data.user)
+        # Newest first, as the project page lists them
+        clones = list(clone.quotes.all())[::-1]
+        self.assertEqual([quote.name for quote in clones], [quote.name for quote in sources])
+        self.assertEqual(len({quote.created_at for quote in clones}), len(clones))
+        for source, copy in zip(sources, clones):
+            self.assertCopied(source, copy)
+
+    def test_clone_views_only_copy_on_post(self):
+        self.client.force_login(self.data.user)
+        quote_url = reverse('quote_clone', kwargs={'project_id': self.data.project.pk, 'quote_id': self.quote.pk})
+        project_url = reverse('project_clone', kwargs={'project_id': self.data.project.pk})
+
+        self.client.get(quote_url)
+        self.client.get(project_url)
+        self.assertEqual(Quote.objects.count(), 3)
+        self.assertEqual(Project.objects.count(), 1)
+
+        self.client.post(quote_url)
+        self.assertEqual(Quote.objects.count(), 4)
+        self.client.post(project_url)
+        self.assertEqual(Project.objects.count(), 2)
+
+
+class CostingParityTests(TestCase):
+    """The costing engine agrees with the model cost properties, which stay current as rows change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=3, projects=1, quotes_per_project=2, rows=3)
+
+    def test_price_quote_matches_the_model_properties(self):
+        for quote in Quote.objects.with_cost_graph():
+            with self.subTest(quote=quote.name):
+                breakdown = price_quote(quote)
+                self.assertEqual([line.cost for line in breakdown.raw_materials],
+                                 [rm.rm_cost for rm in quote.raw_materials.all()])
+                self.assertEqual([line.cost for line in breakdown.moulding_machines],
+                                 [mm.conversion_cost for mm in quote.moulding_machines.all()])
+                self.assertEqual([line.cost for line in breakdown.assemblies],
+                                 [assembly.total_assembly_cost for assembly in quote.assemblies.all()])
+                self.assertEqual(breakdown.raw_materials.subtotal, quote.get_total_raw_material_cost())
+                self.assertEqual(breakdown.moulding_machines.subtotal, quote.get_total_conversion_cost())
+                self.assertEqual(breakdown.assemblies.subtotal, quote.get_total_assembly_cost())
+                self.assertEqual(breakdown.packagings.subtotal, quote.get_total_packaging_cost())
+                self.assertEqual(breakdown.transports.subtotal, quote.get_total_transport_cost())
+
+                base_cost = (quote.get_total_raw_material_cost() + quote.get_total_conversion_cost()
+                             + quote.get_total_assembly_cost() + quote.get_total_packaging_cost()
+                             + quote.get_total_transport_cost())
+                profit = profit_amount(quote, base_cost)
+                self.assertEqual(breakdown.base_cost, base_cost)
+                self.assertEqual(breakdown.profit_amount, profit)
+                self.assertEqual(breakdown.grand_total, base_cost + profit + quote.handling_charge)
+                self.assertEqual(quote.get_grand_total(), breakdown.grand_total)
+
+    def test_assigning_a_field_drops_the_memoized_cost(self):
+        for model, field in ((RawMaterial, 'part_weight'), (MouldingMachineDetail, 'cycle_time')):
+            with self.subTest(model=model.__name__):
+                row = model.objects.filter(quote=self.data.quote).order_by('pk').first()
+                cost_name = 'rm_cost' if model is RawMaterial else 'conversion_cost'
+                before = getattr(row, cost_name)
+                setattr(row, field, getattr(row, field) * 2)
+                after = getattr(row, cost_name)
+                self.assertNotEqual(after, before)
+                row.save()
+                self.assertEqual(after, getattr(model.objects.get(pk=row.pk), cost_name))
+
+    def test_save_drops_the_memoized_cost(self):
+        row = RawMaterial.objects.filter(quote=self.data.quote).order_by('pk').first()
+        before = row.rm_cost
+        # Bypasses __setattr__, as loading values from the database does
+        row.__dict__['part_weight'] = row.part_weight * 2
+        self.assertEqual(row.rm_cost, before)
+        row.save()
+        self.assertEqual(row.rm_cost, RawMaterial.objects.get(pk=row.pk).rm_cost)
+        self.assertNotEqual(row.rm_cost, before)
+
+    def assertAssemblyCurrent(self, assembly):
+        fresh = Assembly.objects.prefetch_related(
+            'assembly_raw_materials', 'manufacturing_printing_costs').get(pk=assembly.pk)
+        self.assertEqual(assembly.total_assembly_cost, fresh.total_assembly_cost)
+
+    def test_child_row_changes_update_the_loaded_assembly(self):
+        assembly = Assembly.objects.prefetch_related(
+            'assembly_raw_materials', 'manufacturing_printing_costs').filter(quote=self.data.quote).first()
+        totals = [assembly.total_assembly_cost]
+
+        row = assembly.assembly_raw_materials.all()[0]
+        row.cost_per_unit += 1
+        row.save()
+        totals.append(assembly.total_assembly_cost)
+        self.assertAssemblyCurrent(assembly)
+
+        AssemblyRawMaterial.objects.create(assembly=assembly, description='Extra', unit='nos',
+                                           production_quantity=2, cost_per_unit=Decimal('1.5'))
+        totals.append(assembly.total_assembly_cost)
+        self.assertAssemblyCurrent(assembly)
+
+        assembly.manufacturing_printing_costs.all()[0].delete()
+        totals.append(assembly.total_assembly_cost)
+        self.assertAssemblyCurrent(assembly)
+        self.assertEqual(len(set(totals)), 4)
+
+
+def statements(queries, prefix):
+    """Captured SQL statements starting with ``prefix``, e.g. 'UPDATE "core_rawmaterial"'"""
+    return [query['sql'] for query in queries.captured_queries if query['sql'].startswith(prefix)]
+
+
+# Config type model -> foreign key on its dependent quote rows
+TYPE_FIELDS = {MaterialType: 'material_type', MouldingMachineType: 'moulding_machine_type'}
+
+
+class TypePropagationTests(TestCase):
+    """Config type changes copied onto the quote rows that use the type"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=2, projects=1, quotes_per_project=2, rows=3)
+
+    def type_with_dependents(self, model, row_model):
+        row = row_model.objects.filter(quote__project=self.data.project).order_by('pk').first()
+        return model.objects.get(pk=getattr(row, TYPE_FIELDS[model] + '_id'))
+
+    def dependents(self, instance):
+        row_model = RawMaterial if isinstance(instance, MaterialType) else MouldingMachineDetail
+        return row_model.objects.filter(**{TYPE_FIELDS[type(instance)]: instance})
+
+    def assertSectionCurrent(self, quote_ids, field):
+        for quote in Quote.objects.with_cost_graph().filter(pk__in=quote_ids):
+            self.assertEqual(getattr(quote, field), stored_totals(price_quote(quote))[field])
+
+    def test_save_without_synced_changes_writes_no_dependents(self):
+        material_type = self.type_with_dependents(MaterialType, RawMaterial)
+        material_type.remarks = 'Not synced'
+        with CaptureQueriesContext(connection) as queries:
+            material_type.save()
+        self.assertEqual(statements(queries, 'UPDATE "core_rawmaterial"'), [])
+        self.assertEqual(statements(queries, 'INSERT INTO "core_quotetimeline"'), [])
+
+    def test_rate_change_updates_dependents_in_bulk_and_reprices(self):
+        cases = (
+            (MaterialType, RawMaterial, 'raw_material_rate', 'rm_rate', 'total_raw_material_cost'),
+            (MouldingMachineType, MouldingMachineDetail, 'shift_rate', 'shift_rate', 'total_conversion_cost'),
+        )
+        for type_model, row_model, type_field, row_field, total_field in cases:
+            with self.subTest(type_model=type_model.__name__):
+                instance = self.type_with_dependents(type_model, row_model)
+                rows = self.dependents(instance)
+                quote_ids = set(rows.values_list('quote_id', flat=True))
+                before = dict(Quote.objects.filter(pk__in=quote_ids).values_list('pk', total_field))
+                stamped = max(rows.values_list('updated_at', flat=True))
+                table = row_model._meta.db_table
+
+                setattr(instance, type_field, getattr(instance, type_field) + 10)
+                with CaptureQueriesContext(connection) as queries:
+                    instance.save()
+
+                self.assertEqual(len(statements(queries, f'UPDATE "{table}"')), 1)
+                self.assertEqual(len(statements(queries, 'INSERT INTO "core_quotetimeline"')), 1)
+                self.assertEqual(set(rows.values_list(row_field, flat=True)), {getattr(instance, type_field)})
+                self.assertGreater(min(rows.values_list('updated_at', flat=True)), stamped)
+                after = dict(Quote.objects.filter(pk__in=quote_ids).values_list('pk', total_field))
+                self.assertTrue(all(after[pk] != before[pk] for pk in quote_ids))
+                self.assertSectionCurrent(quote_ids, total_field)
+
+    def test_batch_writes_each_dependent_once_with_the_last_values(self):
+        material_type = self.type_with_dependents(MaterialType, RawMaterial)
+        rows = self.dependents(material_type)
+        count = rows.count()
+        with CaptureQueriesContext(connection) as queries:
+            with propagation_batch():
+                for rate in (Decimal('150'), Decimal('175'), Decimal('200')):
+                    material_type.raw_material_rate = rate
+                    if rate == Decimal('175'):
+                        material_type.raw_material_grade = 'G-renamed'
+                    material_type.save()
+
+        self.assertEqual(len(statements(queries, 'UPDATE "core_rawmaterial"')), 1)
+        self.assertEqual(len(statements(queries, 'INSERT INTO "core_quotetimeline"')), 1)
+        self.assertEqual(set(rows.values_list('rm_rate', 'grade')), {(Decimal('200'), 'G-renamed')})
+        self.assertEqual(
+            QuoteTimeline.objects.filter(activity_type='raw_material_auto_updated').count(), count)
+        self.assertSectionCurrent(set(rows.values_list('quote_id', flat=True)), 'total_raw_material_cost')
+
+
+
+def upload(wb, name='upload.xlsx'):
+    """``wb`` saved as an uploaded file"""
+    output = io.BytesIO()
+    wb.save(output)
+    return SimpleUploadedFile(name, output.getvalue())
+
+
+class MultipleQuotesImportTests(TestCase):
+    """Multiple quote uploads, built from the downloadable template's sample quotes"""
+
+    SAMPLE_QUOTES = ['Auto Dashboard 2024', 'Electronics Housing Pro', 'Medical Device Shell']
+    COMPONENT_SHEETS = ['Raw Materials', 'Moulding Machines', 'Assemblies', 'Packaging', 'Transport']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=2, projects=1, quotes_per_project=1, rows=1)
+
+    def parse(self, wb, **kwargs):
+        return ExcelParser.parse_multiple_quotes_complete(
+            upload(wb), self.data.project, self.data.customer_group, self.data.user, **kwargs)
+
+    def test_duplicate_quote_column_is_reported_and_skipped(self):
+        wb = ExcelTemplateGenerator.create_multiple_quotes_template()
+        wb['Quote Definition'].cell(1, 3).value = 'Auto Dashboard 2024'
+        results = self.parse(wb, preview=True)
+
+        self.assertEqual([summary['quote'] for summary in results['preview']],
+                         ['Auto Dashboard 2024', 'Medical Device Shell'])
+        self.assertIn('Quote Column C: duplicate quote name "Auto Dashboard 2024" '
+                      '(already defined in column B), skipped', results['errors'])
+        # The second quote's component columns no longer have a definition
+        self.assertIn('Packaging Column C: quote "Electronics Housing Pro" is not in Quote Definition, skipped',
+                      results['errors'])
+
+    def test_component_column_for_an_unknown_quote_is_reported(self):
+        wb = ExcelTemplateGenerator.create_multiple_quotes_template()
+        wb['Packaging'].cell(1, 4).value = 'Unknown Quote'
+        results = self.parse(wb, preview=True)
+
+        self.assertEqual(results['errors'],
+                         ['Packaging Column D: quote "Unknown Quote" is not in Quote Definition, skipped'])
+        self.assertEqual(results['quotes'], 3)
+
+    def test_orphans_are_reported_without_any_valid_quote(self):
+        wb = ExcelTemplateGenerator.create_multiple_quotes_template()
+        wb['Quote Definition'].cell(1, 2).value = None
+        results = self.parse(wb, preview=True)
+
+        self.assertEqual(results['quotes'], 0)
+        reported = {error.split(' Column ')[0] for error in results['errors']}
+        self.assertEqual(reported, set(self.COMPONENT_SHEETS))
+
+    def test_counts_cover_only_the_current_upload(self):
+        wb = ExcelTemplateGenerator.create_multiple_quotes_template()
+        # Earlier uploads by the same user into the same project
+        self.parse(wb)
+        self.parse(wb)
+
+        results = self.parse(wb)
+
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(results['quotes'], 3)
+        self.assertEqual(results['components'], {
+            'raw_materials': 4, 'moulding_machines': 4, 'assemblies': 3, 'packaging': 3, 'transport': 3,
+        })
+        created = Quote.objects.filter(pk__in=results['quote_ids'])
+        self.assertEqual(RawMaterial.objects.filter(quote__in=created).count(), 4)
+
+
+class ConfigTypeUpsertTests(TestCase):
+    """Config type uploads insert new names, update known ones and keep the last of a repeated name"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=1, projects=1, quotes_per_project=1, rows=1)
+        cls.existing = MaterialType.objects.create(
+            customer_group=cls.data.customer_group, raw_material_name='ABS High Impact',
+            raw_material_grade='OLD', raw_material_rate=Decimal('100'))
+
+    def rates(self):
+        return dict(MaterialType.objects.filter(customer_group=self.data.customer_group).values_list(
+            'raw_material_name', 'raw_material_rate'))
+
+    def test_sheet_mixing_new_existing_and_repeated_names(self):
+        wb = ConfigTemplateGenerator.create_material_types_template()
+        ws = wb['Material Types']
+        # Column E repeats column B's name with a new rate
+        for row_num, value in enumerate(['PP Copolymer Standard', 'H340R', 'PP-STD-001', 130, ''], 1):
+            ws.cell(row=row_num, column=5, value=value)
+        before = MaterialType.objects.count()
+
+        count, errors = ConfigParser.parse_material_types(upload(wb), self.data.customer_group)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(count, 4)
+        self.assertEqual(MaterialType.objects.count(), before + 2)
+        rates = self.rates()
+        self.assertEqual(rates['PP Copolymer Standard'], Decimal('130'))
+        self.assertEqual(rates['ABS High Impact'], Decimal('185.75'))
+        self.assertEqual(rates['PC Lexan Clear'], Decimal('295.5'))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.raw_material_grade, 'ABS-750')
+
+    def test_save_splits_inserts_from_updates(self):
+        upsert = ConfigTypeUpsert(MaterialType, 'raw_material_name', self.data.customer_group)
+        upsert.add('ABS High Impact', {'raw_material_rate': 150})
+        upsert.add('New Grade', {'raw_material_rate': 10})
+        upsert.add('New Grade', {'raw_material_rate': 20})
+
+        self.assertEqual(upsert.save(), (1, 1))
+        rates = self.rates()
+        self.assertEqual(rates['ABS High Impact'], Decimal('150'))
+        self.assertEqual(rates['New Grade'], Decimal('20'))
+
+
+def component_counts():
+    """Quote and component row counts across all quotes"""
+    return [model.objects.count() for model in (Quote, RawMaterial, MouldingMachineDetail, Assembly, Packaging, Transport)]
+
+
+class ImportPreviewTests(TestCase):
+    """A preview upload writes nothing and reports the totals and row errors a real upload would give"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(customer_groups=1, config_types=2, projects=1, quotes_per_project=1, rows=1)
+
+    def test_complete_quote_preview(self):
+        wb = ExcelTemplateGenerator.create_complete_template()
+        wb['Transport'].cell(5, 3).value = 'many'
+        before = component_counts()
+
+        quote, errors, results = ExcelParser.parse_complete_quote(upload(wb), self.data.quote, preview=True)
+        self.assertEqual(component_counts(), before)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Transport Column C:'))
+
+        _, saved_errors, _ = ExcelParser.parse_complete_quote(upload(wb), self.data.quote)
+        quote.refresh_from_db()
+        self.assertEqual(saved_errors, errors)
+        # Stored totals are rounded to the field's 8 decimal places
+        self.assertAlmostEqual(results['preview']['grand_total'], quote.grand_total, places=7)
+
+    def test_multiple_quotes_preview(self):
+        wb = ExcelTemplateGenerator.create_multiple_quotes_template()
+        wb['Transport'].cell(6, 3).value = 'many'
+        before = component_counts()
+
+        results = ExcelParser.parse_multiple_quotes_complete(
+            upload(wb), self.data.project, self.data.customer_group, self.data.user, preview=True)
+        self.assertEqual(component_counts(), before)
+        self.assertEqual(results['quote_ids'], [])
+        errors = {summary['quote']: summary['errors'] for summary in results['preview']}
+        self.assertEqual(errors['Auto Dashboard 2024'], [])
+        self.assertEqual(len(errors['Electronics Housing Pro']), 1)
+        self.assertTrue(errors['Electronics Housing Pro'][0].startswith('Transport - Electronics Housing Pro Column C:'))
+
+        saved = ExcelParser.parse_multiple_quotes_complete(
+            upload(wb), self.data.project, self.data.customer_group, self.data.user)
+        totals = dict(Quote.objects.filter(pk__in=saved['quote_ids']).values_list('name', 'grand_total'))
+        for summary in results['preview']:
+            self.assertAlmostEqual(summary['grand_total'], totals[summary['quote']], places=7)
 
-# Create your tests here.
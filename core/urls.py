@@ -64,6 +64,8 @@ urlpatterns = [
     path('projects/<int:project_id>/quotes/<int:quote_id>/mark-completed/', views.quote_mark_completed, name='quote_mark_completed'),
     path('projects/<int:project_id>/quotes/<int:quote_id>/reopen/', views.quote_reopen, name='quote_reopen'),
     path('projects/<int:project_id>/quotes/<int:quote_id>/discard/', views.quote_discard, name='quote_discard'),
+    path('projects/<int:project_id>/quotes/<int:quote_id>/clone/', views.quote_clone, name='quote_clone'),
+    path('projects/<int:project_id>/clone/', views.project_clone, name='project_clone'),
     # Material Types
     path('config/customer-groups/<int:customer_group_id>/material-types/create/', views.material_type_create, name='material_type_create'),
     path('config/material-types/<int:material_type_id>/delete/', views.material_type_delete, name='material_type_delete'),
@@ -136,6 +138,15 @@ urlpatterns = [
          views.upload_packaging_types,
          name='upload_packaging_types'),
 
+    # Background Excel imports
+    path('imports/<int:job_id>/',
+         views.import_job_detail,
+         name='import_job_detail'),
+
+    path('imports/<int:job_id>/status/',
+         views.import_job_status,
+         name='import_job_status'),
+
     # Configuration Type Template Downloads
     path('templates/material-types/',
          views.download_material_types_template,
@@ -5,12 +5,19 @@ from .models import (
     Project, Quote, CustomerGroup, MaterialGroup,
     AssemblyType, PackagingType, RawMaterial, MouldingMachineDetail,
     Assembly, AssemblyRawMaterial, ManufacturingPrintingCost, Packaging, Transport,
-    QuoteTimeline, MaterialType, MouldingMachineType
+    QuoteTimeline, MaterialType, MouldingMachineType, ImportJob
 )
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import user_passes_test
-from django.http import HttpResponse
-from .excel_utils import ExcelTemplateGenerator, ExcelParser
+from django.http import HttpResponse, JsonResponse, FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.urls import reverse
+from django.utils.http import http_date, urlencode
+from .excel_utils import ExcelParser
+from .costing import price_quote
+from .imports import enqueue_import
+from .cloning import clone_quote, clone_project
+from . import excel_templates, export_cache
 
 
 def save_cost_field(obj, field_base_name, request):
@@ -46,7 +53,7 @@ def home(request):
 @login_required
 def projects(request):
     """List all projects"""
-    all_projects = Project.objects.filter(is_active=True)
+    all_projects = Project.objects.filter(is_active=True).select_related('created_by').with_stored_totals()
     return render(request, 'core/projects.html', {'projects': all_projects})
 
 
@@ -74,8 +81,8 @@ def project_create(request):
 @login_required
 def project_detail(request, project_id):
     """View individual project with its quotes"""
-    project = get_object_or_404(Project, id=project_id, is_active=True)
-    quotes = project.quotes.all()
+    project = get_object_or_404(Project.objects.with_stored_totals(), id=project_id, is_active=True)
+    quotes = project.quotes.select_related('created_by')
 
     context = {
         'project': project,
@@ -150,28 +157,27 @@ def quote_create(request, project_id):
 def quote_detail(request, project_id, quote_id):
     """View individual quote with all sections"""
     project = get_object_or_404(Project, id=project_id, is_active=True)
-    quote = get_object_or_404(Quote, id=quote_id, project=project)
-    raw_materials = quote.raw_materials.all()
-    moulding_machines = quote.moulding_machines.all()
-    assemblies = quote.assemblies.all()
-    packagings = quote.packagings.all()
-    transports = quote.transports.all()
+    quote = get_object_or_404(Quote.objects.with_cost_graph().with_timeline(), id=quote_id, project=project)
     timeline_entries = quote.timeline_entries.all()
 
+    # Price the quote once; the templates iterate the same row instances
+    breakdown = price_quote(quote)
+
     context = {
         'project': project,
         'quote': quote,
-        'raw_materials': raw_materials,
-        'moulding_machines': moulding_machines,
-        'assemblies': assemblies,
-        'packagings': packagings,
-        'transports': transports,
+        'breakdown': breakdown,
+        'raw_materials': breakdown.raw_materials.objects,
+        'moulding_machines': breakdown.moulding_machines.objects,
+        'assemblies': breakdown.assemblies.objects,
+        'packagings': breakdown.packagings.objects,
+        'transports': breakdown.transports.objects,
         'timeline_entries': timeline_entries,
-        'total_rm_cost': quote.get_total_raw_material_cost(),
-        'total_conversion_cost': quote.get_total_conversion_cost(),
-        'total_assembly_cost': quote.get_total_assembly_cost(),
-        'total_packaging_cost': quote.get_total_packaging_cost(),
-        'total_transport_cost': quote.get_total_transport_cost(),
+        'total_rm_cost': breakdown.raw_materials.subtotal,
+        'total_conversion_cost': breakdown.moulding_machines.subtotal,
+        'total_assembly_cost': breakdown.assemblies.subtotal,
+        'total_packaging_cost': breakdown.packagings.subtotal,
+        'total_transport_cost': breakdown.transports.subtotal,
     }
     return render(request, 'core/quote_detail.html', context)
 
@@ -577,7 +583,10 @@ def assembly_detail(request, project_id, quote_id, assembly_id):
     """View assembly detail with raw materials and manufacturing costs"""
     project = get_object_or_404(Project, id=project_id, is_active=True)
     quote = get_object_or_404(Quote, id=quote_id, project=project)
-    assembly = get_object_or_404(Assembly, id=assembly_id, quote=quote)
+    assembly = get_object_or_404(
+        Assembly.objects.prefetch_related('assembly_raw_materials', 'manufacturing_printing_costs'),
+        id=assembly_id, quote=quote
+    )
 
     context = {
         'project': project,
@@ -601,11 +610,11 @@ def assembly_delete(request, project_id, quote_id, assembly_id):
         messages.error(request, 'This quote is completed or discarded and cannot be edited. Reopen it to make changes.')
         return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
 
-    assembly_type = assembly.get_assembly_type_display()
+    assembly_name = assembly.name
     assembly.delete()
 
     # Increment version and add timeline entry
-    quote.increment_version(request.user, f'{assembly_type} assembly deleted', 'assembly_deleted')
+    quote.increment_version(request.user, f'Assembly "{assembly_name}" deleted', 'assembly_deleted')
 
     messages.success(request, 'Assembly deleted successfully!')
     return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
@@ -880,7 +889,7 @@ def transport_add(request, project_id, quote_id):
     """Add transport to quote"""
     project = get_object_or_404(Project, id=project_id, is_active=True)
     quote = get_object_or_404(Quote, id=quote_id, project=project)
-    packagings = quote.packagings.all()
+    packagings = quote.packagings.select_related('packaging_type')
 
     # Check if quote can be edited
     if not quote.can_edit_sections():
@@ -1032,9 +1041,12 @@ def config(request):
     packaging_types = []
 
     if selected_customer_group:
-        material_types = MaterialType.objects.filter(customer_group=selected_customer_group, is_active=True)
-        moulding_machine_types = MouldingMachineType.objects.filter(customer_group=selected_customer_group, is_active=True)
-        assembly_types = AssemblyType.objects.filter(customer_group=selected_customer_group, is_active=True)
+        material_types = MaterialType.objects.filter(
+            customer_group=selected_customer_group, is_active=True).select_related('created_by')
+        moulding_machine_types = MouldingMachineType.objects.filter(
+            customer_group=selected_customer_group, is_active=True).select_related('created_by')
+        assembly_types = AssemblyType.objects.filter(
+            customer_group=selected_customer_group, is_active=True).select_related('created_by')
         packaging_types = PackagingType.objects.filter(customer_group=selected_customer_group, is_active=True)
 
     context = {
@@ -1162,48 +1174,33 @@ def config_delete(request, config_type, item_id):
 def quote_summary(request, project_id, quote_id):
     """View quote summary with all costs"""
     project = get_object_or_404(Project, id=project_id, is_active=True)
-    quote = get_object_or_404(Quote, id=quote_id, project=project)
+    quote = get_object_or_404(Quote.objects.with_cost_graph(), id=quote_id, project=project)
 
-    # Get all data
-    raw_materials = quote.raw_materials.all()
-    moulding_machines = quote.moulding_machines.all()
-    assemblies = quote.assemblies.all()
-    packagings = quote.packagings.all()
-    transports = quote.transports.all()
-
-    # Calculate costs
-    total_rm_cost = quote.get_total_raw_material_cost()
-    total_conversion_cost = quote.get_total_conversion_cost()
-    total_assembly_cost = quote.get_total_assembly_cost()
-    total_packaging_cost = quote.get_total_packaging_cost()
-    total_transport_cost = quote.get_total_transport_cost()
-
-    # Calculate totals including profit and handling charge
-    base_cost = quote.get_base_cost()
-    profit_amount = quote.get_profit_amount()
-    grand_total = quote.get_grand_total()
+    # Price the quote once for all totals on the page
+    breakdown = price_quote(quote)
 
     context = {
         'project': project,
         'quote': quote,
-        'raw_materials': raw_materials,
-        'moulding_machines': moulding_machines,
-        'assemblies': assemblies,
-        'packagings': packagings,
-        'transports': transports,
-        'total_rm_cost': total_rm_cost,
-        'total_conversion_cost': total_conversion_cost,
-        'total_assembly_cost': total_assembly_cost,
-        'total_packaging_cost': total_packaging_cost,
-        'total_transport_cost': total_transport_cost,
-        'base_cost': base_cost,
-        'profit_amount': profit_amount,
-        'grand_total': grand_total,
-        'raw_materials_count': raw_materials.count(),
-        'moulding_machines_count': moulding_machines.count(),
-        'assemblies_count': assemblies.count(),
-        'packagings_count': packagings.count(),
-        'transports_count': transports.count(),
+        'breakdown': breakdown,
+        'raw_materials': breakdown.raw_materials.objects,
+        'moulding_machines': breakdown.moulding_machines.objects,
+        'assemblies': breakdown.assemblies.objects,
+        'packagings': breakdown.packagings.objects,
+        'transports': breakdown.transports.objects,
+        'total_rm_cost': breakdown.raw_materials.subtotal,
+        'total_conversion_cost': breakdown.moulding_machines.subtotal,
+        'total_assembly_cost': breakdown.assemblies.subtotal,
+        'total_packaging_cost': breakdown.packagings.subtotal,
+        'total_transport_cost': breakdown.transports.subtotal,
+        'base_cost': breakdown.base_cost,
+        'profit_amount': breakdown.profit_amount,
+        'grand_total': breakdown.grand_total,
+        'raw_materials_count': len(breakdown.raw_materials),
+        'moulding_machines_count': len(breakdown.moulding_machines),
+        'assemblies_count': len(breakdown.assemblies),
+        'packagings_count': len(breakdown.packagings),
+        'transports_count': len(breakdown.transports),
     }
     return render(request, 'core/quote_summary.html', context)
 
@@ -1373,6 +1370,33 @@ def quote_discard(request, project_id, quote_id):
     return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
 
 
+@login_required
+def quote_clone(request, project_id, quote_id):
+    """Copy a quote with all of its components into the same project"""
+    project = get_object_or_404(Project, id=project_id, is_active=True)
+    quote = get_object_or_404(Quote, id=quote_id, project=project)
+
+    if request.method != 'POST':
+        return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
+
+    clone = clone_quote(quote, request.user, project=project)
+    messages.success(request, f'Quote "{quote.name}" cloned as "{clone.name}".')
+    return redirect('quote_detail', project_id=project.id, quote_id=clone.id)
+
+
+@login_required
+def project_clone(request, project_id):
+    """Copy a project with all of its quotes"""
+    project = get_object_or_404(Project, id=project_id, is_active=True)
+
+    if request.method != 'POST':
+        return redirect('project_detail', project_id=project.id)
+
+    clone = clone_project(project, request.user)
+    messages.success(request, f'Project "{project.name}" cloned as "{clone.name}".')
+    return redirect('project_detail', project_id=clone.id)
+
+
 @login_required
 def material_type_create(request, customer_group_id):
     """Create a material type for a customer group"""
@@ -1514,43 +1538,44 @@ def customer_group_delete(request, customer_group_id):
 
 
 # Template download views
-@login_required
-def download_raw_materials_template(request):
-    """Download raw materials template"""
-    wb = ExcelTemplateGenerator.create_raw_materials_template()
+def _excel_template_response(request, name):
+    """Serve a static upload template from memory, honouring If-None-Match/If-Modified-Since"""
+    template = excel_templates.get_template(name)
 
     response = HttpResponse(
+        template.content,
         content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
-    response['Content-Disposition'] = 'attachment; filename=raw_materials_template.xlsx'
-    wb.save(response)
-    return response
+    response['Content-Disposition'] = f'attachment; filename={template.filename}'
+    response['ETag'] = template.etag
+    response['Last-Modified'] = http_date(template.last_modified.timestamp())
+    # Downloads are per-user, but can be revalidated cheaply with the ETag
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return get_conditional_response(
+        request,
+        etag=template.etag,
+        last_modified=int(template.last_modified.timestamp()),
+        response=response,
+    )
+
+
+@login_required
+def download_raw_materials_template(request):
+    """Download raw materials template"""
+    return _excel_template_response(request, 'raw_materials')
 
 
 @login_required
 def download_moulding_machines_template(request):
     """Download moulding machines template"""
-    wb = ExcelTemplateGenerator.create_moulding_machines_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=moulding_machines_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'moulding_machines')
 
 
 @login_required
 def download_complete_quote_template(request):
     """Download complete quote template with all sheets"""
-    wb = ExcelTemplateGenerator.create_complete_quote_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=complete_quote_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'complete_quote')
 
 
 # Upload views
@@ -1629,19 +1654,14 @@ def upload_complete_quote(request, project_id, quote_id):
         return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
 
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        try:
-            excel_file = request.FILES['excel_file']
-            added_quote, errors, results = ExcelParser.parse_complete_quote(excel_file, quote, project.created_by)
-
-            # Show results for each section
-            for section, data in results.items():
-                if data > 0:
-                    messages.success(request, f"{section}: {data} items uploaded")
-
-            quote.increment_version(request.user, 'Complete quote uploaded from Excel', 'quote_updated')
-            return redirect('quote_detail', project_id=project.id, quote_id=quote.id)
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+        dry_run = bool(request.POST.get('dry_run'))
+        job = enqueue_import('complete_quote', request.FILES['excel_file'], request.user,
+                             project=project, quote=quote, customer_group=quote.client_group, dry_run=dry_run)
+        if dry_run:
+            messages.info(request, 'File uploaded. The quote is being priced in the background; nothing will be saved.')
+        else:
+            messages.info(request, 'File uploaded. The quote is being imported in the background.')
+        return redirect('import_job_detail', job_id=job.id)
 
     context = {
         'project': project,
@@ -1932,14 +1952,7 @@ def packaging_edit(request, project_id, quote_id, packaging_id):
 @login_required
 def download_multiple_quotes_template(request):
     """Download template for creating multiple quotes"""
-    wb = ExcelTemplateGenerator.create_multiple_quotes_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=multiple_quotes_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'multiple_quotes')
 
 
 @login_required
@@ -1954,40 +1967,15 @@ def upload_multiple_quotes(request, project_id):
         if not customer_group_id:
             messages.error(request, 'Please select a customer group.')
         else:
-            try:
-                customer_group = get_object_or_404(CustomerGroup, id=customer_group_id)
-                excel_file = request.FILES['excel_file']
-
-                results = ExcelParser.parse_multiple_quotes_complete(
-                    excel_file, project, customer_group, request.user
-                )
-
-                if results['errors']:
-                    for error in results['errors']:
-                        messages.error(request, error)
-
-                if results['quotes'] > 0:
-                    messages.success(request, f'Successfully created {results["quotes"]} quotes!')
-
-                    # Show component counts
-                    components = results['components']
-                    if components['raw_materials'] > 0:
-                        messages.info(request, f'Added {components["raw_materials"]} raw materials')
-                    if components['moulding_machines'] > 0:
-                        messages.info(request, f'Added {components["moulding_machines"]} moulding machines')
-                    if components['assemblies'] > 0:
-                        messages.info(request, f'Added {components["assemblies"]} assemblies')
-                    if components['packaging'] > 0:
-                        messages.info(request, f'Added {components["packaging"]} packaging entries')
-                    if components['transport'] > 0:
-                        messages.info(request, f'Added {components["transport"]} transport entries')
-
-                    return redirect('project_detail', project_id=project.id)
-                else:
-                    messages.warning(request, 'No quotes were created. Please check your file.')
-
-            except Exception as e:
-                messages.error(request, f'Error processing file: {str(e)}')
+            customer_group = get_object_or_404(CustomerGroup, id=customer_group_id)
+            dry_run = bool(request.POST.get('dry_run'))
+            job = enqueue_import('multiple_quotes', request.FILES['excel_file'], request.user,
+                                 project=project, customer_group=customer_group, dry_run=dry_run)
+            if dry_run:
+                messages.info(request, 'File uploaded. The quotes are being priced in the background; nothing will be saved.')
+            else:
+                messages.info(request, 'File uploaded. The quotes are being imported in the background.')
+            return redirect('import_job_detail', job_id=job.id)
 
     context = {
         'project': project,
@@ -2002,7 +1990,7 @@ def transport_edit(request, project_id, quote_id, transport_id):
     project = get_object_or_404(Project, id=project_id, is_active=True)
     quote = get_object_or_404(Quote, id=quote_id, project=project)
     transport = get_object_or_404(Transport, id=transport_id, quote=quote)
-    packagings = quote.packagings.all()
+    packagings = quote.packagings.select_related('packaging_type')
 
     # Check if quote can be edited
     if not quote.can_edit_sections():
@@ -2109,12 +2097,9 @@ def packaging_type_delete(request, packaging_type_id):
         packaging_type.save()
 
         messages.success(request, f'Packaging type "{packaging_type.name}" deactivated successfully!')
-        return redirect('config')
 
-    context = {
-        'packaging_type': packaging_type,
-    }
-    return render(request, 'core/packaging_type_delete.html', context)
+    # There is no confirmation page; the config page deletes through config_delete
+    return redirect(f"{reverse('config')}?{urlencode({'customer_group': packaging_type.customer_group_id})}")
 
 
 @login_required
@@ -2125,21 +2110,22 @@ def export_quote(request, project_id, quote_id):
     project = get_object_or_404(Project, id=project_id, is_active=True)
     quote = get_object_or_404(Quote, id=quote_id, project=project)
 
-    # Generate Excel file
-    wb = ExcelExporter.export_quote(quote)
+    # Reuse the workbook exported for this version, building it on first download
+    def build(output):
+        priced = Quote.objects.with_cost_graph().get(pk=quote.pk)
+        ExcelExporter.export_quote(priced).save(output)
 
-    # Create response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    output = export_cache.open_export(export_cache.quote_key(quote), build)
 
     # Get version string for filename
     version_str = f"{quote.version_major}.{quote.version_minor}" if hasattr(quote, 'version_major') else ''
     filename = f'Quote_{quote.name}_{version_str}.xlsx'.replace(' ', '_')
-    response['Content-Disposition'] = f'attachment; filename={filename}'
-
-    wb.save(response)
-    return response
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
 
 @login_required
 def export_project(request, project_id):
@@ -2148,27 +2134,24 @@ def export_project(request, project_id):
 
     project = get_object_or_404(Project, id=project_id, is_active=True)
 
-    # Generate Excel file
-    wb = ExcelExporter.export_project(project)
-
-    # Create response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # Reuse the workbook while no quote in the project has changed version
+    output = export_cache.open_export(
+        export_cache.project_key(project),
+        lambda output: ExcelExporter.export_project(project, output),
     )
-    filename = f'Project_{project.name}.xlsx'.replace(' ', '_')
-    response['Content-Disposition'] = f'attachment; filename={filename}'
 
-    wb.save(response)
-    return response
+    filename = f'Project_{project.name}.xlsx'.replace(' ', '_')
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
 
 # =============================================================================
 # Configuration Type Excel Upload Views - Added for Config Type Uploads
 # =============================================================================
 
-import tempfile
-import os
-from .excel_utils import ConfigTemplateGenerator, ConfigParser
-
 
 @login_required
 def upload_material_types(request, customer_group_id):
@@ -2176,32 +2159,10 @@ def upload_material_types(request, customer_group_id):
     customer_group = get_object_or_404(CustomerGroup, id=customer_group_id, is_active=True)
 
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        try:
-            excel_file = request.FILES['excel_file']
-
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                for chunk in excel_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-
-            count, errors = ConfigParser.parse_material_types(tmp_file_path, customer_group)
-
-            # Clean up temp file
-            os.unlink(tmp_file_path)
-
-            if errors:
-                for error in errors:
-                    messages.error(request, error)
-
-            if count > 0:
-                messages.success(request, f'Successfully uploaded {count} material type(s)!')
-                return redirect('config')
-            else:
-                messages.warning(request, 'No material types were uploaded. Please check your file.')
-
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+        job = enqueue_import('material_types', request.FILES['excel_file'], request.user,
+                             customer_group=customer_group)
+        messages.info(request, 'File uploaded. The material types are being imported in the background.')
+        return redirect('import_job_detail', job_id=job.id)
 
     context = {
         'customer_group': customer_group,
@@ -2215,30 +2176,10 @@ def upload_machine_types(request, customer_group_id):
     customer_group = get_object_or_404(CustomerGroup, id=customer_group_id, is_active=True)
 
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        try:
-            excel_file = request.FILES['excel_file']
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                for chunk in excel_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-
-            count, errors = ConfigParser.parse_machine_types(tmp_file_path, customer_group)
-
-            os.unlink(tmp_file_path)
-
-            if errors:
-                for error in errors:
-                    messages.error(request, error)
-
-            if count > 0:
-                messages.success(request, f'Successfully uploaded {count} machine type(s)!')
-                return redirect('config')
-            else:
-                messages.warning(request, 'No machine types were uploaded. Please check your file.')
-
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+        job = enqueue_import('machine_types', request.FILES['excel_file'], request.user,
+                             customer_group=customer_group)
+        messages.info(request, 'File uploaded. The machine types are being imported in the background.')
+        return redirect('import_job_detail', job_id=job.id)
 
     context = {
         'customer_group': customer_group,
@@ -2252,30 +2193,10 @@ def upload_assembly_types(request, customer_group_id):
     customer_group = get_object_or_404(CustomerGroup, id=customer_group_id, is_active=True)
 
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        try:
-            excel_file = request.FILES['excel_file']
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                for chunk in excel_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-
-            count, errors = ConfigParser.parse_assembly_types(tmp_file_path, customer_group)
-
-            os.unlink(tmp_file_path)
-
-            if errors:
-                for error in errors:
-                    messages.error(request, error)
-
-            if count > 0:
-                messages.success(request, f'Successfully uploaded {count} assembly type(s)!')
-                return redirect('config')
-            else:
-                messages.warning(request, 'No assembly types were uploaded. Please check your file.')
-
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+        job = enqueue_import('assembly_types', request.FILES['excel_file'], request.user,
+                             customer_group=customer_group)
+        messages.info(request, 'File uploaded. The assembly types are being imported in the background.')
+        return redirect('import_job_detail', job_id=job.id)
 
     context = {
         'customer_group': customer_group,
@@ -2289,35 +2210,43 @@ def upload_packaging_types(request, customer_group_id):
     customer_group = get_object_or_404(CustomerGroup, id=customer_group_id, is_active=True)
 
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        try:
-            excel_file = request.FILES['excel_file']
+        job = enqueue_import('packaging_types', request.FILES['excel_file'], request.user,
+                             customer_group=customer_group)
+        messages.info(request, 'File uploaded. The packaging types are being imported in the background.')
+        return redirect('import_job_detail', job_id=job.id)
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                for chunk in excel_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
+    context = {
+        'customer_group': customer_group,
+    }
+    return render(request, 'core/upload_packaging_types.html', context)
 
-            count, errors = ConfigParser.parse_packaging_types(tmp_file_path, customer_group)
 
-            os.unlink(tmp_file_path)
+# Background import jobs
 
-            if errors:
-                for error in errors:
-                    messages.error(request, error)
+def _get_import_job(request, job_id):
+    """Import job visible to the current user (their own, or any for staff)"""
+    jobs = ImportJob.objects.select_related('project', 'quote', 'customer_group')
+    if not request.user.is_staff:
+        jobs = jobs.filter(created_by=request.user)
+    return get_object_or_404(jobs, id=job_id)
 
-            if count > 0:
-                messages.success(request, f'Successfully uploaded {count} packaging type(s)!')
-                return redirect('config')
-            else:
-                messages.warning(request, 'No packaging types were uploaded. Please check your file.')
 
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
+@login_required
+def import_job_detail(request, job_id):
+    """Progress page for a background Excel import"""
+    job = _get_import_job(request, job_id)
 
     context = {
-        'customer_group': customer_group,
+        'job': job,
     }
-    return render(request, 'core/upload_packaging_types.html', context)
+    return render(request, 'core/import_job_detail.html', context)
+
+
+@login_required
+def import_job_status(request, job_id):
+    """Current state of a background Excel import, polled by the progress page"""
+    job = _get_import_job(request, job_id)
+    return JsonResponse(job.as_status())
 
 
 # Configuration Type Template Download Views
@@ -2325,53 +2254,25 @@ def upload_packaging_types(request, customer_group_id):
 @login_required
 def download_material_types_template(request):
     """Download Excel template for material types"""
-    wb = ConfigTemplateGenerator.create_material_types_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=material_types_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'material_types')
 
 
 @login_required
 def download_machine_types_template(request):
     """Download Excel template for moulding machine types"""
-    wb = ConfigTemplateGenerator.create_machine_types_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=machine_types_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'machine_types')
 
 
 @login_required
 def download_assembly_types_template(request):
     """Download Excel template for assembly types"""
-    wb = ConfigTemplateGenerator.create_assembly_types_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=assembly_types_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'assembly_types')
 
 
 @login_required
 def download_packaging_types_template(request):
     """Download Excel template for packaging types"""
-    wb = ConfigTemplateGenerator.create_packaging_types_template()
-
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename=packaging_types_template.xlsx'
-    wb.save(response)
-    return response
+    return _excel_template_response(request, 'packaging_types')
 
 # =============================================================================
 # ADD THESE EDIT VIEW FUNCTIONS TO views.py